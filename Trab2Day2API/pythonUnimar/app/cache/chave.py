@@ -0,0 +1,16 @@
+import hashlib
+import re
+import unicodedata
+
+
+def normalizar_pergunta(pergunta: str) -> str:
+    # "O que é DDD?", "o que e  ddd" e "O QUE É DDD ?!" viram a mesma pergunta
+    texto = unicodedata.normalize("NFKD", pergunta)
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    texto = re.sub(r"\s+", " ", texto.casefold()).strip()
+    return texto.rstrip("?!.;: ")
+
+
+def chave_resposta(provedor: str, modelo: str, pergunta: str) -> str:
+    # Mesma pergunta em outro provedor ou modelo é outra entrada do cache
+    return hashlib.sha256(f"{provedor}\x1f{modelo}\x1f{normalizar_pergunta(pergunta)}".encode()).hexdigest()
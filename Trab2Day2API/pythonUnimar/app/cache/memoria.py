@@ -0,0 +1,49 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+from app.interfaces.cache_interface import CacheRespostasInterface
+
+
+class CacheMemoria(CacheRespostasInterface):
+    # LRU em memória com TTL; some quando a API reinicia e é por processo
+    def __init__(self, max_itens: int, ttl_segundos: float):
+        if max_itens <= 0:
+            raise ValueError("CACHE_MAX_ITENS deve ser positivo")
+        self.max_itens = max_itens
+        self.ttl_segundos = ttl_segundos
+        self._itens: "OrderedDict[str, tuple]" = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave: str) -> Optional[str]:
+        item = self._itens.get(chave)
+        if item is not None and item[1] <= time.monotonic():
+            del self._itens[chave]
+            item = None
+        if item is None:
+            self.falhas += 1
+            return None
+        self._itens.move_to_end(chave)
+        self.acertos += 1
+        return item[0]
+
+    def guardar(self, chave: str, resposta: str) -> None:
+        self._itens[chave] = (resposta, time.monotonic() + self.ttl_segundos)
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.max_itens:
+            self._itens.popitem(last=False)
+
+    def limpar(self) -> None:
+        self._itens.clear()
+
+    def estatisticas(self) -> dict:
+        consultas = self.acertos + self.falhas
+        return {
+            "backend": "memoria",
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "taxa_acerto": round(self.acertos / consultas, 4) if consultas else 0.0,
+            "tamanho": len(self._itens),
+            "max_itens": self.max_itens,
+            "ttl_segundos": self.ttl_segundos,
+        }
@@ -0,0 +1,75 @@
+import sqlite3
+import time
+from typing import Optional
+from app.interfaces.cache_interface import CacheRespostasInterface
+
+
+class CacheSQLite(CacheRespostasInterface):
+    # Cache em disco: sobrevive a reinícios e é compartilhado pelos workers da mesma máquina.
+    # As consultas são por chave primária (dezenas de microssegundos), então rodam direto no event loop.
+    def __init__(self, caminho: str, max_itens: int, ttl_segundos: float):
+        if max_itens <= 0:
+            raise ValueError("CACHE_MAX_ITENS deve ser positivo")
+        self.caminho = caminho
+        self.max_itens = max_itens
+        self.ttl_segundos = ttl_segundos
+        self.acertos = 0
+        self.falhas = 0
+        self._conexao = sqlite3.connect(caminho, isolation_level=None, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS respostas ("
+            "chave TEXT PRIMARY KEY, resposta TEXT NOT NULL, expira_em REAL NOT NULL, acessado_em REAL NOT NULL)"
+        )
+        self._conexao.execute("CREATE INDEX IF NOT EXISTS ix_respostas_acessado_em ON respostas (acessado_em)")
+
+    def obter(self, chave: str) -> Optional[str]:
+        agora = time.time()
+        linha = self._conexao.execute(
+            "SELECT resposta FROM respostas WHERE chave = ? AND expira_em > ?", (chave, agora)
+        ).fetchone()
+        if linha is None:
+            self.falhas += 1
+            return None
+        self._conexao.execute("UPDATE respostas SET acessado_em = ? WHERE chave = ?", (agora, chave))
+        self.acertos += 1
+        return linha[0]
+
+    def guardar(self, chave: str, resposta: str) -> None:
+        agora = time.time()
+        self._conexao.execute(
+            "INSERT OR REPLACE INTO respostas (chave, resposta, expira_em, acessado_em) VALUES (?, ?, ?, ?)",
+            (chave, resposta, agora + self.ttl_segundos, agora),
+        )
+        # Expiradas saem primeiro; depois as menos acessadas, até caber no limite
+        excedente = self._tamanho() - self.max_itens
+        if excedente > 0:
+            self._conexao.execute("DELETE FROM respostas WHERE expira_em <= ?", (agora,))
+            excedente = self._tamanho() - self.max_itens
+        if excedente > 0:
+            self._conexao.execute(
+                "DELETE FROM respostas WHERE chave IN (SELECT chave FROM respostas ORDER BY acessado_em LIMIT ?)",
+                (excedente,),
+            )
+
+    def limpar(self) -> None:
+        self._conexao.execute("DELETE FROM respostas")
+
+    def estatisticas(self) -> dict:
+        consultas = self.acertos + self.falhas
+        return {
+            "backend": "sqlite",
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "taxa_acerto": round(self.acertos / consultas, 4) if consultas else 0.0,
+            "tamanho": self._tamanho(),
+            "max_itens": self.max_itens,
+            "ttl_segundos": self.ttl_segundos,
+        }
+
+    def fechar(self) -> None:
+        self._conexao.close()
+
+    def _tamanho(self) -> int:
+        return self._conexao.execute("SELECT count(*) FROM respostas").fetchone()[0]
@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 from dotenv import load_dotenv
 
 # Carrega as variáveis do arquivo .env
@@ -12,6 +13,14 @@ from app.providers.openai_tutor_ia import OpenAITutorIA
 from app.providers.anthropic_tutor_ia import AnthropicTutorIA
 from app.providers.tutor_ia_fake import TutorIAFake
 
+# Backends do cache de respostas
+from app.interfaces.cache_interface import CacheRespostasInterface
+from app.cache.memoria import CacheMemoria
+from app.cache.sqlite import CacheSQLite
+
+# Controle de admissão das chamadas à IA
+from app.limites.admissao import ControleAdmissao
+
 # Pega o provedor configurado no .env (ex: openai, anthropic, fake)
 PROVIDER = os.getenv("LLM_PROVIDER", "fake").lower()
 
@@ -19,6 +28,47 @@ PROVIDER = os.getenv("LLM_PROVIDER", "fake").lower()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
 
+# URLs base das APIs (podem apontar para um servidor local de testes)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+ANTHROPIC_BASE_URL = os.getenv("ANTHROPIC_BASE_URL", "https://api.anthropic.com/v1")
+
+# Modelos usados por cada provedor
+OPENAI_MODELO = os.getenv("OPENAI_MODELO", "gpt-3.5-turbo")
+ANTHROPIC_MODELO = os.getenv("ANTHROPIC_MODELO", "claude-3-haiku-20240307")
+
+# Cliente HTTP de cada provedor: criado no startup da API e fechado no shutdown,
+# reaproveitando as conexões (keep-alive / HTTP/2) entre as perguntas
+HTTP_MAX_CONEXOES = int(os.getenv("HTTP_MAX_CONEXOES", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_SEGUNDOS = float(os.getenv("HTTP_KEEPALIVE_SEGUNDOS", "60"))
+HTTP2 = os.getenv("HTTP2", "true").lower() in ("1", "true", "sim")
+
+# Timeouts em segundos: conexão, espera por uma conexão livre do pool e leitura
+# (a leitura inclui o tempo de geração da resposta pela IA)
+HTTP_TIMEOUT_CONEXAO = float(os.getenv("HTTP_TIMEOUT_CONEXAO", "5"))
+HTTP_TIMEOUT_POOL = float(os.getenv("HTTP_TIMEOUT_POOL", "10"))
+HTTP_TIMEOUT_LEITURA = float(os.getenv("HTTP_TIMEOUT_LEITURA", "60"))
+
+# Cache das respostas: memoria (padrão), sqlite ou desligado
+CACHE_RESPOSTAS = os.getenv("CACHE_RESPOSTAS", "memoria").lower()
+CACHE_MAX_ITENS = int(os.getenv("CACHE_MAX_ITENS", "1000"))
+CACHE_TTL_SEGUNDOS = float(os.getenv("CACHE_TTL_SEGUNDOS", "86400"))
+CACHE_SQLITE_CAMINHO = os.getenv("CACHE_SQLITE_CAMINHO", "cache_respostas.db")
+
+# Perguntas iguais feitas ao mesmo tempo compartilham uma única chamada à IA
+COALESCER_PERGUNTAS = os.getenv("COALESCER_PERGUNTAS", "true").lower() in ("1", "true", "sim")
+
+# Controle de admissão das chamadas à IA (0 = sem limite): chamadas simultâneas e
+# cotas por minuto da conta no provedor. Quem passa da capacidade espera numa fila
+# limitada e, com a fila cheia ou depois do timeout, recebe 503 com Retry-After
+LIMITE_CHAMADAS_SIMULTANEAS = int(os.getenv("LIMITE_CHAMADAS_SIMULTANEAS", "10"))
+LIMITE_REQUISICOES_MINUTO = float(os.getenv("LIMITE_REQUISICOES_MINUTO", "0"))
+LIMITE_TOKENS_MINUTO = float(os.getenv("LIMITE_TOKENS_MINUTO", "0"))
+FILA_MAX_AGUARDANDO = int(os.getenv("FILA_MAX_AGUARDANDO", "50"))
+FILA_TIMEOUT_SEGUNDOS = float(os.getenv("FILA_TIMEOUT_SEGUNDOS", "10"))
+# Tokens reservados na cota para a resposta até ela chegar (depois vale o tamanho real)
+LIMITE_TOKENS_RESPOSTA = int(os.getenv("LIMITE_TOKENS_RESPOSTA", "500"))
+
 # Função para criar a instância correta do Tutor IA
 def get_tutor_ia_instance() -> TutorIAInterface:
     if PROVIDER == "openai":
@@ -35,3 +85,23 @@ def get_tutor_ia_instance() -> TutorIAInterface:
 
 # Instância global que será usada pela aplicação
 TUTOR_IA = get_tutor_ia_instance()
+
+# Função para criar o cache de respostas configurado (None = sem cache)
+def get_cache_respostas() -> Optional[CacheRespostasInterface]:
+    if CACHE_RESPOSTAS == "memoria":
+        return CacheMemoria(CACHE_MAX_ITENS, CACHE_TTL_SEGUNDOS)
+    elif CACHE_RESPOSTAS == "sqlite":
+        return CacheSQLite(CACHE_SQLITE_CAMINHO, CACHE_MAX_ITENS, CACHE_TTL_SEGUNDOS)
+    elif CACHE_RESPOSTAS in ("desligado", "0", "false"):
+        return None
+    raise ValueError(f"CACHE_RESPOSTAS inválido: {CACHE_RESPOSTAS} (use memoria, sqlite ou desligado)")
+
+# Função para criar o controle de admissão das chamadas à IA
+def get_controle_admissao() -> ControleAdmissao:
+    return ControleAdmissao(
+        LIMITE_CHAMADAS_SIMULTANEAS,
+        LIMITE_REQUISICOES_MINUTO,
+        LIMITE_TOKENS_MINUTO,
+        FILA_MAX_AGUARDANDO,
+        FILA_TIMEOUT_SEGUNDOS,
+    )
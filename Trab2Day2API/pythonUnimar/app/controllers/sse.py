@@ -0,0 +1,68 @@
+import json
+from contextlib import aclosing
+from typing import AsyncIterator, Optional
+from starlette.responses import StreamingResponse
+from starlette.types import Send
+from app.limites.admissao import CapacidadeEsgotada
+
+
+def evento_sse(dados: dict, evento: Optional[str] = None) -> str:
+    cabecalho = f"event: {evento}\n" if evento else ""
+    return f"{cabecalho}data: {json.dumps(dados, ensure_ascii=False)}\n\n"
+
+
+async def eventos_sse(trechos: AsyncIterator[str]) -> AsyncIterator[str]:
+    # Cada trecho da IA vira um evento "data: {"texto": ...}" e o fim, um evento "fim".
+    # O próximo trecho só é pedido depois que o anterior foi entregue ao cliente (o send
+    # do servidor espera o buffer do socket esvaziar), então um cliente lento segura a
+    # leitura da IA em vez de acumular a resposta em memória. Se o cliente desconecta, o
+    # Starlette cancela esta tarefa e o aclosing fecha a conexão com a IA.
+    enviados = 0
+    async with aclosing(trechos):
+        try:
+            async for trecho in trechos:
+                if trecho:
+                    enviados += 1
+                    yield evento_sse({"texto": trecho})
+        except Exception as e:
+            # Sem vaga para chamar a IA antes do primeiro evento ainda dá para responder 503
+            # (ver RespostaSSE); fora isso o status 200 já foi enviado e o erro vai como evento
+            if isinstance(e, CapacidadeEsgotada) and not enviados:
+                raise
+            yield evento_sse({"detail": str(e)}, "erro")
+            return
+    yield evento_sse({}, "fim")
+
+
+class RespostaSSE(StreamingResponse):
+    # Stream SSE que só envia o status junto com o primeiro evento: uma pergunta que não
+    # foi admitida (sem vaga ou cota para chamar a IA) recebe 503 com Retry-After
+    def __init__(self, trechos: AsyncIterator[str]):
+        super().__init__(
+            eventos_sse(trechos),
+            media_type="text/event-stream",
+            # Sem cache e sem buffer em proxies (nginx), para cada trecho chegar na hora
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    async def stream_response(self, send: Send) -> None:
+        try:
+            primeiro = await self.body_iterator.__anext__()
+        except CapacidadeEsgotada as e:
+            corpo = json.dumps({"detail": str(e)}, ensure_ascii=False).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(corpo)).encode()),
+                    (b"retry-after", str(e.retry_after).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": corpo})
+            return
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        await send({"type": "http.response.body", "body": primeiro.encode(self.charset), "more_body": True})
+        async for evento in self.body_iterator:
+            await send({"type": "http.response.body", "body": evento.encode(self.charset), "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
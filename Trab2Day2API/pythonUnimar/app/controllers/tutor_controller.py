@@ -1,4 +1,6 @@
 from fastapi import APIRouter, HTTPException
+from app.controllers.sse import RespostaSSE
+from app.limites.admissao import CapacidadeEsgotada
 from app.models.tutor_request import TutorRequest
 from app.services.tutor_service import TutorService
 
@@ -10,5 +12,29 @@ async def perguntar_tutor(req: TutorRequest):
     try:
         resposta = await tutor_service.processar_pergunta(req.pergunta)
         return {"resposta": resposta}
+    except CapacidadeEsgotada as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/perguntar/stream")
+async def perguntar_tutor_stream(req: TutorRequest):
+    return RespostaSSE(tutor_service.processar_pergunta_stream(req.pergunta))
+
+@router.get("/cache")
+async def estatisticas_cache():
+    estatisticas = tutor_service.estatisticas_cache()
+    if estatisticas is None:
+        return {"backend": "desligado"}
+    return estatisticas
+
+@router.get("/coalescencia")
+async def estatisticas_coalescencia():
+    estatisticas = tutor_service.estatisticas_coalescencia()
+    if estatisticas is None:
+        return {"coalescencia": "desligada"}
+    return estatisticas
+
+@router.get("/admissao")
+async def estatisticas_admissao():
+    return tutor_service.estatisticas_admissao()
@@ -0,0 +1,29 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class CacheRespostasInterface(ABC):
+    @abstractmethod
+    def obter(self, chave: str) -> Optional[str]:
+        """
+        Retorna a resposta guardada para a chave, ou None se não existir ou tiver expirado.
+        """
+        pass
+
+    @abstractmethod
+    def guardar(self, chave: str, resposta: str) -> None:
+        pass
+
+    @abstractmethod
+    def limpar(self) -> None:
+        pass
+
+    @abstractmethod
+    def estatisticas(self) -> dict:
+        """
+        Acertos, falhas, taxa de acerto, tamanho atual e limites do cache.
+        """
+        pass
+
+    def fechar(self) -> None:
+        pass
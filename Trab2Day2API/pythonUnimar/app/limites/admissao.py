@@ -0,0 +1,186 @@
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+
+class CapacidadeEsgotada(Exception):
+    # Sem capacidade para chamar a IA agora: a API responde 503 com Retry-After
+    def __init__(self, mensagem: str, retry_after: float):
+        super().__init__(mensagem)
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class BaldeDeFichas:
+    # Cota por minuto (requisições ou tokens): o balde começa cheio e é reabastecido
+    # continuamente, o que permite rajadas até a cota sem passar dela na média
+    def __init__(self, por_minuto: float):
+        self.capacidade = por_minuto
+        self.fichas = por_minuto
+        self._por_segundo = por_minuto / 60
+        self._atualizado = time.monotonic()
+
+    def _reabastecer(self) -> None:
+        agora = time.monotonic()
+        self.fichas = min(self.capacidade, self.fichas + (agora - self._atualizado) * self._por_segundo)
+        self._atualizado = agora
+
+    def espera(self, quantidade: float) -> float:
+        # Segundos até haver fichas; um pedido maior que a cota espera o balde cheio
+        self._reabastecer()
+        falta = min(quantidade, self.capacidade) - self.fichas
+        return max(0.0, falta / self._por_segundo)
+
+    def ajustar(self, quantidade: float) -> None:
+        # Negativo consome (o saldo pode ficar negativo), positivo devolve
+        self._reabastecer()
+        self.fichas = min(self.capacidade, self.fichas + quantidade)
+
+
+class ControleAdmissao:
+    # Controle de admissão das chamadas à IA: no máximo max_simultaneas em andamento,
+    # dentro das cotas de requisições e tokens por minuto do provedor (0 = sem limite).
+    # Quem não pode entrar aguarda numa fila limitada, em ordem de chegada, por até
+    # timeout_fila segundos; com a fila cheia, ou se a cota só liberaria depois do
+    # timeout, a recusa é imediata
+    def __init__(self, max_simultaneas: int, requisicoes_minuto: float, tokens_minuto: float,
+                 max_fila: int, timeout_fila: float):
+        self.max_simultaneas = max_simultaneas
+        self.max_fila = max_fila
+        self.timeout_fila = timeout_fila
+        self._vagas = asyncio.Semaphore(max_simultaneas) if max_simultaneas > 0 else None
+        self._catraca = asyncio.Lock()
+        self._requisicoes = BaldeDeFichas(requisicoes_minuto) if requisicoes_minuto > 0 else None
+        self._tokens = BaldeDeFichas(tokens_minuto) if tokens_minuto > 0 else None
+        self._pausado_ate = 0.0
+        self._duracao_media = 1.0
+        self.em_andamento = 0
+        self.aguardando = 0
+        self.admitidas = 0
+        self.recusadas_fila_cheia = 0
+        self.recusadas_timeout = 0
+        self.recusadas_cota = 0
+        self.limites_da_api = 0
+
+    @asynccontextmanager
+    async def admitir(self, tokens: float) -> AsyncIterator[None]:
+        if self._livre(tokens):
+            # Fila vazia, vaga e cota disponíveis: entra sem suspender (o acquire é imediato)
+            if self._vagas is not None:
+                await self._vagas.acquire()
+            self._consumir_cotas(tokens)
+        elif self.aguardando >= self.max_fila:
+            self.recusadas_fila_cheia += 1
+            raise CapacidadeEsgotada("Muitas perguntas ao mesmo tempo, tente novamente em instantes", self._estimar_espera())
+        else:
+            await self._entrar_pela_fila(tokens)
+
+        self.admitidas += 1
+        self.em_andamento += 1
+        inicio = time.monotonic()
+        try:
+            yield
+        finally:
+            self.em_andamento -= 1
+            if self._vagas is not None:
+                self._vagas.release()
+            self._duracao_media = 0.8 * self._duracao_media + 0.2 * (time.monotonic() - inicio)
+
+    def ajustar_tokens(self, diferenca: float) -> None:
+        # Acerta a cota de tokens com o uso real, depois da resposta
+        if self._tokens is not None:
+            self._tokens.ajustar(diferenca)
+
+    def pausar(self, segundos: float) -> None:
+        # A API respondeu 429: ninguém é admitido até passar o Retry-After dela
+        self.limites_da_api += 1
+        self._pausado_ate = max(self._pausado_ate, time.monotonic() + segundos)
+
+    async def _entrar_pela_fila(self, tokens: float) -> None:
+        prazo = time.monotonic() + self.timeout_fila
+        self.aguardando += 1
+        try:
+            # A catraca mantém a ordem de chegada: só o primeiro da fila espera por vaga e cota
+            await self._aguardar(self._catraca.acquire(), prazo)
+            try:
+                if self._vagas is not None:
+                    await self._aguardar(self._vagas.acquire(), prazo)
+                try:
+                    await self._aguardar_cotas(tokens, prazo)
+                except BaseException:
+                    if self._vagas is not None:
+                        self._vagas.release()
+                    raise
+            finally:
+                self._catraca.release()
+        finally:
+            self.aguardando -= 1
+
+    def _livre(self, tokens: float) -> bool:
+        return (
+            self.aguardando == 0
+            and not self._catraca.locked()
+            and (self._vagas is None or not self._vagas.locked())
+            and self._espera_cotas(tokens) == 0
+        )
+
+    async def _aguardar(self, aguardavel, prazo: float) -> None:
+        try:
+            await asyncio.wait_for(aguardavel, max(0.0, prazo - time.monotonic()))
+        except asyncio.TimeoutError:
+            self.recusadas_timeout += 1
+            raise CapacidadeEsgotada("Tempo de espera por uma vaga esgotado, tente novamente em instantes", self._estimar_espera())
+
+    async def _aguardar_cotas(self, tokens: float, prazo: float) -> None:
+        while True:
+            espera = self._espera_cotas(tokens)
+            if espera == 0:
+                break
+            if time.monotonic() + espera > prazo:
+                self.recusadas_cota += 1
+                raise CapacidadeEsgotada("Cota de chamadas à IA esgotada, tente novamente em instantes", espera)
+            await asyncio.sleep(espera)
+        self._consumir_cotas(tokens)
+
+    def _consumir_cotas(self, tokens: float) -> None:
+        if self._requisicoes is not None:
+            self._requisicoes.ajustar(-1)
+        if self._tokens is not None:
+            self._tokens.ajustar(-tokens)
+
+    def _espera_cotas(self, tokens: float) -> float:
+        espera = self._pausado_ate - time.monotonic()
+        if self._requisicoes is not None:
+            espera = max(espera, self._requisicoes.espera(1))
+        if self._tokens is not None:
+            espera = max(espera, self._tokens.espera(tokens))
+        return max(0.0, espera)
+
+    def _estimar_espera(self) -> float:
+        # Para o Retry-After: a espera pelas cotas ou a fila andando no ritmo das chamadas recentes
+        fila = self._duracao_media * (self.aguardando + 1) / (self.max_simultaneas or 1)
+        return max(self._espera_cotas(0), fila)
+
+    def estatisticas(self) -> dict:
+        return {
+            "em_andamento": self.em_andamento,
+            "aguardando": self.aguardando,
+            "admitidas": self.admitidas,
+            "recusadas_fila_cheia": self.recusadas_fila_cheia,
+            "recusadas_timeout": self.recusadas_timeout,
+            "recusadas_cota": self.recusadas_cota,
+            "limites_da_api": self.limites_da_api,
+            "requisicoes_disponiveis": self._disponivel(self._requisicoes),
+            "tokens_disponiveis": self._disponivel(self._tokens),
+            "max_simultaneas": self.max_simultaneas,
+            "max_fila": self.max_fila,
+            "timeout_fila_segundos": self.timeout_fila,
+        }
+
+    @staticmethod
+    def _disponivel(balde: Optional[BaldeDeFichas]) -> Optional[int]:
+        if balde is None:
+            return None
+        balde.ajustar(0)
+        return int(balde.fichas)
@@ -1,24 +1,43 @@
-import httpx
-from app.config import ANTHROPIC_API_KEY
-from app.providers.base_provider import BaseProvider
+import json
+from contextlib import aclosing
+from typing import AsyncIterator
+from app.config import ANTHROPIC_API_KEY, ANTHROPIC_BASE_URL, ANTHROPIC_MODELO
+from app.providers.http_provider import HTTPProvider
 
-class AnthropicProvider(BaseProvider):
-    async def responder(self, pergunta: str) -> str:
-        url = "https://api.anthropic.com/v1/messages"
-        headers = {
+class AnthropicProvider(HTTPProvider):
+    nome = "anthropic"
+    modelo = ANTHROPIC_MODELO
+    base_url = ANTHROPIC_BASE_URL
+
+    def cabecalhos(self) -> dict:
+        return {
             "x-api-key": ANTHROPIC_API_KEY,
             "anthropic-version": "2023-06-01",
             "Content-Type": "application/json"
         }
-        data = {
-            "model": "claude-3-haiku-20240307",
+
+    def _dados(self, pergunta: str) -> dict:
+        return {
+            "model": self.modelo,
             "max_tokens": 1000,
             "messages": [
                 {"role": "user", "content": pergunta}
             ]
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=data, headers=headers)
-            response.raise_for_status()
-            return response.json()["content"][0]["text"]
+    async def responder(self, pergunta: str) -> str:
+        resposta = await self._post("/messages", self._dados(pergunta))
+        return resposta["content"][0]["text"]
+
+    async def responder_stream(self, pergunta: str) -> AsyncIterator[str]:
+        # O texto chega nos eventos content_block_delta; message_stop encerra a resposta
+        data = {**self._dados(pergunta), "stream": True}
+        async with aclosing(self._stream("/messages", data)) as eventos:
+            async for evento in eventos:
+                evento = json.loads(evento)
+                if evento["type"] == "content_block_delta" and evento["delta"].get("text"):
+                    yield evento["delta"]["text"]
+                elif evento["type"] == "error":
+                    raise RuntimeError(evento["error"]["message"])
+                elif evento["type"] == "message_stop":
+                    break
@@ -1,6 +1,22 @@
 from abc import ABC, abstractmethod
+from typing import AsyncIterator
 
 class BaseProvider(ABC):
+    # Identificam o provedor e o modelo (ex.: na chave do cache de respostas)
+    nome = ""
+    modelo = ""
+
     @abstractmethod
     async def responder(self, pergunta: str) -> str:
         pass
+
+    # Resposta em trechos, conforme a IA gera. Sem streaming no provedor, vem num trecho só
+    async def responder_stream(self, pergunta: str) -> AsyncIterator[str]:
+        yield await self.responder(pergunta)
+
+    # Chamados no startup e no shutdown da API (ex.: abrir e fechar o cliente HTTP)
+    async def iniciar(self) -> None:
+        pass
+
+    async def fechar(self) -> None:
+        pass
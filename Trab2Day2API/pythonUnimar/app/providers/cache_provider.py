@@ -0,0 +1,47 @@
+from contextlib import aclosing
+from typing import AsyncIterator
+from app.cache.chave import chave_resposta
+from app.interfaces.cache_interface import CacheRespostasInterface
+from app.providers.base_provider import BaseProvider
+
+class ProviderComCache(BaseProvider):
+    # Decorator: perguntas repetidas (mesmo provedor, modelo e pergunta normalizada)
+    # são respondidas pelo cache, sem chamar a IA
+    def __init__(self, provider: BaseProvider, cache: CacheRespostasInterface):
+        self.provider = provider
+        self.cache = cache
+        self.nome = provider.nome
+        self.modelo = provider.modelo
+
+    async def responder(self, pergunta: str) -> str:
+        chave = chave_resposta(self.nome, self.modelo, pergunta)
+        resposta = self.cache.obter(chave)
+        if resposta is None:
+            # Erros da IA não são guardados: a próxima pergunta tenta de novo
+            resposta = await self.provider.responder(pergunta)
+            if resposta:
+                self.cache.guardar(chave, resposta)
+        return resposta
+
+    async def responder_stream(self, pergunta: str) -> AsyncIterator[str]:
+        chave = chave_resposta(self.nome, self.modelo, pergunta)
+        resposta = self.cache.obter(chave)
+        if resposta is not None:
+            yield resposta
+            return
+        # Só a resposta recebida até o fim vai para o cache (não a de um cliente que desconectou)
+        trechos = []
+        async with aclosing(self.provider.responder_stream(pergunta)) as stream:
+            async for trecho in stream:
+                trechos.append(trecho)
+                yield trecho
+        resposta = "".join(trechos)
+        if resposta:
+            self.cache.guardar(chave, resposta)
+
+    async def iniciar(self) -> None:
+        await self.provider.iniciar()
+
+    async def fechar(self) -> None:
+        await self.provider.fechar()
+        self.cache.fechar()
@@ -0,0 +1,80 @@
+import asyncio
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict
+from app.cache.chave import chave_resposta
+from app.providers.base_provider import BaseProvider
+
+
+@dataclass
+class _Chamada:
+    tarefa: asyncio.Task
+    aguardando: int = 0
+
+
+class ProviderComCoalescencia(BaseProvider):
+    # Decorator (single-flight): perguntas iguais feitas ao mesmo tempo aguardam
+    # uma única chamada à IA e recebem todas o mesmo resultado (ou o mesmo erro)
+    def __init__(self, provider: BaseProvider):
+        self.provider = provider
+        self.nome = provider.nome
+        self.modelo = provider.modelo
+        self._em_andamento: Dict[str, _Chamada] = {}
+        self.chamadas = 0
+        self.coalescidas = 0
+        self.erros = 0
+        self.canceladas = 0
+
+    async def responder(self, pergunta: str) -> str:
+        chave = chave_resposta(self.nome, self.modelo, pergunta)
+        chamada = self._em_andamento.get(chave)
+        if chamada is None:
+            chamada = _Chamada(asyncio.create_task(self.provider.responder(pergunta)))
+            self._em_andamento[chave] = chamada
+            chamada.tarefa.add_done_callback(lambda _tarefa: self._finalizar(chave, chamada))
+            self.chamadas += 1
+        else:
+            self.coalescidas += 1
+
+        chamada.aguardando += 1
+        try:
+            # shield: o cancelamento de quem aguarda (cliente desconectou) não cancela
+            # a chamada compartilhada enquanto houver outros aguardando
+            return await asyncio.shield(chamada.tarefa)
+        finally:
+            chamada.aguardando -= 1
+            if chamada.aguardando == 0 and not chamada.tarefa.done():
+                # Sai do mapa já aqui: uma pergunta igual que chegue antes do callback de
+                # _finalizar começa uma chamada nova em vez de herdar o cancelamento
+                if self._em_andamento.get(chave) is chamada:
+                    del self._em_andamento[chave]
+                chamada.tarefa.cancel()
+                self.canceladas += 1
+
+    async def responder_stream(self, pergunta: str) -> AsyncIterator[str]:
+        # Streams não são coalescidos: cada cliente recebe os trechos da sua própria chamada
+        async with aclosing(self.provider.responder_stream(pergunta)) as stream:
+            async for trecho in stream:
+                yield trecho
+
+    def _finalizar(self, chave: str, chamada: _Chamada) -> None:
+        # Só a chamada em andamento: um erro não fica guardado para as próximas perguntas
+        if self._em_andamento.get(chave) is chamada:
+            del self._em_andamento[chave]
+        if not chamada.tarefa.cancelled() and chamada.tarefa.exception() is not None:
+            self.erros += 1
+
+    def estatisticas(self) -> dict:
+        return {
+            "chamadas": self.chamadas,
+            "coalescidas": self.coalescidas,
+            "erros": self.erros,
+            "canceladas": self.canceladas,
+            "em_andamento": len(self._em_andamento),
+        }
+
+    async def iniciar(self) -> None:
+        await self.provider.iniciar()
+
+    async def fechar(self) -> None:
+        await self.provider.fechar()
@@ -0,0 +1,69 @@
+from typing import AsyncIterator, Optional
+import httpx
+from app import config
+from app.providers.base_provider import BaseProvider
+
+# HTTP/2 precisa do pacote h2 (pip install "httpx[http2]"); sem ele o cliente usa HTTP/1.1
+try:
+    import h2  # noqa: F401
+    HTTP2_DISPONIVEL = True
+except ImportError:
+    HTTP2_DISPONIVEL = False
+
+
+def criar_cliente(base_url: str, headers: dict) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=base_url,
+        headers=headers,
+        http2=config.HTTP2 and HTTP2_DISPONIVEL,
+        limits=httpx.Limits(
+            max_connections=config.HTTP_MAX_CONEXOES,
+            max_keepalive_connections=config.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=config.HTTP_KEEPALIVE_SEGUNDOS,
+        ),
+        timeout=httpx.Timeout(
+            config.HTTP_TIMEOUT_LEITURA,
+            connect=config.HTTP_TIMEOUT_CONEXAO,
+            pool=config.HTTP_TIMEOUT_POOL,
+        ),
+    )
+
+
+class HTTPProvider(BaseProvider):
+    # Provedor que fala com uma API HTTP usando um único cliente de longa duração
+    base_url = ""
+
+    def __init__(self):
+        self.client: Optional[httpx.AsyncClient] = None
+
+    def cabecalhos(self) -> dict:
+        return {"Content-Type": "application/json"}
+
+    async def iniciar(self) -> None:
+        if self.client is None:
+            self.client = criar_cliente(self.base_url, self.cabecalhos())
+
+    async def fechar(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def _post(self, caminho: str, dados: dict) -> dict:
+        # Sem o startup da API (ex.: uso em scripts) o cliente é criado no primeiro uso
+        if self.client is None:
+            await self.iniciar()
+        response = await self.client.post(caminho, json=dados)
+        response.raise_for_status()
+        return response.json()
+
+    async def _stream(self, caminho: str, dados: dict) -> AsyncIterator[str]:
+        # Resposta em SSE (stream: true): devolve o conteúdo de cada linha "data:" assim
+        # que chega. A próxima linha só é lida quando pedida, e fechar o gerador (ex.: o
+        # cliente desconectou) fecha a conexão, o que interrompe a geração na IA
+        if self.client is None:
+            await self.iniciar()
+        async with self.client.stream("POST", caminho, json=dados) as response:
+            response.raise_for_status()
+            async for linha in response.aiter_lines():
+                if linha.startswith("data:"):
+                    yield linha[5:].strip()
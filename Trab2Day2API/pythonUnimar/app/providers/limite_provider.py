@@ -0,0 +1,68 @@
+import math
+from contextlib import aclosing
+from typing import AsyncIterator
+import httpx
+from app.limites.admissao import CapacidadeEsgotada, ControleAdmissao
+from app.providers.base_provider import BaseProvider
+
+
+def estimar_tokens(texto: str) -> int:
+    # Aproximação usual de ~4 caracteres por token, sem depender do tokenizador de cada modelo
+    return math.ceil(len(texto) / 4)
+
+
+class ProviderComLimite(BaseProvider):
+    # Decorator: toda chamada à IA passa pelo controle de admissão (vagas, cotas por
+    # minuto e fila). Um 429 da API pausa as próximas chamadas pelo Retry-After dela
+    def __init__(self, provider: BaseProvider, controle: ControleAdmissao, tokens_resposta: int):
+        self.provider = provider
+        self.controle = controle
+        self.tokens_resposta = tokens_resposta
+        self.nome = provider.nome
+        self.modelo = provider.modelo
+
+    async def responder(self, pergunta: str) -> str:
+        # Reserva a resposta pelo tamanho estimado e acerta com o tamanho real no fim
+        reserva = estimar_tokens(pergunta) + self.tokens_resposta
+        resposta = ""
+        async with self.controle.admitir(reserva):
+            try:
+                resposta = await self.provider.responder(pergunta)
+            except httpx.HTTPStatusError as e:
+                self._limite_da_api(e)
+                raise
+            finally:
+                self.controle.ajustar_tokens(reserva - estimar_tokens(pergunta) - estimar_tokens(resposta))
+        return resposta
+
+    async def responder_stream(self, pergunta: str) -> AsyncIterator[str]:
+        # A vaga fica ocupada até o fim do stream, enquanto a conexão com a IA está aberta
+        reserva = estimar_tokens(pergunta) + self.tokens_resposta
+        gerados = 0
+        async with self.controle.admitir(reserva):
+            try:
+                async with aclosing(self.provider.responder_stream(pergunta)) as stream:
+                    async for trecho in stream:
+                        gerados += len(trecho)
+                        yield trecho
+            except httpx.HTTPStatusError as e:
+                self._limite_da_api(e)
+                raise
+            finally:
+                self.controle.ajustar_tokens(reserva - estimar_tokens(pergunta) - math.ceil(gerados / 4))
+
+    def _limite_da_api(self, erro: httpx.HTTPStatusError) -> None:
+        if erro.response.status_code != 429:
+            return
+        try:
+            segundos = float(erro.response.headers.get("retry-after", "1"))
+        except ValueError:
+            segundos = 1.0
+        self.controle.pausar(segundos)
+        raise CapacidadeEsgotada("A API da IA está limitando as chamadas, tente novamente em instantes", segundos) from erro
+
+    async def iniciar(self) -> None:
+        await self.provider.iniciar()
+
+    async def fechar(self) -> None:
+        await self.provider.fechar()
@@ -1,23 +1,40 @@
-import httpx
-from app.config import OPENAI_API_KEY
-from app.providers.base_provider import BaseProvider
+import json
+from contextlib import aclosing
+from typing import AsyncIterator
+from app.config import OPENAI_API_KEY, OPENAI_BASE_URL, OPENAI_MODELO
+from app.providers.http_provider import HTTPProvider
 
-class OpenAIProvider(BaseProvider):
-    async def responder(self, pergunta: str) -> str:
-        url = "https://api.openai.com/v1/chat/completions"
-        headers = {
+class OpenAIProvider(HTTPProvider):
+    nome = "openai"
+    modelo = OPENAI_MODELO
+    base_url = OPENAI_BASE_URL
+
+    def cabecalhos(self) -> dict:
+        return {
             "Authorization": f"Bearer {OPENAI_API_KEY}",
             "Content-Type": "application/json"
         }
-        data = {
-            "model": "gpt-3.5-turbo",
+
+    def _dados(self, pergunta: str) -> dict:
+        return {
+            "model": self.modelo,
             "messages": [
                 {"role": "system", "content": "Você é um tutor educacional."},
                 {"role": "user", "content": pergunta}
             ]
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=data, headers=headers)
-            response.raise_for_status()
-            return response.json()["choices"][0]["message"]["content"]
+    async def responder(self, pergunta: str) -> str:
+        resposta = await self._post("/chat/completions", self._dados(pergunta))
+        return resposta["choices"][0]["message"]["content"]
+
+    async def responder_stream(self, pergunta: str) -> AsyncIterator[str]:
+        # Cada evento traz um pedaço da resposta em choices[0].delta.content; termina com [DONE]
+        data = {**self._dados(pergunta), "stream": True}
+        async with aclosing(self._stream("/chat/completions", data)) as eventos:
+            async for evento in eventos:
+                if evento == "[DONE]":
+                    break
+                escolhas = json.loads(evento)["choices"]
+                if escolhas and escolhas[0]["delta"].get("content"):
+                    yield escolhas[0]["delta"]["content"]
@@ -1,5 +1,16 @@
+import re
+from typing import AsyncIterator
 from app.interfaces.tutor_interface import TutorIAInterface
+from app.providers.base_provider import BaseProvider
+
+class TutorIAFake(BaseProvider, TutorIAInterface):
+    nome = "fake"
+    modelo = "offline"
 
-class TutorIAFake(TutorIAInterface):
     async def responder(self, pergunta: str) -> str:
         return f"Você perguntou: '{pergunta}'. Esta é uma resposta simulada do Tutor IA (modo offline)."
+
+    async def responder_stream(self, pergunta: str) -> AsyncIterator[str]:
+        # Simula a geração da resposta palavra por palavra
+        for palavra in re.findall(r"\S+\s*", await self.responder(pergunta)):
+            yield palavra
@@ -1,7 +1,13 @@
+from typing import AsyncIterator, Optional
 from app.providers.openai_provider import OpenAIProvider
 from app.providers.anthropic_provider import AnthropicProvider
 from app.providers.tutor_ia_fake import TutorIAFake
-from app.config import PROVIDER
+from app.providers.cache_provider import ProviderComCache
+from app.providers.coalescencia_provider import ProviderComCoalescencia
+from app.providers.limite_provider import ProviderComLimite
+from app.config import (
+    PROVIDER, COALESCER_PERGUNTAS, LIMITE_TOKENS_RESPOSTA, get_cache_respostas, get_controle_admissao
+)
 
 class TutorService:
     def __init__(self):
@@ -12,5 +18,39 @@ class TutorService:
         else:
             self.llm = TutorIAFake()
 
+        # Chamadas à IA dentro das vagas e cotas do provedor: o excesso espera numa fila
+        # limitada ou recebe 503 na hora, em vez de virar uma avalanche de 429
+        self.admissao = get_controle_admissao()
+        self.llm = ProviderComLimite(self.llm, self.admissao, LIMITE_TOKENS_RESPOSTA)
+
+        # Perguntas iguais simultâneas (ex.: a turma toda ao mesmo tempo) viram uma chamada só
+        self.coalescencia = ProviderComCoalescencia(self.llm) if COALESCER_PERGUNTAS else None
+        if self.coalescencia is not None:
+            self.llm = self.coalescencia
+
+        # Perguntas repetidas saem do cache, sem nova chamada (paga) à IA
+        self.cache = get_cache_respostas()
+        if self.cache is not None:
+            self.llm = ProviderComCache(self.llm, self.cache)
+
     async def processar_pergunta(self, pergunta: str) -> str:
         return await self.llm.responder(pergunta)
+
+    def processar_pergunta_stream(self, pergunta: str) -> AsyncIterator[str]:
+        return self.llm.responder_stream(pergunta)
+
+    def estatisticas_cache(self) -> Optional[dict]:
+        return self.cache.estatisticas() if self.cache is not None else None
+
+    def estatisticas_coalescencia(self) -> Optional[dict]:
+        return self.coalescencia.estatisticas() if self.coalescencia is not None else None
+
+    def estatisticas_admissao(self) -> dict:
+        return self.admissao.estatisticas()
+
+    # Abre e fecha os recursos do provedor (cliente HTTP) junto com a API
+    async def iniciar(self) -> None:
+        await self.llm.iniciar()
+
+    async def fechar(self) -> None:
+        await self.llm.fechar()
@@ -0,0 +1,66 @@
+# Benchmark: semana de provas, mais perguntas simultâneas do que a cota da IA
+#
+# O stub_llm aceita no máximo `cota` requisições em andamento e responde 429
+# acima disso, como a API real. Dispara N perguntas diferentes ao mesmo tempo
+# contra a API (cache desligado), sem limite de chamadas simultâneas (só a
+# pausa pelo Retry-After dos 429) e com o limite igual à cota, e conta as
+# respostas por status, os 429 recebidos e os tempos.
+#
+# Uso: python benchmarks/bench_admissao.py [perguntas] [cota] [atraso_stub_segundos]
+
+import asyncio
+import importlib
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from stub_llm import ServidorStub
+
+
+async def medir(perguntas: int, cota: int, atraso: float) -> None:
+    servidor = ServidorStub(atraso=atraso, max_simultaneas=cota)
+    porta = await servidor.iniciar()
+    os.environ.update(
+        LLM_PROVIDER="openai", OPENAI_API_KEY="stub", OPENAI_BASE_URL=f"http://127.0.0.1:{porta}/v1",
+        CACHE_RESPOSTAS="desligado", FILA_MAX_AGUARDANDO=str(cota * 5), FILA_TIMEOUT_SEGUNDOS="10",
+    )
+    import httpx
+
+    print(f"{perguntas} perguntas, cota de {cota} simultâneas, IA com {atraso * 1000:.0f} ms")
+    print(f"{'':>26} | 200 | 503 | 500 | 429 no stub | 200 p50/máx (ms) | 503 máx (ms)")
+    for limite in ("0", str(cota)):
+        os.environ["LIMITE_CHAMADAS_SIMULTANEAS"] = limite
+        # Recarrega a configuração e a API com a variável nova
+        for modulo in ("app.config", "app.services.tutor_service", "app.controllers.tutor_controller", "main"):
+            if modulo in sys.modules:
+                importlib.reload(sys.modules[modulo])
+        from main import app
+
+        servidor.zerar()
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://api", timeout=60) as cliente:
+                async def perguntar(i: int):
+                    inicio = time.perf_counter()
+                    resposta = await cliente.post("/tutor/perguntar", json={"pergunta": f"Pergunta {i} sobre DDD"})
+                    return resposta.status_code, (time.perf_counter() - inicio) * 1000
+
+                resultados = await asyncio.gather(*(perguntar(i) for i in range(perguntas)))
+        status = [s for s, _ in resultados]
+        ok = sorted(t for s, t in resultados if s == 200)
+        recusadas = [t for s, t in resultados if s == 503]
+        rotulo = "sem limite (só os 429)" if limite == "0" else f"{cota} simultâneas + fila {cota * 5}"
+        print(f"{rotulo:>26} | {status.count(200):>3} | {status.count(503):>3} | {status.count(500):>3} | "
+              f"{servidor.recusadas:>11} | {ok[len(ok) // 2] if ok else 0:>7.0f}/{ok[-1] if ok else 0:<8.0f} | "
+              f"{max(recusadas) if recusadas else 0:>11.0f}")
+    await servidor.fechar()
+
+
+if __name__ == "__main__":
+    asyncio.run(medir(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 10,
+        float(sys.argv[3]) if len(sys.argv) > 3 else 1.0,
+    ))
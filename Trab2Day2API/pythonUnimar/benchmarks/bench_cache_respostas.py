@@ -0,0 +1,65 @@
+# Benchmark: custo de uma pergunta repetida com o cache de respostas
+#
+# Envia ao OpenAIProvider (apontado para o stub_llm, com o atraso de uma IA
+# real) uma pergunta nova e depois variações dela, medindo para cada backend
+# (sem cache, memória e SQLite) o tempo de um acerto e de uma falha.
+#
+# Uso: python benchmarks/bench_cache_respostas.py [repeticoes] [atraso_stub_segundos]
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from stub_llm import ServidorStub
+
+
+async def medir(repeticoes: int, atraso: float) -> None:
+    servidor = ServidorStub(atraso=atraso)
+    porta = await servidor.iniciar()
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{porta}/v1"
+    os.environ["LLM_PROVIDER"] = "fake"
+
+    from app.cache.memoria import CacheMemoria
+    from app.cache.sqlite import CacheSQLite
+    from app.providers.cache_provider import ProviderComCache
+    from app.providers.openai_provider import OpenAIProvider
+
+    provider = OpenAIProvider()
+    await provider.iniciar()
+    backends = {
+        "sem cache": None,
+        "memoria": CacheMemoria(10000, 3600),
+        "sqlite": CacheSQLite(tempfile.mktemp(suffix=".db"), 10000, 3600),
+    }
+    variacoes = ["O que é DDD?", "o que e ddd", "O QUE É DDD ?!", "  o que é   DDD"]
+
+    print(f"stub com atraso de {atraso * 1000:.0f} ms | falha (ms) | acerto (µs) | chamadas à IA")
+    try:
+        for nome, cache in backends.items():
+            llm = ProviderComCache(provider, cache) if cache is not None else provider
+            servidor.zerar()
+            inicio = time.perf_counter()
+            await llm.responder("O que é DDD?")
+            falha = (time.perf_counter() - inicio) * 1000
+
+            inicio = time.perf_counter()
+            for i in range(repeticoes):
+                await llm.responder(variacoes[i % len(variacoes)])
+            acerto = (time.perf_counter() - inicio) / repeticoes * 1_000_000
+            print(f"{nome:>28} | {falha:>10.1f} | {acerto:>11.1f} | {servidor.requisicoes:>6}")
+    finally:
+        await provider.fechar()
+        backends["sqlite"].fechar()
+        await servidor.fechar()
+
+
+if __name__ == "__main__":
+    asyncio.run(medir(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1000,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 1.0,
+    ))
@@ -0,0 +1,60 @@
+# Benchmark: a turma inteira envia a mesma pergunta ao mesmo tempo
+#
+# Dispara N requisições POST /tutor/perguntar iguais (com variações de
+# maiúsculas e acentos) contra a API, com o provedor OpenAI apontado para o
+# stub_llm, com e sem coalescência (cache e limite de chamadas simultâneas
+# desligados nos dois casos).
+#
+# Uso: python benchmarks/bench_coalescencia.py [alunos] [atraso_stub_segundos]
+
+import asyncio
+import importlib
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from stub_llm import ServidorStub
+
+
+async def medir(alunos: int, atraso: float) -> None:
+    servidor = ServidorStub(atraso=atraso)
+    porta = await servidor.iniciar()
+    os.environ.update(
+        LLM_PROVIDER="openai", OPENAI_API_KEY="stub", OPENAI_BASE_URL=f"http://127.0.0.1:{porta}/v1",
+        CACHE_RESPOSTAS="desligado", LIMITE_CHAMADAS_SIMULTANEAS="0",
+    )
+    import httpx
+
+    variacoes = ["O que é DDD?", "o que e ddd", "O QUE É DDD?", "o que é DDD"]
+    print(f"{alunos} alunos, IA com {atraso * 1000:.0f} ms | chamadas à IA | p50 (ms) | máx (ms)")
+    for coalescer in ("false", "true"):
+        os.environ["COALESCER_PERGUNTAS"] = coalescer
+        # Recarrega a configuração e a API com a variável nova
+        for modulo in ("app.config", "app.services.tutor_service", "app.controllers.tutor_controller", "main"):
+            if modulo in sys.modules:
+                importlib.reload(sys.modules[modulo])
+        from main import app
+
+        servidor.zerar()
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://api") as cliente:
+                async def perguntar(i: int) -> float:
+                    inicio = time.perf_counter()
+                    resposta = await cliente.post("/tutor/perguntar", json={"pergunta": variacoes[i % len(variacoes)]})
+                    resposta.raise_for_status()
+                    return (time.perf_counter() - inicio) * 1000
+
+                tempos = sorted(await asyncio.gather(*(perguntar(i) for i in range(alunos))))
+        rotulo = "com coalescência" if coalescer == "true" else "sem coalescência"
+        print(f"{rotulo:>36} | {servidor.requisicoes:>13} | {tempos[len(tempos) // 2]:>8.0f} | {tempos[-1]:>8.0f}")
+    await servidor.fechar()
+
+
+if __name__ == "__main__":
+    asyncio.run(medir(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 40,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 1.0,
+    ))
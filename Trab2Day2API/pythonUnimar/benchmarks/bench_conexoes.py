@@ -0,0 +1,82 @@
+# Benchmark: cliente HTTP por pergunta x cliente do provedor com pool
+#
+# Sobe o stub_llm com TLS (certificado autoassinado gerado com openssl) e
+# envia as mesmas perguntas:
+# - como antes: um httpx.AsyncClient novo por pergunta
+# - com o OpenAIProvider, que reaproveita as conexões do seu cliente
+# em sequência e em rajadas concorrentes, contando as conexões abertas.
+#
+# Uso: python benchmarks/bench_conexoes.py [perguntas] [concorrencia]
+
+import asyncio
+import os
+import ssl
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from stub_llm import ServidorStub
+
+
+def gerar_certificado(diretorio: str) -> ssl.SSLContext:
+    certificado = os.path.join(diretorio, "cert.pem")
+    chave = os.path.join(diretorio, "chave.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", "/CN=localhost",
+         "-addext", "subjectAltName=DNS:localhost", "-keyout", chave, "-out", certificado],
+        check=True, capture_output=True,
+    )
+    # O cliente confia no certificado do stub pela variável padrão do httpx
+    os.environ["SSL_CERT_FILE"] = certificado
+    contexto = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    contexto.load_cert_chain(certificado, chave)
+    return contexto
+
+
+async def medir(perguntas: int, concorrencia: int) -> None:
+    servidor = ServidorStub(contexto_tls=gerar_certificado(tempfile.mkdtemp()))
+    porta = await servidor.iniciar()
+    os.environ["OPENAI_BASE_URL"] = f"https://localhost:{porta}/v1"
+    os.environ["LLM_PROVIDER"] = "fake"
+
+    import httpx
+    from app.providers.openai_provider import OpenAIProvider
+
+    provider = OpenAIProvider()
+    dados = {"model": "gpt-3.5-turbo", "messages": [{"role": "user", "content": "O que é DDD?"}]}
+
+    async def sem_pool():
+        # Caminho antigo do responder: cliente (e conexão) novo a cada pergunta
+        async with httpx.AsyncClient() as client:
+            response = await client.post(f"{os.environ['OPENAI_BASE_URL']}/chat/completions", json=dados)
+            response.raise_for_status()
+            return response.json()["choices"][0]["message"]["content"]
+
+    async def com_pool():
+        return await provider.responder("O que é DDD?")
+
+    print(f"{perguntas} perguntas, TLS local | conexões | total (ms) | por pergunta (ms)")
+    await provider.iniciar()
+    try:
+        for rotulo, funcao in (("novo cliente", sem_pool), ("cliente do provedor", com_pool)):
+            for modo, lote in (("sequencial", 1), (f"{concorrencia} concorrentes", concorrencia)):
+                servidor.zerar()
+                inicio = time.perf_counter()
+                for _ in range(perguntas // lote):
+                    await asyncio.gather(*(funcao() for _ in range(lote)))
+                total = (time.perf_counter() - inicio) * 1000
+                print(f"{rotulo:>20} {modo:>16} | {servidor.conexoes:>8} | {total:>10.0f} | {total / perguntas:>8.2f}")
+    finally:
+        await provider.fechar()
+        await servidor.fechar()
+
+
+if __name__ == "__main__":
+    asyncio.run(medir(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20,
+    ))
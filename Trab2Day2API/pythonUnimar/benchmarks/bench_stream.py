@@ -0,0 +1,88 @@
+# Benchmark: tempo até o primeiro byte com e sem streaming (SSE)
+#
+# Sobe a API com o uvicorn (o ASGITransport do httpx junta o corpo inteiro
+# antes de devolver, então não serve para medir o primeiro byte), com o
+# provedor OpenAI apontado para o stub_llm, e envia as mesmas perguntas para
+# POST /tutor/perguntar e POST /tutor/perguntar/stream. Depois abre um stream,
+# desconecta no primeiro trecho e confere que o stub viu a conexão fechada.
+#
+# Uso: python benchmarks/bench_stream.py [perguntas] [atraso_stub_segundos]
+
+import asyncio
+import os
+import socket
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from stub_llm import ServidorStub
+
+PERGUNTA = "Explique com um exemplo curto como agregados, entidades e objetos de valor se relacionam no DDD ({})"
+
+
+def porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def medir(perguntas: int, atraso: float) -> None:
+    stub = ServidorStub(atraso=atraso)
+    porta_stub = await stub.iniciar()
+    os.environ.update(
+        LLM_PROVIDER="openai", OPENAI_API_KEY="stub", OPENAI_BASE_URL=f"http://127.0.0.1:{porta_stub}/v1",
+        CACHE_RESPOSTAS="desligado",
+    )
+    import httpx
+    import uvicorn
+    from main import app
+
+    porta = porta_livre()
+    servidor = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=porta, log_level="warning"))
+    tarefa = asyncio.create_task(servidor.serve())
+    while not servidor.started:
+        await asyncio.sleep(0.01)
+
+    print(f"{perguntas} perguntas, IA com {atraso * 1000:.0f} ms | 1º byte p50 (ms) | total p50 (ms)")
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{porta}", timeout=30) as cliente:
+            for rotulo, caminho in (("/tutor/perguntar", "/tutor/perguntar"), ("/tutor/perguntar/stream", "/tutor/perguntar/stream")):
+                primeiros, totais = [], []
+                for i in range(perguntas):
+                    inicio = time.perf_counter()
+                    async with cliente.stream("POST", caminho, json={"pergunta": PERGUNTA.format(i)}) as resposta:
+                        resposta.raise_for_status()
+                        primeiro = None
+                        async for _ in resposta.aiter_raw():
+                            if primeiro is None:
+                                primeiro = time.perf_counter() - inicio
+                    primeiros.append(primeiro * 1000)
+                    totais.append((time.perf_counter() - inicio) * 1000)
+                primeiros.sort()
+                totais.sort()
+                print(f"{rotulo:>40} | {primeiros[len(primeiros) // 2]:>16.0f} | {totais[len(totais) // 2]:>14.0f}")
+
+            # Cliente desconecta depois do primeiro trecho: a chamada à IA deve ser fechada
+            stub.zerar()
+            inicio = time.perf_counter()
+            async with cliente.stream("POST", "/tutor/perguntar/stream", json={"pergunta": PERGUNTA.format("x")}) as resposta:
+                async for linha in resposta.aiter_lines():
+                    if linha.startswith("data:"):
+                        break
+            while not stub.interrompidos and time.perf_counter() - inicio < atraso * 2:
+                await asyncio.sleep(0.01)
+            print(f"desconexão no 1º trecho: stream interrompido no stub após "
+                  f"{(time.perf_counter() - inicio) * 1000:.0f} ms (interrompidos={stub.interrompidos})")
+    finally:
+        servidor.should_exit = True
+        await tarefa
+        await stub.fechar()
+
+
+if __name__ == "__main__":
+    asyncio.run(medir(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 1.0,
+    ))
@@ -0,0 +1,172 @@
+# Servidor HTTP/1.1 local que imita as APIs da OpenAI e da Anthropic
+#
+# Responde POST .../chat/completions e POST .../messages no formato de cada
+# API, com um atraso configurável, e conta as conexões TCP abertas, as
+# requisições e o pico de requisições simultâneas. Com "stream": true no corpo
+# responde em SSE, palavra por palavra (o atraso é dividido entre as palavras),
+# e conta os streams interrompidos pelo cliente. Com max_simultaneas, imita a
+# cota da conta: acima desse número de requisições em andamento responde 429
+# com Retry-After, como as APIs reais. Com um contexto TLS
+# (certificado autoassinado) inclui o custo do handshake, como na API real.
+#
+# Uso avulso: python benchmarks/stub_llm.py [porta] [atraso_segundos]
+# e no .env: OPENAI_BASE_URL=http://127.0.0.1:8081/v1
+
+import asyncio
+import json
+import re
+import ssl
+import sys
+from typing import Optional
+
+
+class ServidorStub:
+    def __init__(self, atraso: float = 0.0, contexto_tls: Optional[ssl.SSLContext] = None, max_simultaneas: int = 0):
+        self.atraso = atraso
+        self.contexto_tls = contexto_tls
+        self.max_simultaneas = max_simultaneas
+        self.recusadas = 0
+        self.conexoes = 0
+        self.requisicoes = 0
+        self.simultaneas = 0
+        self.pico_simultaneas = 0
+        self.interrompidos = 0
+        self.porta = 0
+        self._servidor = None
+
+    async def iniciar(self, host: str = "127.0.0.1", porta: int = 0) -> int:
+        self._servidor = await asyncio.start_server(self._atender, host, porta, ssl=self.contexto_tls)
+        self.porta = self._servidor.sockets[0].getsockname()[1]
+        return self.porta
+
+    async def fechar(self) -> None:
+        self._servidor.close()
+        await self._servidor.wait_closed()
+
+    def zerar(self) -> None:
+        self.conexoes = self.requisicoes = self.pico_simultaneas = self.interrompidos = self.recusadas = 0
+
+    async def _atender(self, leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> None:
+        self.conexoes += 1
+        try:
+            while True:
+                requisicao = await self._ler_requisicao(leitor)
+                if requisicao is None:
+                    break
+                caminho, cabecalhos, corpo = requisicao
+                fechar = cabecalhos.get("connection", "").lower() == "close"
+                self.requisicoes += 1
+                self.simultaneas += 1
+                self.pico_simultaneas = max(self.pico_simultaneas, self.simultaneas)
+                try:
+                    if self.max_simultaneas and self.simultaneas > self.max_simultaneas:
+                        self.recusadas += 1
+                        status, resposta = "429 Too Many Requests", {"error": {"type": "rate_limit_error"}}
+                    elif corpo.get("stream") and caminho.endswith(("/chat/completions", "/messages")):
+                        if not await self._transmitir(leitor, escritor, caminho, corpo, fechar) or fechar:
+                            break
+                        continue
+                    else:
+                        if self.atraso:
+                            await asyncio.sleep(self.atraso)
+                        status, resposta = self._responder(caminho, corpo)
+                finally:
+                    self.simultaneas -= 1
+                dados = json.dumps(resposta).encode()
+                extra = "Retry-After: 1\r\n" if status.startswith("429") else ""
+                escritor.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n{extra}"
+                    f"Content-Length: {len(dados)}\r\nConnection: {'close' if fechar else 'keep-alive'}\r\n\r\n".encode()
+                    + dados
+                )
+                await escritor.drain()
+                if fechar:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ssl.SSLError):
+            pass
+        finally:
+            escritor.close()
+
+    async def _ler_requisicao(self, leitor: asyncio.StreamReader):
+        linha = await leitor.readline()
+        if not linha:
+            return None
+        _metodo, caminho, _versao = linha.decode("latin-1").split(" ", 2)
+        cabecalhos = {}
+        while True:
+            linha = (await leitor.readline()).decode("latin-1").strip()
+            if not linha:
+                break
+            nome, valor = linha.split(":", 1)
+            cabecalhos[nome.strip().lower()] = valor.strip()
+        tamanho = int(cabecalhos.get("content-length", 0))
+        corpo = json.loads(await leitor.readexactly(tamanho)) if tamanho else {}
+        return caminho, cabecalhos, corpo
+
+    def _texto(self, corpo: dict) -> str:
+        pergunta = corpo.get("messages", [{}])[-1].get("content", "")
+        return f"Resposta do stub para: {pergunta}"
+
+    def _responder(self, caminho: str, corpo: dict):
+        texto = self._texto(corpo)
+        if caminho.endswith("/chat/completions"):
+            return "200 OK", {"choices": [{"message": {"role": "assistant", "content": texto}}]}
+        if caminho.endswith("/messages"):
+            return "200 OK", {"content": [{"type": "text", "text": texto}]}
+        return "404 Not Found", {"error": "rota desconhecida"}
+
+    async def _transmitir(self, leitor, escritor, caminho: str, corpo: dict, fechar: bool) -> bool:
+        # Resposta em SSE com chunked transfer encoding (a conexão continua reaproveitável).
+        # Retorna False se o cliente fechou a conexão antes do fim
+        palavras = re.findall(r"\S+\s*", self._texto(corpo))
+        openai = caminho.endswith("/chat/completions")
+        escritor.write(
+            "HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nTransfer-Encoding: chunked\r\n"
+            f"Connection: {'close' if fechar else 'keep-alive'}\r\n\r\n".encode()
+        )
+        for palavra in palavras:
+            if self.atraso:
+                await asyncio.sleep(self.atraso / len(palavras))
+            if openai:
+                evento = f"data: {json.dumps({'choices': [{'index': 0, 'delta': {'content': palavra}}]})}\n\n"
+            else:
+                delta = {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": palavra}}
+                evento = f"event: content_block_delta\ndata: {json.dumps(delta)}\n\n"
+            try:
+                if leitor.at_eof() or escritor.is_closing():
+                    raise ConnectionResetError
+                self._escrever_chunk(escritor, evento)
+                await escritor.drain()
+            except ConnectionError:
+                self.interrompidos += 1
+                return False
+        if openai:
+            self._escrever_chunk(escritor, "data: [DONE]\n\n")
+        else:
+            self._escrever_chunk(escritor, 'event: message_stop\ndata: {"type": "message_stop"}\n\n')
+        escritor.write(b"0\r\n\r\n")
+        await escritor.drain()
+        return True
+
+    def _escrever_chunk(self, escritor, texto: str) -> None:
+        dados = texto.encode()
+        escritor.write(f"{len(dados):x}\r\n".encode() + dados + b"\r\n")
+
+
+async def _executar(porta: int, atraso: float) -> None:
+    servidor = ServidorStub(atraso)
+    await servidor.iniciar(porta=porta)
+    print(f"stub em http://127.0.0.1:{servidor.porta}/v1 (atraso {atraso}s)")
+    try:
+        while True:
+            await asyncio.sleep(10)
+            print(f"conexões={servidor.conexoes} requisições={servidor.requisicoes} pico={servidor.pico_simultaneas}")
+    finally:
+        await servidor.fechar()
+
+
+if __name__ == "__main__":
+    asyncio.run(_executar(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 8081,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 0.0,
+    ))
@@ -1,7 +1,16 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.controllers import tutor_controller
 
-app = FastAPI(title="Tutor IA API")
 
-app.include_router(tutor_controller.router, prefix="/tutor")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Cliente HTTP do provedor aberto no startup e fechado no shutdown
+    await tutor_controller.tutor_service.iniciar()
+    yield
+    await tutor_controller.tutor_service.fechar()
+
 
+app = FastAPI(title="Tutor IA API", lifespan=lifespan)
+
+app.include_router(tutor_controller.router, prefix="/tutor")
@@ -0,0 +1,151 @@
+# Benchmark: latência p50/p99 com muitos clientes concorrentes, Flask x ASGI
+#
+# Sobe a app Flask (src.main, servidor threaded do werkzeug) e a app ASGI
+# (src.asgi, uvicorn com aiosqlite), cada uma com seu banco SQLite populado
+# com os mesmos livros, e dispara o mesmo tráfego misto (listagem por cursor,
+# busca textual e empréstimos) com N clientes concorrentes via httpx.
+#
+# Uso: python benchmarks/bench_asgi_vs_flask.py [clientes] [requisicoes_por_cliente] [livros]
+
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import httpx
+
+from bench_emprestimos_concorrentes import criar_app, isbn_sintetico
+
+SERVIDORES = {
+    'flask': [
+        sys.executable, '-c',
+        'from src.main import app; import sys; app.run(host="127.0.0.1", port=int(sys.argv[1]), threaded=True)'
+    ],
+    'asgi': [
+        sys.executable, '-m', 'uvicorn', 'src.asgi:app', '--host', '127.0.0.1', '--log-level', 'warning', '--timeout-keep-alive', '120', '--port'
+    ],
+}
+
+PALAVRAS = ('memorias', 'casmurro', 'sertao', 'cortico', 'iracema', 'capitu')
+
+
+def popular(caminho: str, total_livros: int) -> str:
+    from src.models.user import db
+    from src.domain.entities import Livro, Usuario
+    from src.domain.value_objects.email import Email
+    from src.domain.value_objects.isbn import ISBN
+    from src.infrastructure.database.busca import criar_indice_busca
+    from src.infrastructure.repositories import SQLAlchemyLivroRepository, SQLAlchemyUsuarioRepository
+
+    app = criar_app(caminho, 'producao')
+    with app.app_context():
+        db.create_all()
+        usuario = Usuario(id='', nome='Benchmark', email=Email('bench@biblioteca.com'))
+        SQLAlchemyUsuarioRepository().salvar(usuario)
+        SQLAlchemyLivroRepository().salvar_em_lote([
+            Livro(id='', titulo=f'{PALAVRAS[i % len(PALAVRAS)].title()} volume {i}', autor=f'Autor {i % 97}',
+                  isbn=ISBN(isbn_sintetico(i)))
+            for i in range(total_livros)
+        ])
+        criar_indice_busca()
+        return usuario.id
+
+
+def porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def percentil(valores: list, p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+async def cliente(http: httpx.AsyncClient, usuario_id: str, requisicoes: int, latencias: list, erros: list) -> None:
+    for _ in range(requisicoes):
+        sorteio = random.random()
+        inicio = time.perf_counter()
+        try:
+            if sorteio < 0.45:
+                resposta = await http.get('/api/biblioteca/livros', params={'limit': 20})
+            elif sorteio < 0.9:
+                resposta = await http.get('/api/biblioteca/livros', params={'q': random.choice(PALAVRAS)[:4]})
+            else:
+                pagina = (await http.get('/api/biblioteca/livros', params={
+                    'limit': 1, 'disponiveis': 'true', 'after': f'{random.randrange(16):x}'
+                })).json()['livros']
+                if not pagina:
+                    continue
+                resposta = await http.post('/api/biblioteca/emprestimos', json={
+                    'livro_id': pagina[0]['id'], 'usuario_id': usuario_id
+                })
+            # 400 = livro já emprestado por outro cliente (regra de negócio, não falha)
+            if resposta.status_code >= 500:
+                erros.append(resposta.status_code)
+        except httpx.HTTPError as e:
+            erros.append(type(e).__name__)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+
+
+async def carga(url: str, usuario_id: str, clientes: int, requisicoes: int) -> tuple:
+    latencias, erros = [], []
+    limites = httpx.Limits(max_connections=clientes, max_keepalive_connections=clientes)
+    async with httpx.AsyncClient(base_url=url, limits=limites, timeout=120) as http:
+        inicio = time.perf_counter()
+        await asyncio.gather(*(cliente(http, usuario_id, requisicoes, latencias, erros) for _ in range(clientes)))
+        duracao = time.perf_counter() - inicio
+    return latencias, erros, duracao
+
+
+def aguardar(url: str, processo: subprocess.Popen) -> None:
+    for _ in range(200):
+        if processo.poll() is not None:
+            raise RuntimeError(f'servidor terminou com código {processo.returncode}')
+        try:
+            httpx.get(url + '/api/biblioteca/health', timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError('servidor não respondeu')
+
+
+def medir(nome: str, clientes: int, requisicoes: int, total_livros: int) -> None:
+    caminho = tempfile.mktemp(suffix='.db')
+    usuario_id = popular(caminho, total_livros)
+    porta = porta_livre()
+    url = f'http://127.0.0.1:{porta}'
+    ambiente = dict(os.environ, DATABASE_URL=f'sqlite:///{caminho}', PYTHONPATH=RAIZ)
+    processo = subprocess.Popen(
+        SERVIDORES[nome] + [str(porta)], cwd=RAIZ, env=ambiente,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        aguardar(url, processo)
+        latencias, erros, duracao = asyncio.run(carga(url, usuario_id, clientes, requisicoes))
+    finally:
+        processo.terminate()
+        processo.wait()
+        for sufixo in ('', '-wal', '-shm'):
+            if os.path.exists(caminho + sufixo):
+                os.remove(caminho + sufixo)
+
+    print(f'{nome:>6} | {clientes:>8} | {len(latencias):>11} | {len(erros):>5} | '
+          f'{percentil(latencias, 0.50):>8.1f} | {percentil(latencias, 0.99):>8.1f} | {len(latencias) / duracao:>7.1f}')
+
+
+if __name__ == '__main__':
+    clientes = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    requisicoes = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    total_livros = int(sys.argv[3]) if len(sys.argv) > 3 else 10000
+
+    print('  app | clientes | requisições | erros | p50 (ms) | p99 (ms) |   req/s')
+    for nome in SERVIDORES:
+        medir(nome, clientes, requisicoes, total_livros)
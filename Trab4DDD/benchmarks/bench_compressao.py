@@ -0,0 +1,84 @@
+# Benchmark: custo de CPU x bytes economizados da compressão das listagens
+#
+# Popula um banco com N livros e N empréstimos e mede, para cada N:
+# - o corpo JSON real de GET /api/biblioteca/livros e /emprestimos comprimido
+#   com gzip e brotli em vários níveis: tamanho, economia e tempo de CPU
+# - a requisição inteira pelo cliente de teste do Flask (JSON e NDJSON em
+#   streaming) sem compressão e com os níveis padrão do middleware
+#
+# Uso: python benchmarks/bench_compressao.py [10000,100000] [repeticoes]
+
+import os
+import sys
+import tempfile
+import time
+import zlib
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import brotli
+from bench_serializacao_listagens import popular
+
+NIVEIS = [('gzip', 1), ('gzip', 6), ('gzip', 9), ('br', 1), ('br', 4), ('br', 9)]
+
+
+def comprimir(codificacao: str, nivel: int, dados: bytes) -> bytes:
+    if codificacao == 'br':
+        return brotli.compress(dados, quality=nivel)
+    compressor = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+    return compressor.compress(dados) + compressor.flush()
+
+
+def menor_cpu(funcao, repeticoes: int) -> float:
+    """Menor tempo de CPU (ms) entre as repetições"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.process_time()
+        funcao()
+        tempos.append((time.process_time() - inicio) * 1000)
+    return min(tempos)
+
+
+def medir(total: int, repeticoes: int) -> None:
+    from src.infrastructure.database.config import PerfilBanco, inicializar_banco
+    from src.main import create_app
+
+    caminho = tempfile.mktemp(suffix='.db')
+    app = create_app(PerfilBanco(url=f'sqlite:///{caminho}', nome='producao'))
+    try:
+        with app.app_context():
+            inicializar_banco()
+        popular(app, total)
+        cliente = app.test_client()
+
+        for nome in ('livros', 'emprestimos'):
+            corpo = cliente.get(f'/api/biblioteca/{nome}').get_data()
+            print(f'\n{nome}, {total} linhas: JSON de {len(corpo) / 1024:.0f} KB')
+            print('  codificação | KB comprimido | economia | CPU (ms) | MB/s')
+            for codificacao, nivel in NIVEIS:
+                tamanho = len(comprimir(codificacao, nivel, corpo))
+                cpu = menor_cpu(lambda: comprimir(codificacao, nivel, corpo), repeticoes)
+                print(f'  {codificacao:>5} {nivel:<5} | {tamanho / 1024:>13.0f} | {1 - tamanho / len(corpo):>7.1%} | '
+                      f'{cpu:>8.1f} | {len(corpo) / 1024 / 1024 / (cpu / 1000):>5.0f}')
+
+            print('  requisição (CPU, ms) | identity | gzip  | br')
+            for rotulo, caminho_url in (('JSON', f'/api/biblioteca/{nome}'), ('NDJSON', '/api/biblioteca/livros?formato=ndjson')):
+                if rotulo == 'NDJSON' and nome != 'livros':
+                    continue
+                tempos = [
+                    menor_cpu(lambda: cliente.get(caminho_url, headers={'Accept-Encoding': codificacao}).get_data(), repeticoes)
+                    for codificacao in ('identity', 'gzip', 'br')
+                ]
+                print(f'  {rotulo:>20} | {tempos[0]:>8.1f} | {tempos[1]:>5.1f} | {tempos[2]:>5.1f}')
+    finally:
+        for sufixo in ('', '-wal', '-shm'):
+            if os.path.exists(caminho + sufixo):
+                os.remove(caminho + sufixo)
+
+
+if __name__ == '__main__':
+    tamanhos = [int(n) for n in (sys.argv[1] if len(sys.argv) > 1 else '10000,100000').split(',')]
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    for total in tamanhos:
+        medir(total, repeticoes)
@@ -0,0 +1,111 @@
+# Benchmark: throughput de empréstimos concorrentes por perfil de banco
+#
+# Simula vários workers (processos, como no gunicorn) emprestando livros
+# ao mesmo tempo no mesmo arquivo SQLite e compara o perfil 'padrao'
+# (pragmas originais) com o perfil 'producao' (WAL, synchronous=NORMAL,
+# busy_timeout, BEGIN IMMEDIATE).
+#
+# Uso: python benchmarks/bench_emprestimos_concorrentes.py [workers] [emprestimos_por_worker]
+
+import os
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from src.models.user import db
+from src.infrastructure.database.config import PerfilBanco, init_database
+
+
+def criar_app(caminho: str, perfil: str) -> Flask:
+    import src.infrastructure.database.models  # noqa: F401 (registra as tabelas)
+    app = Flask(__name__)
+    init_database(app, PerfilBanco(url=f'sqlite:///{caminho}', nome=perfil))
+    return app
+
+
+def isbn_sintetico(numero: int) -> str:
+    """Gera um ISBN-13 válido a partir de um número sequencial"""
+    base = f'{978000000000 + numero:012d}'
+    soma = sum(int(d) * (1 if i % 2 == 0 else 3) for i, d in enumerate(base))
+    return base + str((10 - soma % 10) % 10)
+
+
+def popular(caminho: str, perfil: str, total_livros: int) -> list:
+    from src.domain.entities import Livro, Usuario
+    from src.domain.value_objects.email import Email
+    from src.domain.value_objects.isbn import ISBN
+    from src.infrastructure.repositories import SQLAlchemyLivroRepository, SQLAlchemyUsuarioRepository
+
+    app = criar_app(caminho, perfil)
+    with app.app_context():
+        db.create_all()
+        usuario = Usuario(id='', nome='Benchmark', email=Email('bench@biblioteca.com'))
+        SQLAlchemyUsuarioRepository().salvar(usuario)
+        livros = [
+            Livro(id='', titulo=f'Livro {i}', autor='Autor', isbn=ISBN(isbn_sintetico(i)))
+            for i in range(total_livros)
+        ]
+        SQLAlchemyLivroRepository().salvar_em_lote(livros)
+        return usuario.id, [livro.id for livro in livros]
+
+
+def worker(argumentos) -> tuple:
+    caminho, perfil, usuario_id, livro_ids = argumentos
+    from src.application.use_cases import EmprestarLivroUseCase
+    from src.infrastructure.database.unit_of_work import SQLAlchemyUnitOfWork
+    from src.infrastructure.repositories import (
+        SQLAlchemyEmprestimoRepository, SQLAlchemyLivroRepository, SQLAlchemyUsuarioRepository
+    )
+
+    app = criar_app(caminho, perfil)
+    use_case = EmprestarLivroUseCase(
+        SQLAlchemyLivroRepository(), SQLAlchemyUsuarioRepository(), SQLAlchemyEmprestimoRepository(),
+        SQLAlchemyUnitOfWork()
+    )
+    sucessos = erros_lock = 0
+    for livro_id in livro_ids:
+        with app.app_context():
+            try:
+                use_case.executar(livro_id, usuario_id)
+                sucessos += 1
+            except Exception as e:
+                if 'locked' in str(e):
+                    erros_lock += 1
+                else:
+                    raise
+    return sucessos, erros_lock
+
+
+def medir(perfil: str, workers: int, por_worker: int) -> None:
+    caminho = tempfile.mktemp(suffix='.db')
+    usuario_id, livro_ids = popular(caminho, perfil, workers * por_worker)
+    fatias = [
+        (caminho, perfil, usuario_id, livro_ids[i * por_worker:(i + 1) * por_worker])
+        for i in range(workers)
+    ]
+
+    inicio = time.perf_counter()
+    with Pool(workers) as pool:
+        resultados = pool.map(worker, fatias)
+    duracao = time.perf_counter() - inicio
+
+    sucessos = sum(r[0] for r in resultados)
+    erros_lock = sum(r[1] for r in resultados)
+    print(f'{perfil:>9} | {workers:>7} | {sucessos:>9} | {erros_lock:>14} | {duracao:>8.2f} | {sucessos / duracao:>10.1f}')
+
+    for sufixo in ('', '-wal', '-shm'):
+        if os.path.exists(caminho + sufixo):
+            os.remove(caminho + sufixo)
+
+
+if __name__ == '__main__':
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    por_worker = int(sys.argv[2]) if len(sys.argv) > 2 else 250
+
+    print('   perfil | workers | sucessos | database locked | tempo(s) | emprest./s')
+    for perfil in ('padrao', 'producao'):
+        medir(perfil, workers, por_worker)
@@ -0,0 +1,90 @@
+# Benchmark: painel dos bibliotecários, listagens completas x /estatisticas
+#
+# Popula um banco com N livros, N empréstimos (parte com multa), N/5 doações
+# e N/4 registros de horas e mede, para cada N:
+# - o caminho antigo do painel: GET /livros + GET /emprestimos (contagem no navegador)
+# - GET /estatisticas sem cache (agregações no banco) e dentro da janela do cache
+#
+# Uso: python benchmarks/bench_estatisticas.py [10000,100000] [repeticoes]
+
+import os
+import sys
+import tempfile
+import uuid
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from bench_serializacao_listagens import melhor_tempo, popular
+
+
+def popular_creditos(app, total: int) -> None:
+    from src.models.user import db
+    from src.infrastructure.database.models import DoacaoModel, EmprestimoModel, HorasModel, LivroModel, UsuarioModel
+
+    with app.app_context():
+        usuario_id = db.session.execute(db.select(UsuarioModel.id)).scalars().first()
+        livro_ids = db.session.execute(db.select(LivroModel.id).limit(total // 5)).scalars().all()
+        db.session.execute(db.insert(DoacaoModel), [
+            {'id': str(uuid.uuid4()), 'livro_id': livro_id, 'usuario_id': usuario_id, 'creditos': 2.5}
+            for livro_id in livro_ids
+        ])
+        db.session.execute(db.insert(HorasModel), [
+            {'id': str(uuid.uuid4()), 'usuario_id': usuario_id, 'horas': 1.5, 'creditos': 3.0}
+            for _ in range(total // 4)
+        ])
+        # Um décimo dos empréstimos devolvidos com multa (nenhuma paga com créditos)
+        db.session.execute(
+            db.update(EmprestimoModel)
+            .where(EmprestimoModel.data_devolucao_real.is_not(None), db.text('rowid % 10 = 0'))
+            .values(multa=3.0)
+        )
+        db.session.commit()
+
+
+def medir(total: int, repeticoes: int) -> None:
+    from src.infrastructure.database.config import PerfilBanco, inicializar_banco
+    from src.main import create_app
+    from src.presentation import controllers
+
+    caminho = tempfile.mktemp(suffix='.db')
+    app = create_app(PerfilBanco(url=f'sqlite:///{caminho}', nome='producao'))
+    try:
+        with app.app_context():
+            inicializar_banco()
+        popular(app, total)
+        popular_creditos(app, total)
+        cliente = app.test_client()
+
+        listagens = [cliente.get(f'/api/biblioteca/{nome}').get_data() for nome in ('livros', 'emprestimos')]
+        tempo_listagens = melhor_tempo(
+            lambda: [cliente.get(f'/api/biblioteca/{nome}').get_data() for nome in ('livros', 'emprestimos')],
+            repeticoes
+        )
+
+        repositorio = controllers.estatisticas_repository
+        cache = repositorio.cache
+        estatisticas = cliente.get('/api/biblioteca/estatisticas').get_data()
+        tempo_cache = melhor_tempo(lambda: cliente.get('/api/biblioteca/estatisticas'), repeticoes)
+
+        def sem_cache():
+            cache.limpar()
+            cliente.get('/api/biblioteca/estatisticas')
+        tempo_sem_cache = melhor_tempo(sem_cache, repeticoes)
+
+        print(f'{total:>6} | {sum(map(len, listagens)) / 1024:>10.0f} KB | {tempo_listagens:>10.1f} | '
+              f'{len(estatisticas):>5} B | {tempo_sem_cache:>9.1f} | {tempo_cache:>9.2f}')
+    finally:
+        for sufixo in ('', '-wal', '-shm'):
+            if os.path.exists(caminho + sufixo):
+                os.remove(caminho + sufixo)
+
+
+if __name__ == '__main__':
+    tamanhos = [int(n) for n in (sys.argv[1] if len(sys.argv) > 1 else '10000,100000').split(',')]
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    print('                 listagens (antes)  |          /estatisticas')
+    print('linhas |       JSON    | tempo (ms) | JSON    | sem cache | em cache (ms)')
+    for total in tamanhos:
+        medir(total, repeticoes)
@@ -0,0 +1,127 @@
+# Benchmark: serialização JSON das listagens de livros e empréstimos
+#
+# Popula um banco com N livros e N empréstimos e mede, para cada N:
+# - só a serialização da resposta: cópia para dict + encoder da biblioteca
+#   padrão (caminho antigo), DTOs + encoder da biblioteca padrão e DTOs + orjson
+# - a requisição inteira (GET /api/biblioteca/livros e /emprestimos pelo
+#   cliente de teste do Flask) com cada provider
+#
+# Uso: python benchmarks/bench_serializacao_listagens.py [1000,10000,100000] [repeticoes]
+
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from bench_emprestimos_concorrentes import isbn_sintetico
+
+# Campos que os antigos _livro_para_dict/_emprestimo_para_dict copiavam
+CAMPOS_LEGADO = {
+    'livros': ('id', 'titulo', 'autor', 'isbn', 'disponivel'),
+    'emprestimos': ('id', 'livro_id', 'usuario_id', 'data_emprestimo', 'data_devolucao_prevista',
+                    'data_devolucao_real', 'multa', 'esta_em_atraso', 'dias_atraso'),
+}
+
+
+def popular(app, total: int) -> None:
+    from src.models.user import db
+    from src.infrastructure.database.models import EmprestimoModel, LivroModel, UsuarioModel
+
+    usuario_id = str(uuid.uuid4())
+    agora = datetime.now()
+    with app.app_context():
+        db.session.execute(db.insert(UsuarioModel), [
+            {'id': usuario_id, 'nome': 'Benchmark', 'email': 'bench@biblioteca.com', 'creditos': 0.0, 'ativo': True}
+        ])
+        livros = [
+            {'id': str(uuid.uuid4()), 'titulo': f'Livro {i}', 'autor': f'Autor {i % 97}',
+             'isbn': isbn_sintetico(i), 'disponivel': i % 2 == 0}
+            for i in range(total)
+        ]
+        db.session.execute(db.insert(LivroModel), livros)
+        db.session.execute(db.insert(EmprestimoModel), [
+            {'id': str(uuid.uuid4()), 'livro_id': livro['id'], 'usuario_id': usuario_id,
+             'data_emprestimo': agora - timedelta(days=i % 30),
+             'data_devolucao_prevista': agora + timedelta(days=14 - i % 30),
+             'data_devolucao_real': None if i % 3 else agora, 'multa': 0.0}
+            for i, livro in enumerate(livros)
+        ])
+        db.session.commit()
+
+
+def melhor_tempo(funcao, repeticoes: int) -> float:
+    """Menor tempo (ms) entre as repetições"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return min(tempos)
+
+
+def medir(total: int, repeticoes: int) -> None:
+    from src.application.use_cases import BuscarLivrosUseCase, ListarEmprestimosUseCase
+    from src.infrastructure.database.config import PerfilBanco, inicializar_banco
+    from src.infrastructure.repositories import SQLAlchemyEmprestimoRepository, SQLAlchemyLivroRepository
+    from src.main import create_app
+
+    caminho = tempfile.mktemp(suffix='.db')
+    app = create_app(PerfilBanco(url=f'sqlite:///{caminho}', nome='producao'))
+    provider = app.json
+    try:
+        with app.app_context():
+            inicializar_banco()
+        popular(app, total)
+
+        with app.app_context():
+            listagens = {
+                'livros': BuscarLivrosUseCase(SQLAlchemyLivroRepository()).executar(),
+                'emprestimos': ListarEmprestimosUseCase(SQLAlchemyEmprestimoRepository()).executar(),
+            }
+
+        for nome, dtos in listagens.items():
+            def legado():
+                # Caminho antigo: cópia de cada DTO para dict + json da biblioteca padrão
+                provider.orjson_ativo = False
+                copia = [{campo: getattr(dto, campo) for campo in CAMPOS_LEGADO[nome]} for dto in dtos]
+                return provider.response({nome: copia, 'total': len(copia)})
+
+            def direto(orjson_ativo: bool):
+                provider.orjson_ativo = orjson_ativo
+                return provider.response({nome: dtos, 'total': len(dtos)})
+
+            with app.app_context():
+                tamanho = len(direto(True).get_data())
+                tempos = (
+                    melhor_tempo(legado, repeticoes),
+                    melhor_tempo(lambda: direto(False), repeticoes),
+                    melhor_tempo(lambda: direto(True), repeticoes),
+                )
+
+            cliente = app.test_client()
+            requisicao = []
+            for orjson_ativo in (False, True):
+                provider.orjson_ativo = orjson_ativo
+                requisicao.append(melhor_tempo(lambda: cliente.get(f'/api/biblioteca/{nome}'), repeticoes))
+
+            print(f'{nome:>11} | {total:>6} | {tamanho / 1024:>8.0f} | {tempos[0]:>10.1f} | {tempos[1]:>10.1f} | '
+                  f'{tempos[2]:>10.1f} | {requisicao[0]:>11.1f} | {requisicao[1]:>11.1f}')
+    finally:
+        for sufixo in ('', '-wal', '-shm'):
+            if os.path.exists(caminho + sufixo):
+                os.remove(caminho + sufixo)
+
+
+if __name__ == '__main__':
+    tamanhos = [int(n) for n in (sys.argv[1] if len(sys.argv) > 1 else '1000,10000,100000').split(',')]
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    print('                         serialização (ms)                       | requisição inteira (ms)')
+    print('    listagem | linhas | JSON (KB) | dict+json | DTO+json | DTO+orjson | json        | orjson')
+    for total in tamanhos:
+        medir(total, repeticoes)
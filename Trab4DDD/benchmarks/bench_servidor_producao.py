@@ -0,0 +1,73 @@
+# Benchmark: vazão do servidor de desenvolvimento x gunicorn (gunicorn.conf.py)
+#
+# Sobe a app Flask com app.run(debug=True) (como em python src/main.py) e com
+# o gunicorn em algumas combinações de workers/threads, e mede vazão e
+# latência com o mesmo tráfego misto do bench_asgi_vs_flask.
+#
+# Uso: python benchmarks/bench_servidor_producao.py [clientes] [requisicoes_por_cliente] [livros]
+
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+
+from bench_asgi_vs_flask import RAIZ, aguardar, carga, percentil, popular, porta_livre
+
+# nome -> (comando, variáveis de ambiente extras); a porta é repassada em PORTA
+SERVIDORES = {
+    'debug (app.run)': (
+        [sys.executable, '-c',
+         'import os; from src.main import app; app.run(host="127.0.0.1", port=int(os.environ["PORTA"]), debug=True)'],
+        {}
+    ),
+    'gunicorn 1x4': (
+        ['gunicorn', '-c', 'gunicorn.conf.py', 'src.main:app'],
+        {'WEB_WORKERS': '1', 'WEB_THREADS': '4'}
+    ),
+    'gunicorn padrão': (
+        ['gunicorn', '-c', 'gunicorn.conf.py', 'src.main:app'],
+        {}
+    ),
+}
+
+
+def medir(nome: str, clientes: int, requisicoes: int, total_livros: int) -> None:
+    comando, extras = SERVIDORES[nome]
+    caminho = tempfile.mktemp(suffix='.db')
+    usuario_id = popular(caminho, total_livros)
+    porta = porta_livre()
+    url = f'http://127.0.0.1:{porta}'
+    ambiente = dict(
+        os.environ, DATABASE_URL=f'sqlite:///{caminho}', PYTHONPATH=RAIZ,
+        PORTA=str(porta), WEB_BIND=f'127.0.0.1:{porta}', **extras
+    )
+    # Sessão própria: o reloader do modo debug e os workers do gunicorn são processos filhos
+    processo = subprocess.Popen(
+        comando, cwd=RAIZ, env=ambiente, start_new_session=True,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        aguardar(url, processo)
+        latencias, erros, duracao = asyncio.run(carga(url, usuario_id, clientes, requisicoes))
+    finally:
+        os.killpg(processo.pid, signal.SIGTERM)
+        processo.wait()
+        for sufixo in ('', '-wal', '-shm'):
+            if os.path.exists(caminho + sufixo):
+                os.remove(caminho + sufixo)
+
+    print(f'{nome:>16} | {clientes:>8} | {len(latencias):>11} | {len(erros):>5} | '
+          f'{percentil(latencias, 0.50):>8.1f} | {percentil(latencias, 0.99):>8.1f} | {len(latencias) / duracao:>7.1f}')
+
+
+if __name__ == '__main__':
+    clientes = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    requisicoes = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    total_livros = int(sys.argv[3]) if len(sys.argv) > 3 else 10000
+
+    print(f'CPUs: {os.cpu_count()}')
+    print('        servidor | clientes | requisições | erros | p50 (ms) | p99 (ms) |   req/s')
+    for nome in SERVIDORES:
+        medir(nome, clientes, requisicoes, total_livros)
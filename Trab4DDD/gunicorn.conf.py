@@ -0,0 +1,79 @@
+# Configuração do gunicorn para produção: gunicorn -c gunicorn.conf.py src.main:app
+#
+# Modelo preforked: o processo mestre inicializa o banco uma única vez e
+# cada worker atende requisições em threads. Tudo é configurável por
+# variáveis de ambiente (valores padrão entre parênteses):
+#
+#   WEB_BIND (0.0.0.0:5001)            WEB_WORKERS (2 x CPUs + 1)
+#   WEB_THREADS (4)                    WEB_PRELOAD (1)
+#   WEB_MAX_REQUESTS (1000)            WEB_MAX_REQUESTS_JITTER (100)
+#   WEB_TIMEOUT (30)                   WEB_GRACEFUL_TIMEOUT (30)
+#   WEB_KEEPALIVE (5)
+#
+# Recarga graciosa: kill -HUP <pid do mestre> sobe workers novos e encerra os
+# antigos após terminarem as requisições em andamento. Com WEB_PRELOAD=1 o
+# código é carregado no mestre; para trocar de versão use kill -USR2 (novo
+# mestre) seguido de kill -TERM no mestre antigo.
+
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+
+
+def _inteiro(nome: str, padrao: int) -> int:
+    return int(os.environ.get(nome, padrao))
+
+
+def _booleano(nome: str, padrao: bool) -> bool:
+    return os.environ.get(nome, '1' if padrao else '0').lower() in ('1', 'true', 'sim', 'yes')
+
+
+bind = os.environ.get('WEB_BIND', '0.0.0.0:5001')
+workers = _inteiro('WEB_WORKERS', multiprocessing.cpu_count() * 2 + 1)
+threads = _inteiro('WEB_THREADS', 4)
+worker_class = 'gthread' if threads > 1 else 'sync'
+preload_app = _booleano('WEB_PRELOAD', True)
+
+# Reciclagem de workers: cada worker é substituído após N requisições
+# (jitter evita que todos reiniciem ao mesmo tempo); 0 desliga
+max_requests = _inteiro('WEB_MAX_REQUESTS', 1000)
+max_requests_jitter = _inteiro('WEB_MAX_REQUESTS_JITTER', 100)
+
+timeout = _inteiro('WEB_TIMEOUT', 30)
+graceful_timeout = _inteiro('WEB_GRACEFUL_TIMEOUT', 30)
+keepalive = _inteiro('WEB_KEEPALIVE', 5)
+
+accesslog = os.environ.get('WEB_ACCESSLOG') or None
+errorlog = '-'
+
+# ETag das listagens: com vários workers as versões das coleções precisam ser
+# compartilhadas (definido aqui, antes de a aplicação ser carregada)
+if workers > 1 and not os.environ.get('VERSOES_COLECOES_DIR'):
+    os.environ['VERSOES_COLECOES_DIR'] = tempfile.mkdtemp(prefix='biblioteca-versoes-')
+
+
+def on_starting(_servidor):
+    # Passo único antes de subir os workers: tabelas e índice de busca.
+    # Roda em outro processo para o mestre não importar a aplicação (sem
+    # preload, cada worker novo, inclusive após HUP, carrega o código atual).
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'src.main', 'init-db'], check=True)
+
+
+def child_exit(_servidor, worker):
+    # Métricas em modo multiprocesso: descarta os contadores do worker encerrado
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def post_fork(servidor, _worker):
+    # Com preload o engine foi criado no mestre: descarta conexões herdadas
+    if servidor.cfg.preload_app:
+        from src.main import app
+        from src.models.user import db
+
+        with app.app_context():
+            db.engine.dispose(close=False)
@@ -9,7 +9,7 @@ from datetime import datetime
 
 @dataclass
 class LivroDTO:
-    """DTO para transferência de dados de Livro"""
+    """DTO para transferência de dados de Livro (serializado direto nas respostas)"""
     # Campos obrigatórios primeiro
     titulo: str
     autor: str
@@ -18,10 +18,6 @@ class LivroDTO:
     # Campos opcionais depois
     id: Optional[str] = None
     disponivel: bool = True
-    editora: Optional[str] = None
-    ano_publicacao: Optional[int] = None
-    numero_paginas: Optional[int] = None
-    categoria: Optional[str] = None
 
 @dataclass
 class UsuarioDTO:
@@ -39,7 +35,7 @@ class UsuarioDTO:
 
 @dataclass
 class EmprestimoDTO:
-    """DTO para transferência de dados de Emprestimo"""
+    """DTO para transferência de dados de Emprestimo (serializado direto nas respostas)"""
     # Campos obrigatórios primeiro
     livro_id: str
     usuario_id: str
@@ -51,18 +47,69 @@ class EmprestimoDTO:
     data_devolucao_real: Optional[datetime] = None
     multa: float = 0.0
     devolvido: bool = False
+    esta_em_atraso: bool = False
+    dias_atraso: int = 0
+
+@dataclass
+class EmprestimoAtrasadoDTO:
+    """DTO para um item do relatório de atrasos"""
+    emprestimo_id: str
+    livro_id: str
+    usuario_id: str
+    data_devolucao_prevista: str
+    dias_atraso: int
+    multa_projetada: float
+
+@dataclass
+class ResumoAtrasosDTO:
+    """DTO para totais de atrasos (também usado pelo snapshot diário)"""
+    data: str
+    total_emprestimos: int
+    total_dias_atraso: int
+    multa_projetada: float
+    gerado_em: str
+
+@dataclass
+class EstatisticasDTO:
+    """DTO com os totais do painel dos bibliotecários"""
+    referencia: str
+    total_livros: int
+    livros_disponiveis: int
+    livros_emprestados: int
+    emprestimos_ativos: int
+    emprestimos_devolvidos: int
+    emprestimos_em_atraso: int
+    total_dias_atraso: int
+    multa_projetada: float
+    multas_pendentes: int
+    valor_multas_pendentes: float
+    total_doacoes: int
+    creditos_doacoes: float
+    registros_horas: int
+    horas_doadas: float
+    creditos_horas: float
+    creditos_emitidos: float
+
+@dataclass
+class RelatorioAtrasosDTO:
+    """DTO para o relatório de empréstimos em atraso"""
+    referencia: str
+    resumo: ResumoAtrasosDTO
+    emprestimos: List[EmprestimoAtrasadoDTO] = field(default_factory=list)
 
 @dataclass
 class DoacaoDTO:
     """DTO para transferência de dados de Doacao"""
     # Campos obrigatórios primeiro
     livro_id: str
-    doador_nome: str
-    doador_email: str
     
     # Campos opcionais depois
+    usuario_id: Optional[str] = None
+    doador_nome: Optional[str] = None
+    doador_email: Optional[str] = None
     id: Optional[str] = None
     data_doacao: Optional[datetime] = None
+    creditos: Optional[float] = None
     observacoes: Optional[str] = None
 
 # DTOs para requests da API (ESTES ESTAVAM FALTANDO!)
@@ -127,6 +174,65 @@ class PaginationDTO:
     next_page: Optional[int] = None
     prev_page: Optional[int] = None
 
+@dataclass
+class ErroLoteDTO:
+    """DTO para erro de uma linha em operações em lote"""
+    linha: int
+    erro: str
+    referencia: Optional[str] = None
+
+@dataclass
+class ResultadoLoteDTO:
+    """DTO para resultado de operações em lote"""
+    criados: List[str] = field(default_factory=list)
+    erros: List[ErroLoteDTO] = field(default_factory=list)
+
+@dataclass
+class ItemLoteDTO:
+    """DTO para o resultado de cada item de um empréstimo/devolução em lote"""
+    referencia: str
+    sucesso: bool
+    emprestimo_id: Optional[str] = None
+    multa: Optional[float] = None
+    erro: Optional[str] = None
+
+@dataclass
+class MovimentoCreditoDTO:
+    """DTO de um lançamento do extrato de créditos"""
+    id: str
+    valor: float
+    origem: str
+    data: str
+    referencia_id: Optional[str] = None
+
+@dataclass
+class ExtratoCreditosDTO:
+    """DTO do saldo de créditos com os lançamentos mais recentes"""
+    usuario_id: str
+    saldo: float
+    movimentos: List[MovimentoCreditoDTO] = field(default_factory=list)
+
+@dataclass
+class PaginaBuscaDTO:
+    """DTO para uma página de resultados da busca textual"""
+    termo: str
+    items: List
+    page: int
+    per_page: int
+    has_next: bool = False
+    next_page: Optional[int] = None
+
+@dataclass
+class CursorPaginationDTO:
+    """DTO para paginação por cursor (keyset)"""
+    # Campos obrigatórios primeiro
+    items: List
+    limit: int
+    
+    # Campos opcionais depois
+    next_cursor: Optional[str] = None
+    has_next: bool = False
+
 # Funções auxiliares para conversão
 def livro_to_dto(livro) -> LivroDTO:
     """Converte Entity Livro para DTO"""
@@ -135,11 +241,7 @@ def livro_to_dto(livro) -> LivroDTO:
         autor=livro.autor,
         isbn=str(livro.isbn),
         id=livro.id,
-        disponivel=livro.disponivel,
-        editora=getattr(livro, 'editora', None),
-        ano_publicacao=getattr(livro, 'ano_publicacao', None),
-        numero_paginas=getattr(livro, 'numero_paginas', None),
-        categoria=getattr(livro, 'categoria', None)
+        disponivel=livro.disponivel
     )
 
 def usuario_to_dto(usuario) -> UsuarioDTO:
@@ -177,4 +279,5 @@ class HorasDTO:
     # Campos opcionais depois
     id: Optional[str] = None
     data: Optional[datetime] = None
+    tipo: Optional[str] = None
     creditos: Optional[float] = None
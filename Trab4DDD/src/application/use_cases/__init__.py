@@ -1,11 +1,25 @@
 # Application Layer - Use Cases
 
-from typing import List, Optional
-from src.domain.entities import Livro, Usuario, Emprestimo, Doacao, Horas
-from src.domain.repositories import LivroRepository, UsuarioRepository, EmprestimoRepository, DoacaoRepository, HorasRepository
+import re
+from contextlib import nullcontext
+from datetime import date, datetime
+from typing import Iterator, List, Optional
+from src.domain.entities import (
+    Livro, Usuario, Emprestimo, Doacao, Horas, MovimentoCredito, MULTA_POR_DIA,
+    ORIGEM_DOACAO_LIVRO, ORIGEM_DOACAO_HORAS, ORIGEM_MULTA
+)
+from src.domain.repositories import (
+    LivroRepository, UsuarioRepository, EmprestimoRepository, DoacaoRepository, HorasRepository, UnitOfWork,
+    SnapshotAtrasosRepository, CreditoRepository, EstatisticasRepository
+)
+from src.domain.value_objects.atraso import ResumoAtrasos
 from src.domain.value_objects.isbn import ISBN
 from src.domain.value_objects.email import Email
-from src.application.dtos import LivroDTO, UsuarioDTO, EmprestimoDTO, DoacaoDTO, HorasDTO
+from src.application.dtos import (
+    LivroDTO, UsuarioDTO, EmprestimoDTO, DoacaoDTO, HorasDTO, CursorPaginationDTO, PaginaBuscaDTO, ErroLoteDTO, ResultadoLoteDTO,
+    EmprestimoAtrasadoDTO, ResumoAtrasosDTO, RelatorioAtrasosDTO, ItemLoteDTO, MovimentoCreditoDTO, ExtratoCreditosDTO,
+    EstatisticasDTO
+)
 
 class CriarLivroUseCase:
     """
@@ -40,6 +54,71 @@ class CriarLivroUseCase:
         
         return livro.id
 
+class CriarLivrosEmLoteUseCase:
+    """
+    Use Case: Criar Livros em Lote
+    Importa um catálogo inteiro verificando duplicidades em conjunto
+    e inserindo em transações por bloco
+    """
+    
+    def __init__(self, livro_repository: LivroRepository, tamanho_bloco: int = 1000):
+        self._livro_repository = livro_repository
+        self._tamanho_bloco = tamanho_bloco
+    
+    def executar(self, dtos: List[LivroDTO]) -> ResultadoLoteDTO:
+        """
+        Executa a importação; linhas inválidas são reportadas sem abortar o lote
+        """
+        resultado = ResultadoLoteDTO()
+        candidatos = []  # (linha, livro)
+        isbns_no_lote = set()
+        
+        # Validar cada linha (regras do domínio e duplicidade dentro do próprio lote)
+        for linha, dto in enumerate(dtos, start=1):
+            if not dto.titulo or not dto.autor or not dto.isbn:
+                resultado.erros.append(ErroLoteDTO(linha, "Dados obrigatórios: titulo, autor, isbn", dto.isbn))
+                continue
+            if dto.isbn in isbns_no_lote:
+                resultado.erros.append(ErroLoteDTO(linha, f"ISBN {dto.isbn} repetido no lote", dto.isbn))
+                continue
+            try:
+                livro = Livro(id="", titulo=dto.titulo, autor=dto.autor, isbn=ISBN(dto.isbn))
+            except ValueError as e:
+                resultado.erros.append(ErroLoteDTO(linha, str(e), dto.isbn))
+                continue
+            isbns_no_lote.add(dto.isbn)
+            candidatos.append((linha, livro))
+        
+        # Verificar duplicidade no banco com uma consulta em conjunto
+        existentes = self._livro_repository.buscar_isbns_existentes([str(livro.isbn) for _, livro in candidatos])
+        novos = []
+        for linha, livro in candidatos:
+            if str(livro.isbn) in existentes:
+                resultado.erros.append(ErroLoteDTO(linha, f"Já existe um livro com ISBN {livro.isbn}", str(livro.isbn)))
+            else:
+                novos.append((linha, livro))
+        
+        # Inserir em blocos, uma transação por bloco
+        for inicio in range(0, len(novos), self._tamanho_bloco):
+            bloco = novos[inicio:inicio + self._tamanho_bloco]
+            try:
+                self._livro_repository.salvar_em_lote([livro for _, livro in bloco])
+                resultado.criados.extend(livro.id for _, livro in bloco)
+            except ValueError:
+                # Conflito concorrente: isolar as linhas com problema
+                self._inserir_individualmente(bloco, resultado)
+        
+        resultado.erros.sort(key=lambda erro: erro.linha)
+        return resultado
+    
+    def _inserir_individualmente(self, bloco, resultado: ResultadoLoteDTO) -> None:
+        for linha, livro in bloco:
+            try:
+                self._livro_repository.salvar_em_lote([livro])
+                resultado.criados.append(livro.id)
+            except ValueError as e:
+                resultado.erros.append(ErroLoteDTO(linha, str(e), str(livro.isbn)))
+
 class BuscarLivrosUseCase:
     """
     Use Case: Buscar Livros
@@ -59,6 +138,68 @@ class BuscarLivrosUseCase:
         
         return [self._livro_para_dto(livro) for livro in livros]
     
+    def executar_paginado(
+        self,
+        limite: int,
+        apos_id: Optional[str] = None,
+        apenas_disponiveis: bool = False
+    ) -> CursorPaginationDTO:
+        """
+        Busca uma página de livros a partir do cursor informado
+        """
+        # Busca um item a mais para saber se existe próxima página
+        livros = self._livro_repository.buscar_pagina(limite + 1, apos_id, apenas_disponiveis)
+        tem_proxima = len(livros) > limite
+        livros = livros[:limite]
+        
+        return CursorPaginationDTO(
+            items=[self._livro_para_dto(livro) for livro in livros],
+            limit=limite,
+            next_cursor=livros[-1].id if tem_proxima else None,
+            has_next=tem_proxima
+        )
+    
+    def executar_busca(
+        self,
+        termo: str,
+        pagina: int = 1,
+        por_pagina: int = 20,
+        apenas_disponiveis: bool = False
+    ) -> PaginaBuscaDTO:
+        """
+        Busca textual por título, autor ou ISBN (prefixo, sem acentos),
+        ordenada por relevância e paginada
+        """
+        if not termo or not termo.strip():
+            raise ValueError("Termo de busca não pode ser vazio")
+        if not re.search(r'\w', termo):
+            # Só pontuação/operadores (ex.: "!!!", '"', "-"): não sobra palavra para buscar
+            raise ValueError("Termo de busca deve conter letras ou números")
+        if pagina < 1:
+            raise ValueError("Página deve ser maior ou igual a 1")
+        
+        # Busca um item a mais para saber se existe próxima página
+        livros = self._livro_repository.pesquisar(
+            termo, por_pagina + 1, (pagina - 1) * por_pagina, apenas_disponiveis
+        )
+        tem_proxima = len(livros) > por_pagina
+        
+        return PaginaBuscaDTO(
+            termo=termo,
+            items=[self._livro_para_dto(livro) for livro in livros[:por_pagina]],
+            page=pagina,
+            per_page=por_pagina,
+            has_next=tem_proxima,
+            next_page=pagina + 1 if tem_proxima else None
+        )
+    
+    def executar_stream(self, apenas_disponiveis: bool = False) -> Iterator[LivroDTO]:
+        """
+        Percorre o catálogo inteiro sem materializar a lista
+        """
+        for livro in self._livro_repository.iterar_todos(apenas_disponiveis):
+            yield self._livro_para_dto(livro)
+    
     def _livro_para_dto(self, livro: Livro) -> LivroDTO:
         return LivroDTO(
             id=livro.id,
@@ -108,47 +249,50 @@ class EmprestarLivroUseCase:
         self, 
         livro_repository: LivroRepository,
         usuario_repository: UsuarioRepository,
-        emprestimo_repository: EmprestimoRepository
+        emprestimo_repository: EmprestimoRepository,
+        unit_of_work: Optional[UnitOfWork] = None
     ):
         self._livro_repository = livro_repository
         self._usuario_repository = usuario_repository
         self._emprestimo_repository = emprestimo_repository
+        self._unit_of_work = unit_of_work
     
     def executar(self, livro_id: str, usuario_id: str) -> str:
         """
         Executa o empréstimo de um livro
         """
-        # Buscar livro
-        livro = self._livro_repository.buscar_por_id(livro_id)
-        if not livro:
-            raise ValueError(f"Livro não encontrado: {livro_id}")
+        with self._unit_of_work or nullcontext():
+            # Buscar livro
+            livro = self._livro_repository.buscar_por_id(livro_id)
+            if not livro:
+                raise ValueError(f"Livro não encontrado: {livro_id}")
         
-        # Buscar usuário
-        usuario = self._usuario_repository.buscar_por_id(usuario_id)
-        if not usuario:
-            raise ValueError(f"Usuário não encontrado: {usuario_id}")
+            # Buscar usuário
+            usuario = self._usuario_repository.buscar_por_id(usuario_id)
+            if not usuario:
+                raise ValueError(f"Usuário não encontrado: {usuario_id}")
         
-        # Verificar se usuário está ativo
-        if not usuario.ativo:
-            raise ValueError("Usuário não está ativo")
+            # Verificar se usuário está ativo
+            if not usuario.ativo:
+                raise ValueError("Usuário não está ativo")
         
-        # Emprestar livro (regra de domínio)
-        livro.emprestar()
+            # Emprestar livro (regra de domínio)
+            livro.emprestar()
         
-        # Criar empréstimo
-        emprestimo = Emprestimo(
-            id="",  # Será gerado automaticamente
-            livro_id=livro_id,
-            usuario_id=usuario_id,
-            data_emprestimo=None,  # Será definida automaticamente
-            data_devolucao_prevista=None  # Será calculada automaticamente
-        )
+            # Criar empréstimo
+            emprestimo = Emprestimo(
+                id="",  # Será gerado automaticamente
+                livro_id=livro_id,
+                usuario_id=usuario_id,
+                data_emprestimo=None,  # Será definida automaticamente
+                data_devolucao_prevista=None  # Será calculada automaticamente
+            )
         
-        # Salvar alterações
-        self._livro_repository.salvar(livro)
-        self._emprestimo_repository.salvar(emprestimo)
+            # Salvar alterações
+            self._livro_repository.salvar(livro)
+            self._emprestimo_repository.salvar(emprestimo)
         
-        return emprestimo.id
+            return emprestimo.id
 
 class DevolverLivroUseCase:
     """
@@ -160,45 +304,215 @@ class DevolverLivroUseCase:
         self,
         livro_repository: LivroRepository,
         emprestimo_repository: EmprestimoRepository,
-        usuario_repository: UsuarioRepository
+        usuario_repository: UsuarioRepository,
+        credito_repository: CreditoRepository,
+        unit_of_work: Optional[UnitOfWork] = None
     ):
         self._livro_repository = livro_repository
         self._emprestimo_repository = emprestimo_repository
         self._usuario_repository = usuario_repository
+        self._credito_repository = credito_repository
+        self._unit_of_work = unit_of_work
     
     def executar(self, emprestimo_id: str) -> float:
         """
         Executa a devolução de um livro
         Retorna o valor da multa, se houver
         """
-        # Buscar empréstimo
-        emprestimo = self._emprestimo_repository.buscar_por_id(emprestimo_id)
-        if not emprestimo:
-            raise ValueError(f"Empréstimo não encontrado: {emprestimo_id}")
-        
-        # Buscar livro
-        livro = self._livro_repository.buscar_por_id(emprestimo.livro_id)
-        if not livro:
-            raise ValueError(f"Livro não encontrado: {emprestimo.livro_id}")
-        # Buscar Usuário
-        usuario = self._usuario_repository.buscar_por_id(emprestimo.usuario_id)
-        if not usuario:
-            raise ValueError(f"Usuário não encontrado: {emprestimo.usuario_id}")
-        
-        # Devolver livro (regras de domínio)
-        emprestimo.devolver()
-        livro.devolver()
-        
-        # Salvar alterações
-        self._emprestimo_repository.salvar(emprestimo)
-        self._livro_repository.salvar(livro)
+        with self._unit_of_work or nullcontext():
+            # Buscar empréstimo
+            emprestimo = self._emprestimo_repository.buscar_por_id(emprestimo_id)
+            if not emprestimo:
+                raise ValueError(f"Empréstimo não encontrado: {emprestimo_id}")
+        
+            # Buscar livro
+            livro = self._livro_repository.buscar_por_id(emprestimo.livro_id)
+            if not livro:
+                raise ValueError(f"Livro não encontrado: {emprestimo.livro_id}")
+            # Buscar Usuário
+            usuario = self._usuario_repository.buscar_por_id(emprestimo.usuario_id)
+            if not usuario:
+                raise ValueError(f"Usuário não encontrado: {emprestimo.usuario_id}")
+        
+            # Devolver livro (regras de domínio)
+            emprestimo.devolver()
+            livro.devolver()
+        
+            # Salvar alterações
+            self._emprestimo_repository.salvar(emprestimo)
+            self._livro_repository.salvar(livro)
 
-        if usuario.creditos < emprestimo.multa:
-            return emprestimo.multa
-        else:
-            usuario.creditos -= emprestimo.multa
-            self._usuario_repository.salvar(usuario)
-            return usuario.creditos
+            if emprestimo.multa <= 0:
+                return usuario.creditos
+
+            # Multa paga com créditos quando houver saldo (débito condicional no extrato)
+            saldo = self._credito_repository.lancar(
+                MovimentoCredito(
+                    id="",  # Será gerado automaticamente
+                    usuario_id=usuario.id,
+                    valor=-emprestimo.multa,
+                    origem=ORIGEM_MULTA,
+                    referencia_id=emprestimo.id
+                ),
+                exigir_saldo=True
+            )
+            if saldo is None:
+                return emprestimo.multa
+            usuario.sincronizar_creditos(saldo)
+            return saldo
+
+class EmprestarLivrosEmLoteUseCase:
+    """
+    Use Case: Emprestar Livros em Lote
+    Atende a cesta inteira do balcão: valida o usuário uma vez, busca todos
+    os livros com uma consulta e grava todos os empréstimos em uma transação
+    """
+    
+    def __init__(
+        self,
+        livro_repository: LivroRepository,
+        usuario_repository: UsuarioRepository,
+        emprestimo_repository: EmprestimoRepository,
+        unit_of_work: Optional[UnitOfWork] = None
+    ):
+        self._livro_repository = livro_repository
+        self._usuario_repository = usuario_repository
+        self._emprestimo_repository = emprestimo_repository
+        self._unit_of_work = unit_of_work
+    
+    def executar(self, usuario_id: str, livro_ids: List[str]) -> List[ItemLoteDTO]:
+        """
+        Empresta os livros ao usuário; retorna o resultado de cada livro
+        """
+        with self._unit_of_work or nullcontext():
+            # Validar usuário uma única vez
+            usuario = self._usuario_repository.buscar_por_id(usuario_id)
+            if not usuario:
+                raise ValueError(f"Usuário não encontrado: {usuario_id}")
+            if not usuario.ativo:
+                raise ValueError("Usuário não está ativo")
+            
+            # Buscar (e travar) todos os livros da cesta de uma vez
+            livros = {livro.id: livro for livro in self._livro_repository.buscar_por_ids(livro_ids, bloquear=True)}
+            
+            resultados = []
+            emprestados = []
+            emprestimos = []
+            for livro_id in livro_ids:
+                livro = livros.get(livro_id)
+                if not livro:
+                    resultados.append(ItemLoteDTO(livro_id, False, erro=f"Livro não encontrado: {livro_id}"))
+                    continue
+                try:
+                    # Emprestar livro (regra de domínio); repetido na cesta falha aqui
+                    livro.emprestar()
+                except ValueError as e:
+                    resultados.append(ItemLoteDTO(livro_id, False, erro=str(e)))
+                    continue
+                
+                emprestimo = Emprestimo(
+                    id="",  # Será gerado automaticamente
+                    livro_id=livro_id,
+                    usuario_id=usuario_id,
+                    data_emprestimo=None,  # Será definida automaticamente
+                    data_devolucao_prevista=None  # Será calculada automaticamente
+                )
+                emprestados.append(livro)
+                emprestimos.append(emprestimo)
+                resultados.append(ItemLoteDTO(livro_id, True, emprestimo_id=emprestimo.id))
+            
+            # Salvar alterações
+            for livro in emprestados:
+                self._livro_repository.salvar(livro)
+            self._emprestimo_repository.salvar_em_lote(emprestimos)
+            
+            return resultados
+
+class DevolverLivrosEmLoteUseCase:
+    """
+    Use Case: Devolver Livros em Lote
+    Processa todas as devoluções do balcão em uma única transação
+    """
+    
+    def __init__(
+        self,
+        livro_repository: LivroRepository,
+        emprestimo_repository: EmprestimoRepository,
+        usuario_repository: UsuarioRepository,
+        credito_repository: CreditoRepository,
+        unit_of_work: Optional[UnitOfWork] = None
+    ):
+        self._livro_repository = livro_repository
+        self._emprestimo_repository = emprestimo_repository
+        self._usuario_repository = usuario_repository
+        self._credito_repository = credito_repository
+        self._unit_of_work = unit_of_work
+    
+    def executar(self, emprestimo_ids: List[str]) -> List[ItemLoteDTO]:
+        """
+        Devolve os empréstimos informados; retorna o resultado (e a multa) de cada um
+        """
+        with self._unit_of_work or nullcontext():
+            # Buscar empréstimos, livros e usuários com uma consulta IN cada
+            emprestimos = {
+                emp.id: emp for emp in self._emprestimo_repository.buscar_por_ids(emprestimo_ids, bloquear=True)
+            }
+            livros = {
+                livro.id: livro
+                for livro in self._livro_repository.buscar_por_ids([emp.livro_id for emp in emprestimos.values()])
+            }
+            usuarios = {
+                usuario.id: usuario
+                for usuario in self._usuario_repository.buscar_por_ids([emp.usuario_id for emp in emprestimos.values()])
+            }
+            
+            resultados = []
+            devolvidos = []
+            for emprestimo_id in emprestimo_ids:
+                emprestimo = emprestimos.get(emprestimo_id)
+                if not emprestimo:
+                    resultados.append(ItemLoteDTO(emprestimo_id, False, erro=f"Empréstimo não encontrado: {emprestimo_id}"))
+                    continue
+                livro = livros.get(emprestimo.livro_id)
+                if not livro:
+                    resultados.append(ItemLoteDTO(emprestimo_id, False, erro=f"Livro não encontrado: {emprestimo.livro_id}"))
+                    continue
+                usuario = usuarios.get(emprestimo.usuario_id)
+                if not usuario:
+                    resultados.append(ItemLoteDTO(emprestimo_id, False, erro=f"Usuário não encontrado: {emprestimo.usuario_id}"))
+                    continue
+                try:
+                    # Devolver livro (regras de domínio)
+                    emprestimo.devolver()
+                except ValueError as e:
+                    resultados.append(ItemLoteDTO(emprestimo_id, False, erro=str(e)))
+                    continue
+                livro.devolver()
+                
+                devolvidos.append((emprestimo, livro, usuario))
+                resultados.append(ItemLoteDTO(emprestimo_id, True, emprestimo_id=emprestimo_id, multa=emprestimo.multa))
+            
+            # Salvar alterações
+            for emprestimo, livro, usuario in devolvidos:
+                self._emprestimo_repository.salvar(emprestimo)
+                self._livro_repository.salvar(livro)
+                
+                # Multa paga com créditos quando houver saldo, como na devolução individual
+                if emprestimo.multa > 0:
+                    saldo = self._credito_repository.lancar(
+                        MovimentoCredito(
+                            id="",  # Será gerado automaticamente
+                            usuario_id=usuario.id,
+                            valor=-emprestimo.multa,
+                            origem=ORIGEM_MULTA,
+                            referencia_id=emprestimo.id
+                        ),
+                        exigir_saldo=True
+                    )
+                    if saldo is not None:
+                        usuario.sincronizar_creditos(saldo)
+            
+            return resultados
 
 class ListarEmprestimosUseCase:
     """
@@ -219,9 +533,11 @@ class ListarEmprestimosUseCase:
         else:
             emprestimos = self._emprestimo_repository.buscar_todos()
         
-        return [self._emprestimo_para_dto(emprestimo) for emprestimo in emprestimos]
+        # Um único instante de referência para todos os empréstimos da listagem
+        referencia = datetime.now()
+        return [self._emprestimo_para_dto(emprestimo, referencia) for emprestimo in emprestimos]
     
-    def _emprestimo_para_dto(self, emprestimo: Emprestimo) -> EmprestimoDTO:
+    def _emprestimo_para_dto(self, emprestimo: Emprestimo, referencia: datetime) -> EmprestimoDTO:
         return EmprestimoDTO(
             id=emprestimo.id,
             livro_id=emprestimo.livro_id,
@@ -230,8 +546,125 @@ class ListarEmprestimosUseCase:
             data_devolucao_prevista=emprestimo.data_devolucao_prevista.isoformat(),
             data_devolucao_real=emprestimo.data_devolucao_real.isoformat() if emprestimo.data_devolucao_real else None,
             multa=emprestimo.multa,
-            esta_em_atraso=emprestimo.esta_em_atraso,
-            dias_atraso=emprestimo.dias_atraso
+            devolvido=emprestimo.data_devolucao_real is not None,
+            esta_em_atraso=emprestimo.esta_em_atraso_em(referencia),
+            dias_atraso=emprestimo.dias_atraso_em(referencia)
+        )
+
+def _resumo_para_dto(resumo: ResumoAtrasos) -> ResumoAtrasosDTO:
+    return ResumoAtrasosDTO(
+        data=resumo.data.isoformat(),
+        total_emprestimos=resumo.total_emprestimos,
+        total_dias_atraso=resumo.total_dias_atraso,
+        multa_projetada=resumo.multa_projetada,
+        gerado_em=resumo.gerado_em.isoformat()
+    )
+
+class RelatorioAtrasosUseCase:
+    """
+    Use Case: Relatório de Empréstimos em Atraso
+    Dias de atraso e multas projetadas são calculados pelo banco,
+    com um único instante de referência por requisição
+    """
+    
+    def __init__(self, emprestimo_repository: EmprestimoRepository):
+        self._emprestimo_repository = emprestimo_repository
+    
+    def executar(self, limite: Optional[int] = None) -> RelatorioAtrasosDTO:
+        """
+        Gera o relatório de atrasos, opcionalmente limitado aos mais antigos
+        """
+        referencia = datetime.now()
+        atrasos = self._emprestimo_repository.relatorio_atrasos(referencia, MULTA_POR_DIA, limite)
+        resumo = self._emprestimo_repository.resumir_atrasos(referencia, MULTA_POR_DIA)
+        
+        return RelatorioAtrasosDTO(
+            referencia=referencia.isoformat(),
+            resumo=_resumo_para_dto(resumo),
+            emprestimos=[
+                EmprestimoAtrasadoDTO(
+                    emprestimo_id=atraso.emprestimo_id,
+                    livro_id=atraso.livro_id,
+                    usuario_id=atraso.usuario_id,
+                    data_devolucao_prevista=atraso.data_devolucao_prevista.isoformat(),
+                    dias_atraso=atraso.dias_atraso,
+                    multa_projetada=atraso.multa_projetada
+                )
+                for atraso in atrasos
+            ]
+        )
+
+class GerarSnapshotAtrasosUseCase:
+    """
+    Use Case: Gerar Snapshot Diário de Atrasos
+    Materializa os totais do dia para os painéis não recalcularem a cada acesso
+    """
+    
+    def __init__(self, emprestimo_repository: EmprestimoRepository, snapshot_repository: SnapshotAtrasosRepository):
+        self._emprestimo_repository = emprestimo_repository
+        self._snapshot_repository = snapshot_repository
+    
+    def executar(self) -> ResumoAtrasosDTO:
+        """
+        Recalcula e grava o snapshot do dia atual
+        """
+        resumo = self._emprestimo_repository.resumir_atrasos(datetime.now(), MULTA_POR_DIA)
+        self._snapshot_repository.salvar(resumo)
+        return _resumo_para_dto(resumo)
+
+class ObterSnapshotAtrasosUseCase:
+    """
+    Use Case: Obter Snapshot Diário de Atrasos
+    """
+    
+    def __init__(self, emprestimo_repository: EmprestimoRepository, snapshot_repository: SnapshotAtrasosRepository):
+        self._emprestimo_repository = emprestimo_repository
+        self._snapshot_repository = snapshot_repository
+    
+    def executar(self, data: Optional[date] = None) -> ResumoAtrasosDTO:
+        """
+        Retorna o snapshot da data (padrão: hoje); o de hoje é gerado se ainda não existir
+        """
+        hoje = date.today()
+        data = data or hoje
+        
+        resumo = self._snapshot_repository.buscar_por_data(data)
+        if resumo:
+            return _resumo_para_dto(resumo)
+        if data == hoje:
+            return GerarSnapshotAtrasosUseCase(self._emprestimo_repository, self._snapshot_repository).executar()
+        raise ValueError(f"Snapshot de atrasos não encontrado para {data.isoformat()}")
+
+class ObterEstatisticasUseCase:
+    """
+    Use Case: Obter Estatísticas da Biblioteca
+    Totais do painel (acervo, empréstimos, multas e créditos) calculados
+    por agregações no banco, em uma única resposta pequena
+    """
+    
+    def __init__(self, estatisticas_repository: EstatisticasRepository):
+        self._estatisticas_repository = estatisticas_repository
+    
+    def executar(self) -> EstatisticasDTO:
+        estatisticas = self._estatisticas_repository.calcular(datetime.now(), MULTA_POR_DIA)
+        return EstatisticasDTO(
+            referencia=estatisticas.referencia.isoformat(),
+            total_livros=estatisticas.total_livros,
+            livros_disponiveis=estatisticas.livros_disponiveis,
+            livros_emprestados=estatisticas.total_livros - estatisticas.livros_disponiveis,
+            emprestimos_ativos=estatisticas.emprestimos_ativos,
+            emprestimos_devolvidos=estatisticas.emprestimos_devolvidos,
+            emprestimos_em_atraso=estatisticas.emprestimos_em_atraso,
+            total_dias_atraso=estatisticas.total_dias_atraso,
+            multa_projetada=estatisticas.multa_projetada,
+            multas_pendentes=estatisticas.multas_pendentes,
+            valor_multas_pendentes=estatisticas.valor_multas_pendentes,
+            total_doacoes=estatisticas.total_doacoes,
+            creditos_doacoes=estatisticas.creditos_doacoes,
+            registros_horas=estatisticas.registros_horas,
+            horas_doadas=estatisticas.horas_doadas,
+            creditos_horas=estatisticas.creditos_horas,
+            creditos_emitidos=estatisticas.creditos_doacoes + estatisticas.creditos_horas
         )
 
 class DoarLivroUseCase:
@@ -244,43 +677,56 @@ class DoarLivroUseCase:
         self,
         livro_repository: LivroRepository,
         usuario_repository: UsuarioRepository,
-        doacao_repository: DoacaoRepository
+        doacao_repository: DoacaoRepository,
+        credito_repository: CreditoRepository,
+        unit_of_work: Optional[UnitOfWork] = None
     ):
         self._livro_repository = livro_repository
         self._usuario_repository = usuario_repository
         self._doacao_repository = doacao_repository
+        self._credito_repository = credito_repository
+        self._unit_of_work = unit_of_work
     
     def executar(self, dto: DoacaoDTO) -> float:
         """
         Executa a doação de um livro
         """
-        # Buscar livro
-        livro = self._livro_repository.buscar_por_id(dto.livro_id)
-        if not livro:
-            raise ValueError(f"Livro não encontrado: {dto.livro_id}")
+        with self._unit_of_work or nullcontext():
+            # Buscar livro
+            livro = self._livro_repository.buscar_por_id(dto.livro_id)
+            if not livro:
+                raise ValueError(f"Livro não encontrado: {dto.livro_id}")
         
-        # Buscar usuário
-        usuario = self._usuario_repository.buscar_por_id(dto.usuario_id)
-        if not usuario:
-            raise ValueError(f"Usuário não encontrado: {dto.usuario_id}")
+            # Buscar usuário
+            usuario = self._usuario_repository.buscar_por_id(dto.usuario_id)
+            if not usuario:
+                raise ValueError(f"Usuário não encontrado: {dto.usuario_id}")
         
-        # Criar doação
-        doacao = Doacao(
-            id="",  # Será gerado automaticamente
-            livro_id=dto.livro_id,
-            usuario_id=dto.usuario_id,
-            data_doacao=None,  # Será definida automaticamente
-            creditos=dto.creditos
-        )
+            # Criar doação
+            doacao = Doacao(
+                id="",  # Será gerado automaticamente
+                livro_id=dto.livro_id,
+                usuario_id=dto.usuario_id,
+                data_doacao=None,  # Será definida automaticamente
+                creditos=dto.creditos or 0.0
+            )
+            if not dto.creditos:
+                doacao.processar_creditos()
         
-        # Salvar no repositório
-        self._doacao_repository.salvar(doacao)
+            # Salvar no repositório
+            self._doacao_repository.salvar(doacao)
 
-        # Atualizar créditos do usuário
-        usuario.creditos += doacao.creditos
-        self._usuario_repository.salvar(usuario)
+            # Creditar o usuário via extrato (UPDATE atômico do saldo)
+            saldo = self._credito_repository.lancar(MovimentoCredito(
+                id="",  # Será gerado automaticamente
+                usuario_id=usuario.id,
+                valor=doacao.creditos,
+                origem=ORIGEM_DOACAO_LIVRO,
+                referencia_id=doacao.id
+            ))
+            usuario.sincronizar_creditos(saldo)
         
-        return usuario.creditos
+            return saldo
     
 class DoarHorasUseCase:
     """
@@ -291,32 +737,76 @@ class DoarHorasUseCase:
     def __init__(
         self,
         horas_repository: HorasRepository,
-        usuario_repository: UsuarioRepository
+        usuario_repository: UsuarioRepository,
+        credito_repository: CreditoRepository,
+        unit_of_work: Optional[UnitOfWork] = None
     ):
         self._horas_repository = horas_repository
         self._usuario_repository = usuario_repository
+        self._credito_repository = credito_repository
+        self._unit_of_work = unit_of_work
     
     def executar(self, dto: HorasDTO) -> float:
         """
         Executa a doação de horas
         """
-        # Buscar usuário
-        usuario = self._usuario_repository.buscar_por_id(dto.usuario_id)
-        if not usuario:
-            raise ValueError(f"Usuário não encontrado: {dto.usuario_id}")
+        with self._unit_of_work or nullcontext():
+            # Buscar usuário
+            usuario = self._usuario_repository.buscar_por_id(dto.usuario_id)
+            if not usuario:
+                raise ValueError(f"Usuário não encontrado: {dto.usuario_id}")
         
-        # Criar doação de horas
-        horas = Horas(
-            id="",  # Será gerado automaticamente
-            usuario_id=dto.usuario_id,
-            horas=dto.horas
-        )
+            # Criar doação de horas
+            horas = Horas(
+                id="",  # Será gerado automaticamente
+                usuario_id=dto.usuario_id,
+                horas=dto.horas,
+                data=dto.data,  # Será definida automaticamente se vazia
+                tipo=dto.tipo
+            )
+            horas.gerar_creditos()
         
-        # Salvar no repositório
-        self._horas_repository.salvar(horas)
+            # Salvar no repositório
+            self._horas_repository.salvar(horas)
 
-        # Atualizar créditos do usuário
-        usuario.creditos += horas.creditos 
-        self._usuario_repository.salvar(usuario)
+            # Creditar o usuário via extrato (UPDATE atômico do saldo)
+            saldo = self._credito_repository.lancar(MovimentoCredito(
+                id="",  # Será gerado automaticamente
+                usuario_id=usuario.id,
+                valor=horas.creditos,
+                origem=ORIGEM_DOACAO_HORAS,
+                referencia_id=horas.id
+            ))
+            usuario.sincronizar_creditos(saldo)
         
-        return usuario.creditos
\ No newline at end of file
+            return saldo
+
+class ConsultarCreditosUseCase:
+    """
+    Use Case: Consultar Créditos
+    Saldo corrente (leitura O(1)) e os lançamentos mais recentes do extrato
+    """
+
+    def __init__(self, credito_repository: CreditoRepository):
+        self._credito_repository = credito_repository
+
+    def executar(self, usuario_id: str, limite: int = 100) -> ExtratoCreditosDTO:
+        saldo = self._credito_repository.saldo(usuario_id)
+        if saldo is None:
+            raise ValueError(f"Usuário não encontrado: {usuario_id}")
+
+        movimentos = self._credito_repository.extrato(usuario_id, limite)
+        return ExtratoCreditosDTO(
+            usuario_id=usuario_id,
+            saldo=saldo,
+            movimentos=[
+                MovimentoCreditoDTO(
+                    id=m.id,
+                    valor=m.valor,
+                    origem=m.origem,
+                    data=m.data.isoformat(),
+                    referencia_id=m.referencia_id
+                )
+                for m in movimentos
+            ]
+        )
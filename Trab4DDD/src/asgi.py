@@ -0,0 +1,21 @@
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+# Entrada ASGI da API da Biblioteca: uvicorn src.asgi:app
+# Mesmos endpoints de /api/biblioteca do src.main, com I/O de banco assíncrono (aiosqlite)
+
+from src.infrastructure.database.config import PerfilBanco
+from src.presentation.asgi import criar_app_asgi
+
+# Mesmo banco do src.main (perfil lido de DATABASE_URL / DB_PERFIL)
+app = criar_app_asgi(
+    PerfilBanco.do_ambiente(f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}")
+)
+
+if __name__ == '__main__':
+    import uvicorn
+
+    print("🚀 Iniciando API da Biblioteca (ASGI)...")
+    print("💡 Health check: http://localhost:5002/api/biblioteca/health")
+    uvicorn.run(app, host='0.0.0.0', port=5002)
@@ -2,14 +2,50 @@
 
 from uuid import uuid4
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Set
 from dataclasses import dataclass
 from src.domain.value_objects.isbn import ISBN
 from src.domain.value_objects.email import Email
 
+# Multa por dia de atraso na devolução (R$)
+MULTA_POR_DIA = 1.0
+
+# Origens dos lançamentos no extrato de créditos
+ORIGEM_DOACAO_LIVRO = 'doacao_livro'
+ORIGEM_DOACAO_HORAS = 'doacao_horas'
+ORIGEM_MULTA = 'multa'
+ORIGEM_AJUSTE = 'ajuste'
+
+
+class RastreamentoAlteracoes:
+    """
+    Mixin: rastreamento de alterações (dirty tracking)
+    Registra quais atributos mudaram desde que a entidade foi carregada ou
+    salva, para que a persistência grave apenas as colunas alteradas.
+    """
+    
+    def __setattr__(self, nome, valor):
+        alterados = self.__dict__.get('_alterados')
+        if alterados is not None and not nome.startswith('_') and self.__dict__.get(nome) != valor:
+            alterados.add(nome)
+        object.__setattr__(self, nome, valor)
+    
+    def marcar_como_persistido(self) -> None:
+        """Indica que o estado atual da entidade está igual ao do banco"""
+        object.__setattr__(self, '_alterados', set())
+    
+    @property
+    def campos_alterados(self) -> Optional[Set[str]]:
+        """
+        Campos alterados desde a última persistência
+        None indica entidade nova (nunca persistida)
+        """
+        alterados = self.__dict__.get('_alterados')
+        return None if alterados is None else set(alterados)
+
 
 @dataclass
-class Livro:
+class Livro(RastreamentoAlteracoes):
     """
     Entity: Livro
     Representa um livro no domínio da biblioteca.
@@ -45,7 +81,7 @@ class Livro:
         return self.id == other.id
 
 @dataclass
-class Usuario:
+class Usuario(RastreamentoAlteracoes):
     """
     Entity: Usuario
     Representa um usuário da biblioteca.
@@ -72,13 +108,20 @@ class Usuario:
         """
         self.ativo = True
     
+    def sincronizar_creditos(self, saldo: float) -> None:
+        """
+        Atualiza o saldo em memória com o saldo corrente do extrato
+        O saldo só muda via lançamentos no extrato, nunca ao salvar o usuário.
+        """
+        object.__setattr__(self, 'creditos', saldo)
+    
     def __eq__(self, other):
         if not isinstance(other, Usuario):
             return False
         return self.id == other.id
 
 @dataclass
-class Emprestimo:
+class Emprestimo(RastreamentoAlteracoes):
     """
     Entity: Emprestimo
     Representa um empréstimo de livro.
@@ -112,25 +155,37 @@ class Emprestimo:
         # Calcular multa por atraso (R$ 1,00 por dia)
         if self.data_devolucao_real > self.data_devolucao_prevista:
             dias_atraso = (self.data_devolucao_real - self.data_devolucao_prevista).days
-            self.multa = dias_atraso * 1.0
+            self.multa = dias_atraso * MULTA_POR_DIA
+    
+    def esta_em_atraso_em(self, referencia: datetime) -> bool:
+        """
+        Verifica se o empréstimo está em atraso no instante de referência
+        """
+        if self.data_devolucao_real:
+            return False
+        return referencia > self.data_devolucao_prevista
+    
+    def dias_atraso_em(self, referencia: datetime) -> int:
+        """
+        Calcula quantos dias de atraso no instante de referência
+        """
+        if not self.esta_em_atraso_em(referencia):
+            return 0
+        return (referencia - self.data_devolucao_prevista).days
     
     @property
     def esta_em_atraso(self) -> bool:
         """
         Verifica se o empréstimo está em atraso
         """
-        if self.data_devolucao_real:
-            return False
-        return datetime.now() > self.data_devolucao_prevista
+        return self.esta_em_atraso_em(datetime.now())
     
     @property
     def dias_atraso(self) -> int:
         """
         Calcula quantos dias de atraso
         """
-        if not self.esta_em_atraso:
-            return 0
-        return (datetime.now() - self.data_devolucao_prevista).days
+        return self.dias_atraso_em(datetime.now())
     
     def __eq__(self, other):
         if not isinstance(other, Emprestimo):
@@ -138,7 +193,7 @@ class Emprestimo:
         return self.id == other.id
 
 @dataclass
-class Doacao:
+class Doacao(RastreamentoAlteracoes):
     """
     Entity: Doacao
     Representa uma doação de livro.
@@ -160,7 +215,7 @@ class Doacao:
         self.creditos += 20.0  # Exemplo: cada doação gera 20 créditos para o usuário
 
 @dataclass
-class Horas:
+class Horas(RastreamentoAlteracoes):
     """
     Entity: Doacao
     Representa uma doação de livro.
@@ -188,3 +243,23 @@ class Horas:
             self.creditos += (self.horas * 10.0) # Exemplo: cada hora de palestra gera 10 créditos para o usuário
         else:
             self.creditos += (self.horas * 2.0)  # Exemplo: cada hora de outra atividade gera 2 créditos para o usuário
+
+@dataclass
+class MovimentoCredito:
+    """
+    Entity: MovimentoCredito
+    Lançamento imutável no extrato de créditos do usuário (ledger append-only).
+    Valores positivos creditam e negativos debitam o saldo.
+    """
+    id: str
+    usuario_id: str
+    valor: float
+    origem: str
+    referencia_id: Optional[str] = None
+    data: Optional[datetime] = None
+
+    def __post_init__(self):
+        if not self.id:
+            self.id = str(uuid4())
+        if not self.data:
+            self.data = datetime.now()
@@ -1,10 +1,46 @@
 # Domain Layer - Repository Interfaces
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
-from src.domain.entities import Livro, Usuario, Emprestimo, Doacao, Horas
+from typing import Iterator, List, Optional, Set, Tuple
+from datetime import date, datetime
+from src.domain.entities import Livro, Usuario, Emprestimo, Doacao, Horas, MovimentoCredito
+from src.domain.value_objects.atraso import AtrasoEmprestimo, ResumoAtrasos
+from src.domain.value_objects.estatisticas import EstatisticasBiblioteca
 
 
+class UnitOfWork(ABC):
+    """
+    Interface Unit of Work
+    Agrupa as gravações de vários repositórios em uma única transação,
+    confirmada uma só vez ao final do caso de uso.
+    """
+    
+    def __enter__(self) -> 'UnitOfWork':
+        self.iniciar()
+        return self
+    
+    def __exit__(self, tipo, valor, traceback) -> bool:
+        if tipo is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+    
+    @abstractmethod
+    def iniciar(self) -> None:
+        """Inicia a unidade de trabalho"""
+        pass
+    
+    @abstractmethod
+    def commit(self) -> None:
+        """Confirma todas as gravações"""
+        pass
+    
+    @abstractmethod
+    def rollback(self) -> None:
+        """Descarta todas as gravações"""
+        pass
+
 class LivroRepository(ABC):
     """
     Repository Interface para Livro
@@ -27,6 +63,11 @@ class LivroRepository(ABC):
         """Busca livro por ISBN"""
         pass
     
+    @abstractmethod
+    def buscar_por_ids(self, ids: List[str], bloquear: bool = False) -> List[Livro]:
+        """Busca vários livros por ID; bloquear=True trava as linhas até o fim da transação"""
+        pass
+    
     @abstractmethod
     def buscar_todos(self) -> List[Livro]:
         """Busca todos os livros"""
@@ -37,6 +78,31 @@ class LivroRepository(ABC):
         """Busca livros disponíveis"""
         pass
     
+    @abstractmethod
+    def buscar_pagina(self, limite: int, apos_id: Optional[str] = None, apenas_disponiveis: bool = False) -> List[Livro]:
+        """Busca uma página de livros ordenada por ID (paginação por cursor)"""
+        pass
+    
+    @abstractmethod
+    def pesquisar(self, termo: str, limite: int, deslocamento: int = 0, apenas_disponiveis: bool = False) -> List[Livro]:
+        """Busca textual por título, autor ou ISBN, ordenada por relevância"""
+        pass
+    
+    @abstractmethod
+    def iterar_todos(self, apenas_disponiveis: bool = False, tamanho_lote: int = 1000) -> Iterator[Livro]:
+        """Percorre os livros em lotes, sem carregar o catálogo inteiro em memória"""
+        pass
+    
+    @abstractmethod
+    def buscar_isbns_existentes(self, isbns: List[str]) -> Set[str]:
+        """Retorna, dentre os ISBNs informados, os que já estão cadastrados"""
+        pass
+    
+    @abstractmethod
+    def salvar_em_lote(self, livros: List[Livro]) -> None:
+        """Insere vários livros novos em uma única transação"""
+        pass
+    
     @abstractmethod
     def deletar(self, id: str) -> None:
         """Deleta um livro"""
@@ -62,6 +128,11 @@ class UsuarioRepository(ABC):
         """Busca usuário por email"""
         pass
     
+    @abstractmethod
+    def buscar_por_ids(self, ids: List[str]) -> List[Usuario]:
+        """Busca vários usuários por ID"""
+        pass
+    
     @abstractmethod
     def buscar_todos(self) -> List[Usuario]:
         """Busca todos os usuários"""
@@ -82,11 +153,21 @@ class EmprestimoRepository(ABC):
         """Salva um empréstimo"""
         pass
     
+    @abstractmethod
+    def salvar_em_lote(self, emprestimos: List[Emprestimo]) -> None:
+        """Insere vários empréstimos novos de uma só vez"""
+        pass
+    
     @abstractmethod
     def buscar_por_id(self, id: str) -> Optional[Emprestimo]:
         """Busca empréstimo por ID"""
         pass
     
+    @abstractmethod
+    def buscar_por_ids(self, ids: List[str], bloquear: bool = False) -> List[Emprestimo]:
+        """Busca vários empréstimos por ID; bloquear=True trava as linhas até o fim da transação"""
+        pass
+    
     @abstractmethod
     def buscar_por_usuario(self, usuario_id: str) -> List[Emprestimo]:
         """Busca empréstimos de um usuário"""
@@ -103,10 +184,22 @@ class EmprestimoRepository(ABC):
         pass
     
     @abstractmethod
-    def buscar_em_atraso(self) -> List[Emprestimo]:
+    def buscar_em_atraso(self, referencia: Optional[datetime] = None) -> List[Emprestimo]:
         """Busca empréstimos em atraso"""
         pass
     
+    @abstractmethod
+    def relatorio_atrasos(
+        self, referencia: datetime, multa_por_dia: float, limite: Optional[int] = None
+    ) -> List[AtrasoEmprestimo]:
+        """Lista os atrasos com dias e multa projetada calculados no instante de referência"""
+        pass
+    
+    @abstractmethod
+    def resumir_atrasos(self, referencia: datetime, multa_por_dia: float) -> ResumoAtrasos:
+        """Totaliza os atrasos no instante de referência"""
+        pass
+    
     @abstractmethod
     def deletar(self, id: str) -> None:
         """Deleta um empréstimo"""
@@ -168,4 +261,56 @@ class HorasRepository(ABC):
     @abstractmethod
     def deletar(self, id: str) -> None:
         """Deleta uma hora"""
-        pass
\ No newline at end of file
+        pass
+
+class SnapshotAtrasosRepository(ABC):
+    """
+    Repository Interface para o snapshot diário de atrasos
+    """
+    @abstractmethod
+    def salvar(self, resumo: ResumoAtrasos) -> None:
+        """Salva (ou substitui) o snapshot do dia"""
+        pass
+    @abstractmethod
+    def buscar_por_data(self, data: date) -> Optional[ResumoAtrasos]:
+        """Busca o snapshot de uma data"""
+        pass
+
+class CreditoRepository(ABC):
+    """
+    Repository Interface para o extrato de créditos (ledger append-only)
+    Cada lançamento é gravado no extrato e aplicado ao saldo corrente do
+    usuário com um único UPDATE atômico; lançamentos nunca são alterados.
+    """
+    @abstractmethod
+    def lancar(self, movimento: MovimentoCredito, exigir_saldo: bool = False) -> Optional[float]:
+        """
+        Registra o lançamento e retorna o novo saldo
+        exigir_saldo=True não aplica um débito maior que o saldo e retorna None
+        """
+        pass
+    @abstractmethod
+    def registrar_ajuste(self, movimento: MovimentoCredito) -> None:
+        """Registra no extrato um valor que já está no saldo (ex.: saldo anterior ao extrato)"""
+        pass
+    @abstractmethod
+    def saldo(self, usuario_id: str) -> Optional[float]:
+        """Saldo corrente do usuário (None se o usuário não existe)"""
+        pass
+    @abstractmethod
+    def extrato(self, usuario_id: str, limite: int = 100) -> List[MovimentoCredito]:
+        """Lançamentos do usuário, do mais recente para o mais antigo"""
+        pass
+    @abstractmethod
+    def divergencias(self) -> List[Tuple[str, float, float]]:
+        """Usuários cujo saldo difere da soma do extrato: (usuario_id, saldo, soma)"""
+        pass
+
+class EstatisticasRepository(ABC):
+    """
+    Repository Interface para os totais do painel da biblioteca
+    """
+    @abstractmethod
+    def calcular(self, referencia: datetime, multa_por_dia: float) -> EstatisticasBiblioteca:
+        """Calcula os totais no instante de referência"""
+        pass
@@ -0,0 +1,32 @@
+# Domain Layer - Value Objects
+
+from dataclasses import dataclass
+from datetime import date, datetime
+
+
+@dataclass(frozen=True)
+class AtrasoEmprestimo:
+    """
+    Value Object: AtrasoEmprestimo
+    Situação de um empréstimo em atraso em um instante de referência.
+    """
+    emprestimo_id: str
+    livro_id: str
+    usuario_id: str
+    data_devolucao_prevista: datetime
+    dias_atraso: int
+    multa_projetada: float
+
+
+@dataclass(frozen=True)
+class ResumoAtrasos:
+    """
+    Value Object: ResumoAtrasos
+    Totais de empréstimos em atraso em uma data; é o conteúdo do
+    snapshot diário materializado para os painéis.
+    """
+    data: date
+    total_emprestimos: int
+    total_dias_atraso: int
+    multa_projetada: float
+    gerado_em: datetime
@@ -0,0 +1,28 @@
+# Domain Layer - Value Objects
+
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass(frozen=True)
+class EstatisticasBiblioteca:
+    """
+    Value Object: EstatisticasBiblioteca
+    Totais do painel dos bibliotecários em um instante de referência:
+    acervo, empréstimos, multas em aberto e créditos emitidos.
+    """
+    referencia: datetime
+    total_livros: int
+    livros_disponiveis: int
+    emprestimos_ativos: int
+    emprestimos_devolvidos: int
+    emprestimos_em_atraso: int
+    total_dias_atraso: int
+    multa_projetada: float
+    multas_pendentes: int
+    valor_multas_pendentes: float
+    total_doacoes: int
+    creditos_doacoes: float
+    registros_horas: int
+    horas_doadas: float
+    creditos_horas: float
@@ -0,0 +1,121 @@
+# Infrastructure Layer - Busca textual do catálogo (SQLite FTS5)
+
+import re
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from src.infrastructure.database.sessao import sessao_atual
+from src.models.user import db
+
+# Tabela virtual FTS5 que espelha livros (titulo, autor, isbn)
+TABELA_BUSCA = 'livros_fts'
+
+# Colunas textuais de livros espelhadas no índice de busca
+COLUNAS_BUSCA = ('titulo', 'autor', 'isbn')
+
+# Pesos do bm25 por coluna (id, titulo, autor, isbn): título pesa mais que autor
+PESOS_BM25 = (0.0, 10.0, 5.0, 1.0)
+
+# unicode61 com remove_diacritics 2: "brás", "bras" e "BRAS" são o mesmo termo.
+# prefix='2 3' mantém índices de prefixo para que "mem*" não varra o vocabulário.
+DDL_BUSCA = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_BUSCA} USING fts5("
+    "id UNINDEXED, titulo, autor, isbn, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+
+# Bancos (URL do engine) em que a tabela de busca já foi encontrada/criada
+_bancos_com_busca: Dict[str, bool] = {}
+
+
+def busca_textual_disponivel() -> bool:
+    """Indica se o banco atual tem a tabela FTS5 de busca"""
+    sessao = sessao_atual()
+    motor = sessao.get_bind()
+    chave = str(motor.url)
+    if chave not in _bancos_com_busca:
+        if motor.dialect.name != 'sqlite':
+            _bancos_com_busca[chave] = False
+        else:
+            existe = sessao.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :nome"),
+                {'nome': TABELA_BUSCA}
+            ).first()
+            # Não memoriza a ausência: a tabela pode ser criada depois
+            if not existe:
+                return False
+            _bancos_com_busca[chave] = True
+    return _bancos_com_busca[chave]
+
+
+def criar_indice_busca(reconstruir: bool = False, conexao: Optional[Connection] = None) -> bool:
+    """
+    Cria a tabela FTS5 (idempotente) e a preenche a partir de livros
+    quando acabou de ser criada ou quando reconstruir=True
+    conexao: conexão já aberta (ex.: AsyncConnection.run_sync na app ASGI);
+    sem ela, usa uma transação própria no engine do Flask-SQLAlchemy.
+    Retorna False quando o banco não é SQLite (busca usa LIKE como alternativa).
+    """
+    if conexao is None:
+        if db.engine.dialect.name != 'sqlite':
+            return False
+        with db.engine.begin() as nova:
+            return criar_indice_busca(reconstruir, nova)
+
+    if conexao.dialect.name != 'sqlite':
+        return False
+    existia = conexao.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :nome"),
+        {'nome': TABELA_BUSCA}
+    ).first() is not None
+    conexao.execute(text(DDL_BUSCA))
+    if reconstruir or not existia:
+        conexao.execute(text(f"DELETE FROM {TABELA_BUSCA}"))
+        conexao.execute(text(
+            f"INSERT INTO {TABELA_BUSCA} (id, titulo, autor, isbn) "
+            "SELECT id, titulo, autor, isbn FROM livros"
+        ))
+        conexao.execute(text(f"INSERT INTO {TABELA_BUSCA} ({TABELA_BUSCA}) VALUES ('optimize')"))
+    _bancos_com_busca[str(conexao.engine.url)] = True
+    return True
+
+
+def indexar_livros(valores: List[dict], novos: bool = False) -> None:
+    """
+    Atualiza o índice de busca com os livros informados (na transação atual)
+    valores: dicionários com id, titulo, autor e isbn
+    novos=True pula a remoção das entradas antigas (livros recém-inseridos)
+    """
+    if not valores or not busca_textual_disponivel():
+        return
+    if not novos:
+        remover_livros([v['id'] for v in valores])
+    sessao_atual().execute(
+        text(f"INSERT INTO {TABELA_BUSCA} (id, titulo, autor, isbn) VALUES (:id, :titulo, :autor, :isbn)"),
+        [{coluna: v[coluna] for coluna in ('id',) + COLUNAS_BUSCA} for v in valores]
+    )
+
+
+def remover_livros(ids: Iterable[str]) -> None:
+    """
+    Remove livros do índice de busca (na transação atual)
+    id é UNINDEXED, então cada remoção percorre a tabela de busca; por isso
+    só é feita quando título/autor/ISBN mudam ou o livro é excluído.
+    """
+    ids = list(ids)
+    if not ids or not busca_textual_disponivel():
+        return
+    sessao_atual().execute(text(f"DELETE FROM {TABELA_BUSCA} WHERE id = :id"), [{'id': id} for id in ids])
+
+
+def termos_da_busca(termo: str) -> List[str]:
+    """Separa o texto digitado em palavras (letras/dígitos), sem operadores FTS"""
+    return re.findall(r'\w+', termo or '')
+
+
+def montar_consulta_fts(termo: str) -> str:
+    """
+    Converte o texto digitado em uma expressão MATCH segura
+    Cada palavra vira um prefixo entre aspas ("machado"*), combinadas com AND.
+    """
+    return ' '.join(f'"{palavra}"*' for palavra in termos_da_busca(termo))
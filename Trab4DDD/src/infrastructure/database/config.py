@@ -0,0 +1,181 @@
+# Infrastructure Layer - Configuração do Banco de Dados
+
+import os
+from dataclasses import dataclass
+from typing import Optional
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from src.models.user import db
+
+# Banco SQLite padrão: src/database/app.db
+CAMINHO_BANCO_PADRAO = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', '..', 'database', 'app.db')
+)
+
+# Opção de execução lida no evento 'begin' para escolher o modo do BEGIN no SQLite
+OPCAO_BEGIN_SQLITE = 'sqlite_begin'
+
+# Prefixo de URL síncrono -> driver assíncrono usado pela app ASGI
+DRIVERS_ASSINCRONOS = {
+    'sqlite://': 'sqlite+aiosqlite://',
+    'sqlite+pysqlite://': 'sqlite+aiosqlite://',
+    'postgresql://': 'postgresql+asyncpg://',
+    'postgresql+psycopg2://': 'postgresql+asyncpg://',
+}
+
+
+@dataclass
+class PerfilBanco:
+    """
+    Perfil de configuração do banco de dados
+    - 'producao': WAL, synchronous=NORMAL, busy_timeout, cache, mmap e
+      temp_store em memória, aplicados a cada nova conexão
+    - 'padrao': pragmas padrão do SQLite (comportamento original)
+    """
+    url: str
+    nome: str = 'producao'
+    journal_mode: str = 'WAL'
+    synchronous: str = 'NORMAL'
+    busy_timeout_ms: int = 5000
+    cache_size_kib: int = 64000
+    mmap_size: int = 256 * 1024 * 1024
+    temp_store: str = 'MEMORY'
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: int = 30
+    pool_recycle: int = 1800
+
+    @classmethod
+    def do_ambiente(cls, url_padrao: Optional[str] = None) -> 'PerfilBanco':
+        """
+        Monta o perfil a partir das variáveis de ambiente
+        DATABASE_URL, DB_PERFIL, SQLITE_* e DB_POOL_*
+        """
+        url = os.environ.get('DATABASE_URL') or url_padrao or f'sqlite:///{CAMINHO_BANCO_PADRAO}'
+        return cls(
+            url=url,
+            nome=os.environ.get('DB_PERFIL', 'producao'),
+            journal_mode=os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+            synchronous=os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+            busy_timeout_ms=int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+            cache_size_kib=int(os.environ.get('SQLITE_CACHE_SIZE_KIB', 64000)),
+            mmap_size=int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+            temp_store=os.environ.get('SQLITE_TEMP_STORE', 'MEMORY'),
+            pool_size=int(os.environ.get('DB_POOL_SIZE', 5)),
+            max_overflow=int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+            pool_timeout=int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+            pool_recycle=int(os.environ.get('DB_POOL_RECYCLE', 1800))
+        )
+
+    @property
+    def eh_sqlite(self) -> bool:
+        return self.url.startswith('sqlite')
+
+    @property
+    def eh_producao(self) -> bool:
+        return self.nome == 'producao'
+
+    @property
+    def url_assincrona(self) -> str:
+        """URL com o driver assíncrono equivalente (app ASGI): aiosqlite / asyncpg"""
+        for sincrono, assincrono in DRIVERS_ASSINCRONOS.items():
+            if self.url.startswith(sincrono):
+                return assincrono + self.url[len(sincrono):]
+        return self.url
+
+    def opcoes_engine(self) -> dict:
+        """Opções repassadas ao create_engine (SQLALCHEMY_ENGINE_OPTIONS)"""
+        if not self.eh_producao:
+            return {}
+
+        # Bancos em memória usam pool próprio do SQLite, sem fila de conexões
+        if self.eh_sqlite and (':memory:' in self.url or self.url.rstrip('/') == 'sqlite:'):
+            return {}
+
+        opcoes = {
+            'pool_size': self.pool_size,
+            'max_overflow': self.max_overflow,
+            'pool_timeout': self.pool_timeout,
+            'pool_recycle': self.pool_recycle,
+            'pool_pre_ping': not self.eh_sqlite
+        }
+        if self.eh_sqlite:
+            opcoes['connect_args'] = {'timeout': self.busy_timeout_ms / 1000}
+        return opcoes
+
+
+def aplicar_perfil(engine: Engine, perfil: PerfilBanco) -> None:
+    """
+    Registra os eventos de conexão que aplicam os pragmas do perfil
+    Também assume o controle do BEGIN para permitir BEGIN IMMEDIATE nas
+    transações de escrita (evita 'database is locked' ao promover leitura
+    para escrita com vários processos gravando no modo WAL).
+    """
+    if not (perfil.eh_sqlite and perfil.eh_producao):
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _configurar_conexao(conexao_dbapi, _registro):
+        # Desliga o BEGIN implícito do driver; o evento 'begin' abaixo o emite
+        conexao_dbapi.isolation_level = None
+        cursor = conexao_dbapi.cursor()
+        cursor.execute(f'PRAGMA journal_mode={perfil.journal_mode}')
+        cursor.execute(f'PRAGMA synchronous={perfil.synchronous}')
+        cursor.execute(f'PRAGMA busy_timeout={int(perfil.busy_timeout_ms)}')
+        cursor.execute(f'PRAGMA cache_size=-{int(perfil.cache_size_kib)}')
+        cursor.execute(f'PRAGMA mmap_size={int(perfil.mmap_size)}')
+        cursor.execute(f'PRAGMA temp_store={perfil.temp_store}')
+        cursor.close()
+
+    @event.listens_for(engine, 'begin')
+    def _iniciar_transacao(conexao):
+        modo = conexao.get_execution_options().get(OPCAO_BEGIN_SQLITE, '')
+        conexao.exec_driver_sql(f'BEGIN {modo}'.strip())
+
+
+def init_database(app: Flask, perfil: Optional[PerfilBanco] = None) -> PerfilBanco:
+    """
+    Inicializa a configuração do banco de dados com o perfil informado
+    ou lido das variáveis de ambiente
+    """
+    perfil = perfil or PerfilBanco.do_ambiente()
+
+    app.config['SQLALCHEMY_DATABASE_URI'] = perfil.url
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = perfil.opcoes_engine()
+
+    # Inicializar SQLAlchemy
+    db.init_app(app)
+
+    with app.app_context():
+        aplicar_perfil(db.engine, perfil)
+
+    return perfil
+
+
+def inicializar_banco() -> None:
+    """
+    Passo único de inicialização (deploy/startup, não a cada import):
+    cria as tabelas que faltam e a tabela FTS5 da busca textual
+    Deve rodar dentro de um app context.
+    """
+    import src.infrastructure.database.models  # noqa: F401 (registra as tabelas)
+    from src.infrastructure.database.busca import criar_indice_busca
+
+    db.create_all()
+    # Tabela FTS5 da busca textual (SQLite; preenchida na primeira criação)
+    criar_indice_busca()
+
+
+def criar_engine_assincrono(perfil: Optional[PerfilBanco] = None):
+    """
+    Cria o AsyncEngine da app ASGI (aiosqlite/asyncpg) com as mesmas opções
+    de pool e os mesmos pragmas/BEGIN IMMEDIATE do perfil usado pelo Flask
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    perfil = perfil or PerfilBanco.do_ambiente()
+    engine = create_async_engine(perfil.url_assincrona, **perfil.opcoes_engine())
+    aplicar_perfil(engine.sync_engine, perfil)
+    return engine
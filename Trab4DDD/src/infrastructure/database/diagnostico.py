@@ -0,0 +1,306 @@
+# Infrastructure Layer - Log de consultas lentas e detector de N+1
+#
+# Desligado por padrão. SQL_DIAGNOSTICO escolhe o modo:
+# - 'producao': registra consultas lentas e requisições que estouram o
+#   orçamento de consultas ou repetem o mesmo comando (N+1)
+# - 'desenvolvimento': além disso, guarda todas as requisições no histórico
+#   e registra cada comando no log (nível DEBUG)
+
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Deque, Dict, List, Optional
+from flask import Flask, g, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Logger dos eventos de diagnóstico (uma linha JSON por evento)
+logger = logging.getLogger('biblioteca.sql')
+
+MODO_PRODUCAO = 'producao'
+MODO_DESENVOLVIMENTO = 'desenvolvimento'
+
+# Chave em Connection.info com os instantes de início dos comandos em execução
+CHAVE_INICIO = 'diagnostico_inicio_sql'
+
+# Rota do próprio diagnóstico (não entra no histórico)
+ROTA_DIAGNOSTICO = '/api/debug/queries'
+
+# Arquivo dos repositórios: o primeiro frame dele na pilha é a origem do comando
+ARQUIVO_REPOSITORIOS = os.path.join('infrastructure', 'repositories', '__init__.py')
+
+_LITERAIS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LISTA_IN = re.compile(r'\bIN\s*\((?:\s*(?:\?|%\(\w+\)s|:\w+|__\[POSTCOMPILE_\w+\])\s*,?)+\)', re.IGNORECASE)
+_ESPACOS = re.compile(r'\s+')
+
+
+@dataclass
+class ConfiguracaoDiagnostico:
+    """Configuração do diagnóstico de consultas (variáveis SQL_*)"""
+    modo: Optional[str] = None
+    lenta_ms: float = 100.0
+    orcamento_consultas: int = 20
+    repeticoes_maximas: int = 5
+    tamanho_historico: int = 50
+
+    @classmethod
+    def do_ambiente(cls) -> 'ConfiguracaoDiagnostico':
+        """
+        Monta a configuração a partir de SQL_DIAGNOSTICO, SQL_LENTA_MS,
+        SQL_ORCAMENTO_CONSULTAS, SQL_REPETICOES_MAX e SQL_HISTORICO
+        """
+        modo = os.environ.get('SQL_DIAGNOSTICO', '').lower() or None
+        if modo not in (None, MODO_PRODUCAO, MODO_DESENVOLVIMENTO):
+            raise ValueError(f"SQL_DIAGNOSTICO deve ser '{MODO_PRODUCAO}' ou '{MODO_DESENVOLVIMENTO}'")
+        return cls(
+            modo=modo,
+            lenta_ms=float(os.environ.get('SQL_LENTA_MS', 100)),
+            orcamento_consultas=int(os.environ.get('SQL_ORCAMENTO_CONSULTAS', 20)),
+            repeticoes_maximas=int(os.environ.get('SQL_REPETICOES_MAX', 5)),
+            tamanho_historico=int(os.environ.get('SQL_HISTORICO', 50))
+        )
+
+    @property
+    def habilitado(self) -> bool:
+        return self.modo is not None
+
+
+@dataclass
+class ConsultaRegistrada:
+    formato: str
+    duracao_ms: float
+    origem: str
+
+
+@dataclass
+class RequisicaoRegistrada:
+    """Comandos SQL de uma requisição e os alertas gerados por ela"""
+    rota: str
+    metodo: str
+    consultas: List[ConsultaRegistrada] = field(default_factory=list)
+    alertas: List[dict] = field(default_factory=list)
+    duracao_ms: float = 0.0
+    status: Optional[int] = None
+
+    def resumo(self) -> dict:
+        """Comandos agrupados por formato, do mais repetido para o menos"""
+        grupos: Dict[str, dict] = {}
+        for consulta in self.consultas:
+            grupo = grupos.setdefault(consulta.formato, {
+                'formato': consulta.formato, 'execucoes': 0, 'tempo_ms': 0.0, 'origens': Counter()
+            })
+            grupo['execucoes'] += 1
+            grupo['tempo_ms'] += consulta.duracao_ms
+            grupo['origens'][consulta.origem] += 1
+        comandos = sorted(grupos.values(), key=lambda grupo: grupo['execucoes'], reverse=True)
+        for grupo in comandos:
+            grupo['tempo_ms'] = round(grupo['tempo_ms'], 3)
+            grupo['origens'] = dict(grupo['origens'])
+        return {
+            'rota': self.rota,
+            'metodo': self.metodo,
+            'status': self.status,
+            'duracao_ms': round(self.duracao_ms, 3),
+            'consultas': len(self.consultas),
+            'tempo_sql_ms': round(sum(c.duracao_ms for c in self.consultas), 3),
+            'alertas': self.alertas,
+            'comandos': comandos
+        }
+
+
+# Requisição em andamento (Flask: por thread; ASGI: por task, visível no run_sync)
+_requisicao_atual: ContextVar[Optional[RequisicaoRegistrada]] = ContextVar('requisicao_sql', default=None)
+
+
+def formato_do_comando(sql: str) -> str:
+    """
+    Forma normalizada do comando: literais viram ?, listas IN (...) de
+    tamanho variável viram IN (...) e espaços são colapsados
+    """
+    formato = _LITERAIS.sub('?', sql)
+    formato = _LISTA_IN.sub('IN (...)', formato)
+    return _ESPACOS.sub(' ', formato).strip()
+
+
+def origem_do_comando() -> str:
+    """
+    Método de repositório que originou o comando (primeiro frame do módulo
+    de repositórios na pilha), ou 'desconhecida'
+    """
+    frame = sys._getframe(2)
+    while frame is not None:
+        codigo = frame.f_code
+        if codigo.co_filename.endswith(ARQUIVO_REPOSITORIOS):
+            instancia = frame.f_locals.get('self')
+            classe = type(instancia).__name__ if instancia is not None else '<módulo>'
+            return f'{classe}.{codigo.co_name}'
+        frame = frame.f_back
+    return 'desconhecida'
+
+
+def _registrar_log(nivel: int, evento: str, **dados) -> None:
+    if logger.isEnabledFor(nivel):
+        logger.log(nivel, json.dumps({'evento': evento, **dados}, ensure_ascii=False, default=str))
+
+
+class DiagnosticoSQL:
+    """Coleta os comandos de cada requisição e aplica as regras de alerta"""
+
+    def __init__(self, configuracao: ConfiguracaoDiagnostico):
+        self.configuracao = configuracao
+        self._historico: Deque[dict] = deque(maxlen=configuracao.tamanho_historico)
+        self._trava = threading.Lock()
+
+    def iniciar_requisicao(self, rota: str, metodo: str):
+        registro = RequisicaoRegistrada(rota=rota, metodo=metodo)
+        return _requisicao_atual.set(registro), time.perf_counter()
+
+    def finalizar_requisicao(self, inicio, status: int, rota: Optional[str] = None) -> None:
+        token, instante = inicio
+        registro = _requisicao_atual.get()
+        _requisicao_atual.reset(token)
+        if registro is None:
+            return
+        registro.duracao_ms = (time.perf_counter() - instante) * 1000
+        registro.status = status
+        if rota:
+            registro.rota = rota
+
+        self._avaliar(registro)
+        if registro.alertas or self.configuracao.modo == MODO_DESENVOLVIMENTO:
+            resumo = registro.resumo()
+            with self._trava:
+                self._historico.append(resumo)
+
+    def _avaliar(self, registro: RequisicaoRegistrada) -> None:
+        configuracao = self.configuracao
+        total = len(registro.consultas)
+        if total > configuracao.orcamento_consultas:
+            registro.alertas.append({
+                'tipo': 'orcamento_excedido', 'consultas': total, 'orcamento': configuracao.orcamento_consultas
+            })
+        repeticoes = Counter(consulta.formato for consulta in registro.consultas)
+        for formato, vezes in repeticoes.most_common():
+            if vezes <= configuracao.repeticoes_maximas:
+                break
+            origens = Counter(c.origem for c in registro.consultas if c.formato == formato)
+            registro.alertas.append({
+                'tipo': 'comando_repetido', 'formato': formato, 'execucoes': vezes,
+                'limite': configuracao.repeticoes_maximas, 'origens': dict(origens)
+            })
+        for alerta in registro.alertas:
+            _registrar_log(
+                logging.WARNING, alerta['tipo'], rota=registro.rota, metodo=registro.metodo,
+                status=registro.status, **{k: v for k, v in alerta.items() if k != 'tipo'}
+            )
+
+    def registrar_comando(self, sql: str, duracao_ms: float) -> None:
+        registro = _requisicao_atual.get()
+        lenta = duracao_ms >= self.configuracao.lenta_ms
+        if registro is None and not lenta:
+            return
+        consulta = ConsultaRegistrada(formato_do_comando(sql), round(duracao_ms, 3), origem_do_comando())
+        if registro is not None:
+            registro.consultas.append(consulta)
+        if lenta:
+            _registrar_log(
+                logging.WARNING, 'consulta_lenta', rota=registro.rota if registro else None,
+                limite_ms=self.configuracao.lenta_ms, **asdict(consulta)
+            )
+        elif self.configuracao.modo == MODO_DESENVOLVIMENTO:
+            _registrar_log(logging.DEBUG, 'consulta', rota=registro.rota, **asdict(consulta))
+
+    def historico(self, apenas_alertas: bool = False) -> List[dict]:
+        """Requisições registradas, da mais recente para a mais antiga"""
+        with self._trava:
+            itens = list(self._historico)
+        itens.reverse()
+        if apenas_alertas:
+            itens = [item for item in itens if item['alertas']]
+        return itens
+
+    def visao(self, apenas_alertas: bool = False) -> dict:
+        """Conteúdo de /api/debug/queries"""
+        configuracao = asdict(self.configuracao)
+        return {'configuracao': configuracao, 'requisicoes': self.historico(apenas_alertas)}
+
+
+# Instância do processo; None enquanto o diagnóstico estiver desligado
+_diagnostico: Optional[DiagnosticoSQL] = None
+
+
+def _antes_do_cursor(conexao, _cursor, _sql, _parametros, _contexto, _executemany):
+    conexao.info.setdefault(CHAVE_INICIO, []).append(time.perf_counter())
+
+
+def _depois_do_cursor(conexao, _cursor, sql, _parametros, _contexto, _executemany):
+    inicios = conexao.info.get(CHAVE_INICIO)
+    if inicios and _diagnostico is not None:
+        _diagnostico.registrar_comando(sql, (time.perf_counter() - inicios.pop()) * 1000)
+
+
+def _erro_no_comando(contexto_excecao) -> None:
+    # Comando que falhou não dispara after_cursor_execute: descarta o início
+    conexao = contexto_excecao.connection
+    if conexao is not None and conexao.info.get(CHAVE_INICIO):
+        conexao.info[CHAVE_INICIO].pop()
+
+
+def habilitar_diagnostico(configuracao: Optional[ConfiguracaoDiagnostico] = None) -> Optional[DiagnosticoSQL]:
+    """
+    Liga o diagnóstico no processo (idempotente) escutando os comandos de
+    todos os engines; retorna None quando SQL_DIAGNOSTICO está desligado
+    """
+    global _diagnostico
+    configuracao = configuracao or ConfiguracaoDiagnostico.do_ambiente()
+    if not configuracao.habilitado:
+        return None
+    if _diagnostico is None:
+        _diagnostico = DiagnosticoSQL(configuracao)
+        if not logger.handlers:
+            # Uma linha JSON por evento em stderr (o gunicorn/uvicorn não configuram este logger)
+            manipulador = logging.StreamHandler()
+            manipulador.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(manipulador)
+        logger.setLevel(logging.DEBUG if configuracao.modo == MODO_DESENVOLVIMENTO else logging.WARNING)
+        event.listen(Engine, 'before_cursor_execute', _antes_do_cursor)
+        event.listen(Engine, 'after_cursor_execute', _depois_do_cursor)
+        event.listen(Engine, 'handle_error', _erro_no_comando)
+    return _diagnostico
+
+
+def init_diagnostico_sql(app: Flask, configuracao: Optional[ConfiguracaoDiagnostico] = None) -> None:
+    """
+    Liga o diagnóstico de consultas na app Flask e expõe /api/debug/queries
+    Com SQL_DIAGNOSTICO desligado não registra nada.
+    """
+    diagnostico = habilitar_diagnostico(configuracao)
+    if diagnostico is None:
+        return
+
+    @app.before_request
+    def _iniciar_diagnostico():
+        if request.path == ROTA_DIAGNOSTICO:
+            return
+        rota = request.url_rule.rule if request.url_rule else request.path
+        g.diagnostico_inicio = diagnostico.iniciar_requisicao(rota, request.method)
+
+    @app.after_request
+    def _finalizar_diagnostico(resposta):
+        inicio = g.pop('diagnostico_inicio', None)
+        if inicio is not None:
+            diagnostico.finalizar_requisicao(inicio, resposta.status_code)
+        return resposta
+
+    def consultas_registradas():
+        apenas_alertas = request.args.get('alertas', 'false').lower() == 'true'
+        return jsonify(diagnostico.visao(apenas_alertas))
+
+    app.add_url_rule(ROTA_DIAGNOSTICO, 'consultas_registradas', consultas_registradas)
@@ -0,0 +1,88 @@
+# Infrastructure Layer - Índices do banco de dados
+
+from dataclasses import dataclass
+from typing import Dict, List
+from sqlalchemy import inspect
+from src.models.user import db
+from src.infrastructure.repositories import (
+    SQLAlchemyEmprestimoRepository, SQLAlchemyDoacaoRepository, SQLAlchemyHorasRepository
+)
+from datetime import datetime
+
+
+@dataclass
+class PlanoConsulta:
+    """Resultado do EXPLAIN de uma consulta de repositório"""
+    consulta: str
+    plano: List[str]
+    usa_indice: bool
+
+
+def criar_indices() -> List[str]:
+    """
+    Cria os índices declarados nos models que ainda não existem no banco
+    Idempotente: pode ser executado em bancos já existentes a qualquer momento
+    """
+    inspetor = inspect(db.engine)
+    criados = []
+    for tabela in db.metadata.sorted_tables:
+        if not inspetor.has_table(tabela.name):
+            continue
+        existentes = {indice['name'] for indice in inspetor.get_indexes(tabela.name)}
+        for indice in tabela.indexes:
+            if indice.name not in existentes:
+                indice.create(db.engine)
+                criados.append(indice.name)
+    return criados
+
+
+def consultas_dos_repositorios() -> Dict[str, object]:
+    """Consultas de filtro dos repositórios que devem ser atendidas por índice"""
+    emprestimos = SQLAlchemyEmprestimoRepository()
+    doacoes = SQLAlchemyDoacaoRepository()
+    horas = SQLAlchemyHorasRepository()
+    return {
+        'SQLAlchemyEmprestimoRepository.buscar_por_usuario': emprestimos.consulta_por_usuario(''),
+        'SQLAlchemyEmprestimoRepository.buscar_por_livro': emprestimos.consulta_por_livro(''),
+        'SQLAlchemyEmprestimoRepository.buscar_ativos': emprestimos.consulta_ativos(),
+        'SQLAlchemyEmprestimoRepository.buscar_em_atraso': emprestimos.consulta_em_atraso(datetime.now()),
+        'SQLAlchemyDoacaoRepository.buscar_por_usuario': doacoes.consulta_por_usuario(''),
+        'SQLAlchemyDoacaoRepository.buscar_por_livro': doacoes.consulta_por_livro(''),
+        'SQLAlchemyHorasRepository.buscar_por_usuario': horas.consulta_por_usuario(''),
+    }
+
+
+def verificar_uso_de_indices() -> List[PlanoConsulta]:
+    """
+    Executa EXPLAIN (SQLite: EXPLAIN QUERY PLAN) em cada consulta dos
+    repositórios e indica se ela é atendida por um índice
+    """
+    conexao = db.session.connection()
+    dialeto = conexao.dialect.name
+    resultados = []
+    
+    if dialeto == 'postgresql':
+        # Em tabelas pequenas o PostgreSQL prefere Seq Scan; aqui interessa se o índice é utilizável
+        conexao.exec_driver_sql('SET LOCAL enable_seqscan = off')
+    
+    for nome, consulta in consultas_dos_repositorios().items():
+        compilada = consulta.statement.compile(dialect=conexao.dialect)
+        if compilada.positiontup:
+            parametros = tuple(compilada.params[chave] for chave in compilada.positiontup)
+        else:
+            parametros = compilada.params
+        
+        if dialeto == 'sqlite':
+            linhas = conexao.exec_driver_sql(f'EXPLAIN QUERY PLAN {compilada}', parametros).all()
+            plano = [linha[-1] for linha in linhas]
+            varredura_total = any(passo.startswith('SCAN') and 'USING' not in passo for passo in plano)
+            usa_indice = not varredura_total and any('INDEX' in passo or 'PRIMARY KEY' in passo for passo in plano)
+        else:
+            linhas = conexao.exec_driver_sql(f'EXPLAIN {compilada}', parametros).all()
+            plano = [linha[0] for linha in linhas]
+            usa_indice = not any('Seq Scan' in passo for passo in plano) and any('Index' in passo for passo in plano)
+        
+        resultados.append(PlanoConsulta(nome, plano, usa_indice))
+    
+    db.session.rollback()
+    return resultados
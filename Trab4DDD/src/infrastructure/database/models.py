@@ -55,6 +55,27 @@ class EmprestimoModel(db.Model):
     livro = db.relationship('LivroModel', backref='emprestimos')
     usuario = db.relationship('UsuarioModel', backref='emprestimos')
     
+    # Índices desenhados a partir das consultas do SQLAlchemyEmprestimoRepository
+    __table_args__ = (
+        # buscar_por_usuario (e empréstimos ativos de um usuário)
+        db.Index('ix_emprestimos_usuario_devolucao', 'usuario_id', 'data_devolucao_real'),
+        # buscar_por_livro (e empréstimo ativo de um livro)
+        db.Index('ix_emprestimos_livro_devolucao', 'livro_id', 'data_devolucao_real'),
+        # buscar_ativos / buscar_em_atraso: índice parcial só com os empréstimos em aberto,
+        # ordenado pela data prevista de devolução
+        db.Index(
+            'ix_emprestimos_ativos_prevista', 'data_devolucao_prevista',
+            sqlite_where=db.text('data_devolucao_real IS NULL'),
+            postgresql_where=db.text('data_devolucao_real IS NULL')
+        ),
+        # multas pendentes (estatísticas): índice parcial só com os empréstimos multados
+        db.Index(
+            'ix_emprestimos_com_multa', 'id', 'multa',
+            sqlite_where=db.text('multa > 0'),
+            postgresql_where=db.text('multa > 0')
+        ),
+    )
+    
     def __repr__(self):
         return f'<Emprestimo {self.id}>'
 
@@ -72,6 +93,11 @@ class DoacaoModel(db.Model):
     # Relacionamentos
     livro = db.relationship('LivroModel', backref='doacoes')
     usuario = db.relationship('UsuarioModel', backref='doacoes')
+    
+    __table_args__ = (
+        db.Index('ix_doacoes_usuario', 'usuario_id'),
+        db.Index('ix_doacoes_livro', 'livro_id'),
+    )
     def __repr__(self):
         return f'<Doacao {self.id}>'    
 
@@ -88,5 +114,44 @@ class HorasModel(db.Model):
     
     # Relacionamentos
     usuario = db.relationship('UsuarioModel', backref='horas')
+    
+    __table_args__ = (
+        db.Index('ix_horas_usuario', 'usuario_id'),
+    )
     def __repr__(self):
         return f'<Horas {self.id}>'
+
+class MovimentoCreditoModel(db.Model):
+    """
+    Model SQLAlchemy para o extrato de créditos (somente inserção)
+    """
+    __tablename__ = 'movimentos_creditos'
+    id = db.Column(db.String(36), primary_key=True)
+    usuario_id = db.Column(db.String(36), db.ForeignKey('usuarios.id'), nullable=False)
+    valor = db.Column(db.Float, nullable=False)
+    origem = db.Column(db.String(30), nullable=False)
+    referencia_id = db.Column(db.String(36), nullable=True)
+    data = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        # extrato do usuário em ordem cronológica
+        db.Index('ix_movimentos_creditos_usuario_data', 'usuario_id', 'data'),
+        # lançamento de um empréstimo/doação (multas pendentes nas estatísticas)
+        db.Index('ix_movimentos_creditos_referencia', 'referencia_id', 'origem'),
+    )
+    def __repr__(self):
+        return f'<MovimentoCredito {self.id}>'
+
+class SnapshotAtrasosModel(db.Model):
+    """
+    Model SQLAlchemy para o snapshot diário de atrasos (materializado)
+    """
+    __tablename__ = 'snapshots_atrasos'
+    data = db.Column(db.Date, primary_key=True)
+    total_emprestimos = db.Column(db.Integer, default=0, nullable=False)
+    total_dias_atraso = db.Column(db.Integer, default=0, nullable=False)
+    multa_projetada = db.Column(db.Float, default=0.0, nullable=False)
+    gerado_em = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f'<SnapshotAtrasos {self.data}>'
@@ -0,0 +1,31 @@
+# Infrastructure Layer - Sessão atual do banco de dados
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+from sqlalchemy.orm import Session
+from src.models.user import db
+
+# Sessão definida explicitamente para o contexto atual (ex.: app ASGI)
+_sessao: ContextVar[Optional[Session]] = ContextVar('sessao_banco', default=None)
+
+
+def sessao_atual() -> Session:
+    """
+    Sessão usada pelos repositórios
+    - Flask: a sessão do Flask-SQLAlchemy (escopo da requisição)
+    - ASGI: a sessão síncrona do AsyncSession da requisição, definida com
+      usar_sessao dentro de AsyncSession.run_sync (o I/O passa pelo aiosqlite)
+    """
+    sessao = _sessao.get()
+    return sessao if sessao is not None else db.session()
+
+
+@contextmanager
+def usar_sessao(sessao: Session) -> Iterator[Session]:
+    """Faz os repositórios usarem a sessão informada dentro do bloco"""
+    token = _sessao.set(sessao)
+    try:
+        yield sessao
+    finally:
+        _sessao.reset(token)
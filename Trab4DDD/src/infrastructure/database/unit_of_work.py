@@ -0,0 +1,62 @@
+# Infrastructure Layer - Unit of Work
+
+from src.domain.repositories import UnitOfWork
+from src.infrastructure.database.config import OPCAO_BEGIN_SQLITE
+from src.infrastructure.database.sessao import sessao_atual
+
+# Chave em session.info com a profundidade de Units of Work abertas
+CHAVE_PROFUNDIDADE = 'unit_of_work_profundidade'
+
+
+def unit_of_work_ativa() -> bool:
+    """Indica se há uma Unit of Work aberta na sessão atual"""
+    return sessao_atual().info.get(CHAVE_PROFUNDIDADE, 0) > 0
+
+
+def confirmar_transacao() -> None:
+    """
+    Usado pelos repositórios após gravar
+    Dentro de uma Unit of Work o commit fica para o fim do caso de uso
+    """
+    if not unit_of_work_ativa():
+        sessao_atual().commit()
+
+
+def reverter_transacao() -> None:
+    """
+    Usado pelos repositórios quando uma gravação falha
+    Dentro de uma Unit of Work o rollback fica a cargo dela
+    """
+    if not unit_of_work_ativa():
+        sessao_atual().rollback()
+
+
+class SQLAlchemyUnitOfWork(UnitOfWork):
+    """
+    Implementação concreta da UnitOfWork sobre a sessão atual (Flask-SQLAlchemy
+    ou a sessão da requisição ASGI). O estado fica em session.info, portanto é
+    isolado por requisição.
+    Units of Work aninhadas participam da transação mais externa.
+    """
+    
+    def iniciar(self) -> None:
+        sessao = sessao_atual()
+        profundidade = sessao.info.get(CHAVE_PROFUNDIDADE, 0)
+        if profundidade == 0 and not sessao.in_transaction():
+            # Transação de escrita: no SQLite reserva o lock já no BEGIN (BEGIN IMMEDIATE)
+            sessao.connection(execution_options={OPCAO_BEGIN_SQLITE: 'IMMEDIATE'})
+        sessao.info[CHAVE_PROFUNDIDADE] = profundidade + 1
+    
+    def commit(self) -> None:
+        if self._encerrar() == 0:
+            sessao_atual().commit()
+    
+    def rollback(self) -> None:
+        if self._encerrar() == 0:
+            sessao_atual().rollback()
+    
+    def _encerrar(self) -> int:
+        sessao = sessao_atual()
+        profundidade = max(sessao.info.get(CHAVE_PROFUNDIDADE, 0) - 1, 0)
+        sessao.info[CHAVE_PROFUNDIDADE] = profundidade
+        return profundidade
@@ -0,0 +1,64 @@
+# Infrastructure Layer - Upsert em comando único
+
+from typing import Iterable, Optional, Set
+from sqlalchemy.orm.util import identity_key
+from src.infrastructure.database.sessao import sessao_atual
+
+
+def upsert(
+    model,
+    valores: dict,
+    colunas_alteradas: Optional[Set[str]] = None,
+    colunas_somente_insercao: Iterable[str] = (),
+    condicao=None
+) -> Optional[int]:
+    """
+    Grava uma linha com um único INSERT ... ON CONFLICT DO UPDATE
+    
+    - colunas_alteradas=None: entidade nova, todas as colunas são gravadas
+    - colunas_alteradas vazio: nada mudou, nenhum comando é enviado
+    - caso contrário, o UPDATE do conflito toca apenas as colunas alteradas
+    - condicao: o UPDATE só acontece se a linha existente a satisfizer
+    
+    Retorna o número de linhas gravadas (None quando não é possível saber).
+    Suporta SQLite e PostgreSQL; outros dialetos usam session.merge.
+    """
+    if colunas_alteradas is not None and not colunas_alteradas:
+        return None
+    
+    tabela = model.__table__
+    chaves = [coluna.name for coluna in tabela.primary_key.columns]
+    atualizar = [
+        coluna for coluna in valores
+        if coluna not in chaves
+        and coluna not in colunas_somente_insercao
+        and (colunas_alteradas is None or coluna in colunas_alteradas)
+    ]
+    
+    sessao = sessao_atual()
+    dialeto = sessao.get_bind().dialect.name
+    if dialeto == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialeto == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        sessao.merge(model(**valores))
+        return None
+    
+    comando = insert(tabela).values(**valores)
+    if atualizar:
+        comando = comando.on_conflict_do_update(
+            index_elements=chaves,
+            set_={coluna: comando.excluded[coluna] for coluna in atualizar},
+            where=condicao
+        )
+    else:
+        comando = comando.on_conflict_do_nothing(index_elements=chaves)
+    
+    resultado = sessao.execute(comando)
+    
+    # O comando não passa pelo ORM: descarta a cópia em memória, se houver
+    instancia = sessao.identity_map.get(identity_key(model, tuple(valores[chave] for chave in chaves)))
+    if instancia is not None:
+        sessao.expire(instancia)
+    return resultado.rowcount
@@ -0,0 +1,236 @@
+# Infrastructure Layer - Métricas no formato Prometheus
+#
+# Desligadas por padrão (METRICAS=1 liga). Desligadas, nada é instrumentado:
+# nenhum método é envolvido e nenhum evento do SQLAlchemy é registrado.
+
+import inspect
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import wraps
+from typing import Iterable, Optional, Tuple
+from flask import Flask, Response, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Buckets de latência (segundos): de 0,5 ms a 10 s
+BUCKETS_LATENCIA = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Buckets de quantidade de consultas SQL por requisição
+BUCKETS_CONSULTAS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100, 200)
+
+# Chave em Connection.info com os instantes de início dos comandos em execução
+CHAVE_INICIO_SQL = 'metricas_inicio_sql'
+
+
+@dataclass
+class ConfiguracaoMetricas:
+    """
+    Configuração das métricas
+    Com vários workers (gunicorn), defina PROMETHEUS_MULTIPROC_DIR para que
+    /metrics agregue todos os processos.
+    """
+    habilitado: bool = False
+    diretorio_multiprocesso: Optional[str] = None
+
+    @classmethod
+    def do_ambiente(cls) -> 'ConfiguracaoMetricas':
+        """Monta a configuração a partir de METRICAS e PROMETHEUS_MULTIPROC_DIR"""
+        return cls(
+            habilitado=os.environ.get('METRICAS', '').lower() in ('1', 'true', 'sim'),
+            diretorio_multiprocesso=os.environ.get('PROMETHEUS_MULTIPROC_DIR') or None
+        )
+
+
+@dataclass
+class ContagemSQL:
+    """Consultas SQL e tempo de banco acumulados na requisição atual"""
+    consultas: int = 0
+    segundos: float = 0.0
+
+
+# Contagem da requisição atual (Flask: por thread; ASGI: por task, visível no run_sync)
+_contagem_sql: ContextVar[Optional[ContagemSQL]] = ContextVar('contagem_sql', default=None)
+
+
+class Metricas:
+    """Métricas da aplicação (uma instância por processo)"""
+
+    def __init__(self, configuracao: ConfiguracaoMetricas):
+        from prometheus_client import CollectorRegistry, Counter, Histogram
+
+        self.configuracao = configuracao
+        self.registro = CollectorRegistry(auto_describe=True)
+        self.use_case_duracao = Histogram(
+            'biblioteca_use_case_duracao_segundos', 'Duração dos métodos executar* dos casos de uso',
+            ['use_case', 'metodo'], buckets=BUCKETS_LATENCIA, registry=self.registro
+        )
+        self.repositorio_duracao = Histogram(
+            'biblioteca_repositorio_duracao_segundos', 'Duração dos métodos dos repositórios',
+            ['repositorio', 'metodo'], buckets=BUCKETS_LATENCIA, registry=self.registro
+        )
+        self.erros = Counter(
+            'biblioteca_erros_total', 'Exceções levantadas por casos de uso e repositórios',
+            ['componente', 'operacao', 'tipo'], registry=self.registro
+        )
+        self.requisicao_duracao = Histogram(
+            'biblioteca_requisicao_duracao_segundos', 'Duração das requisições HTTP',
+            ['rota', 'metodo', 'status'], buckets=BUCKETS_LATENCIA, registry=self.registro
+        )
+        self.sql_consultas = Histogram(
+            'biblioteca_sql_consultas_por_requisicao', 'Consultas SQL executadas por requisição',
+            ['rota'], buckets=BUCKETS_CONSULTAS, registry=self.registro
+        )
+        self.sql_duracao = Histogram(
+            'biblioteca_sql_duracao_por_requisicao_segundos', 'Tempo de banco (cursor.execute) por requisição',
+            ['rota'], buckets=BUCKETS_LATENCIA, registry=self.registro
+        )
+
+    def exposicao(self) -> Tuple[bytes, str]:
+        """Texto no formato Prometheus e o content type correspondente"""
+        from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest, multiprocess
+
+        if self.configuracao.diretorio_multiprocesso:
+            registro = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registro)
+            return generate_latest(registro), CONTENT_TYPE_LATEST
+        return generate_latest(self.registro), CONTENT_TYPE_LATEST
+
+    def iniciar_requisicao(self):
+        """Abre a contagem de SQL da requisição; devolve o token para finalizar"""
+        return _contagem_sql.set(ContagemSQL()), time.perf_counter()
+
+    def finalizar_requisicao(self, inicio, rota: str, metodo: str, status: int) -> None:
+        token, instante = inicio
+        contagem = _contagem_sql.get()
+        _contagem_sql.reset(token)
+        self.requisicao_duracao.labels(rota, metodo, str(status)).observe(time.perf_counter() - instante)
+        if contagem is not None:
+            self.sql_consultas.labels(rota).observe(contagem.consultas)
+            self.sql_duracao.labels(rota).observe(contagem.segundos)
+
+
+# Instância do processo; None enquanto as métricas estiverem desligadas
+_metricas: Optional[Metricas] = None
+
+
+def metricas_atuais() -> Optional[Metricas]:
+    return _metricas
+
+
+def _medir(funcao, histograma, componente: str, operacao: str, erros):
+    @wraps(funcao)
+    def medido(*args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return funcao(*args, **kwargs)
+        except Exception as e:
+            erros.labels(componente, operacao, type(e).__name__).inc()
+            raise
+        finally:
+            histograma.observe(time.perf_counter() - inicio)
+
+    medido.__metricas__ = True
+    return medido
+
+
+def instrumentar_classe(classe, histograma, componente: str, metodos: Iterable[str], erros) -> None:
+    """
+    Envolve os métodos informados da classe com medição de latência e
+    contagem de erros (idempotente; geradores não são medidos)
+    """
+    for nome in metodos:
+        funcao = classe.__dict__.get(nome)
+        if funcao is None or getattr(funcao, '__metricas__', False) or inspect.isgeneratorfunction(funcao):
+            continue
+        filho = histograma.labels(classe.__name__, nome)
+        setattr(classe, nome, _medir(funcao, filho, componente, f'{classe.__name__}.{nome}', erros))
+
+
+def _metodos_do_contrato(classe) -> set:
+    """Métodos abstratos das ABCs de domínio implementadas pela classe"""
+    return {nome for base in classe.__mro__[1:] for nome in getattr(base, '__abstractmethods__', ())}
+
+
+def _instrumentar_aplicacao(metricas: Metricas) -> None:
+    from src.application import use_cases
+    from src.infrastructure import repositories
+
+    for classe in vars(use_cases).values():
+        if inspect.isclass(classe) and classe.__name__.endswith('UseCase') and classe.__module__ == use_cases.__name__:
+            metodos = [nome for nome in vars(classe) if nome.startswith('executar')]
+            instrumentar_classe(classe, metricas.use_case_duracao, 'use_case', metodos, metricas.erros)
+
+    for classe in vars(repositories).values():
+        if inspect.isclass(classe) and classe.__name__.startswith('SQLAlchemy') and classe.__name__.endswith('Repository'):
+            instrumentar_classe(
+                classe, metricas.repositorio_duracao, 'repositorio', _metodos_do_contrato(classe), metricas.erros
+            )
+
+
+def _antes_do_cursor(conexao, _cursor, _sql, _parametros, _contexto, _executemany):
+    if _contagem_sql.get() is not None:
+        conexao.info.setdefault(CHAVE_INICIO_SQL, []).append(time.perf_counter())
+
+
+def _depois_do_cursor(conexao, _cursor, _sql, _parametros, _contexto, _executemany):
+    contagem = _contagem_sql.get()
+    inicios = conexao.info.get(CHAVE_INICIO_SQL)
+    if contagem is not None and inicios:
+        contagem.consultas += 1
+        contagem.segundos += time.perf_counter() - inicios.pop()
+
+
+def _erro_no_comando(contexto_excecao) -> None:
+    # Comando que falhou não dispara after_cursor_execute: descarta o início
+    conexao = contexto_excecao.connection
+    if conexao is not None and conexao.info.get(CHAVE_INICIO_SQL):
+        conexao.info[CHAVE_INICIO_SQL].pop()
+
+
+def habilitar_metricas(configuracao: Optional[ConfiguracaoMetricas] = None) -> Optional[Metricas]:
+    """
+    Liga as métricas no processo (idempotente): instrumenta casos de uso e
+    repositórios e passa a contar os comandos SQL de todos os engines
+    Retorna None quando METRICAS está desligado.
+    """
+    global _metricas
+    configuracao = configuracao or ConfiguracaoMetricas.do_ambiente()
+    if not configuracao.habilitado:
+        return None
+    if _metricas is None:
+        _metricas = Metricas(configuracao)
+        _instrumentar_aplicacao(_metricas)
+        event.listen(Engine, 'before_cursor_execute', _antes_do_cursor)
+        event.listen(Engine, 'after_cursor_execute', _depois_do_cursor)
+        event.listen(Engine, 'handle_error', _erro_no_comando)
+    return _metricas
+
+
+def init_metricas(app: Flask, configuracao: Optional[ConfiguracaoMetricas] = None) -> None:
+    """
+    Liga as métricas na app Flask: mede cada requisição e expõe /metrics
+    Com as métricas desligadas não registra nada (e /metrics não existe).
+    """
+    metricas = habilitar_metricas(configuracao)
+    if metricas is None:
+        return
+
+    @app.before_request
+    def _iniciar_medicao():
+        g.metricas_inicio = metricas.iniciar_requisicao()
+
+    @app.after_request
+    def _registrar_medicao(resposta):
+        inicio = g.pop('metricas_inicio', None)
+        if inicio is not None:
+            rota = request.url_rule.rule if request.url_rule else 'desconhecida'
+            metricas.finalizar_requisicao(inicio, rota, request.method, resposta.status_code)
+        return resposta
+
+    def exportar_metricas():
+        conteudo, tipo = metricas.exposicao()
+        return Response(conteudo, content_type=tipo)
+
+    app.add_url_rule('/metrics', 'metricas', exportar_metricas)
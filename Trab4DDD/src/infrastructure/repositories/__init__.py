@@ -1,13 +1,48 @@
 # Infrastructure Layer - Repository Implementations
 
-from typing import List, Optional
-from src.domain.entities import Livro, Usuario, Emprestimo, Doacao, Horas
-from src.domain.repositories import LivroRepository, UsuarioRepository, EmprestimoRepository, DoacaoRepository, HorasRepository
+from typing import Callable, Iterator, List, Optional, Set, Tuple
+from sqlalchemy import DateTime, Integer, case, cast, func, insert, literal, or_, select, text, union_all, update
+from sqlalchemy.exc import IntegrityError
+from src.domain.entities import (
+    Livro, Usuario, Emprestimo, Doacao, Horas, MovimentoCredito, ORIGEM_DOACAO_HORAS, ORIGEM_DOACAO_LIVRO, ORIGEM_MULTA
+)
+from src.domain.repositories import (
+    LivroRepository, UsuarioRepository, EmprestimoRepository, DoacaoRepository, HorasRepository, SnapshotAtrasosRepository,
+    CreditoRepository, EstatisticasRepository
+)
+from src.domain.value_objects.atraso import AtrasoEmprestimo, ResumoAtrasos
+from src.domain.value_objects.estatisticas import EstatisticasBiblioteca
 from src.domain.value_objects.isbn import ISBN
 from src.domain.value_objects.email import Email
-from src.infrastructure.database.models import LivroModel, UsuarioModel, EmprestimoModel, DoacaoModel, HorasModel
-from src.models.user import db
-from datetime import datetime
+from src.infrastructure.database.models import (
+    LivroModel, UsuarioModel, EmprestimoModel, DoacaoModel, HorasModel, SnapshotAtrasosModel, MovimentoCreditoModel
+)
+from src.infrastructure.database.upsert import upsert
+from src.infrastructure.database import busca
+from src.infrastructure.database.sessao import sessao_atual
+from src.infrastructure.database.unit_of_work import confirmar_transacao, reverter_transacao
+from src.infrastructure.repositories import identity_map as mapa_identidade
+from src.infrastructure.repositories.versoes import COLECAO_EMPRESTIMOS, COLECAO_LIVROS, marcar_alteracao
+from datetime import date, datetime
+
+# Quantidade máxima de parâmetros em uma cláusula IN (limite seguro para SQLite)
+TAMANHO_MAXIMO_IN = 500
+
+
+def _buscar_models_por_ids(model, ids: List[str], bloquear: bool = False) -> list:
+    """
+    Busca models por ID com cláusulas IN em blocos
+    bloquear=True usa SELECT ... FOR UPDATE (PostgreSQL); no SQLite a
+    transação de escrita da Unit of Work (BEGIN IMMEDIATE) já detém o lock
+    """
+    ids = list(dict.fromkeys(ids))
+    models = []
+    for inicio in range(0, len(ids), TAMANHO_MAXIMO_IN):
+        consulta = select(model).where(model.id.in_(ids[inicio:inicio + TAMANHO_MAXIMO_IN]))
+        if bloquear:
+            consulta = consulta.with_for_update()
+        models.extend(sessao_atual().execute(consulta).scalars())
+    return models
 
 
 class SQLAlchemyLivroRepository(LivroRepository):
@@ -18,70 +53,211 @@ class SQLAlchemyLivroRepository(LivroRepository):
     """
     
     def salvar(self, livro: Livro) -> None:
-        """Salva um livro no banco de dados"""
-        livro_model = LivroModel.query.filter_by(id=livro.id).first()
-        
-        if livro_model:
-            # Atualizar existente
-            livro_model.titulo = livro.titulo
-            livro_model.autor = livro.autor
-            livro_model.isbn = str(livro.isbn)
-            livro_model.disponivel = livro.disponivel
-        else:
-            # Criar novo
-            livro_model = LivroModel(
-                id=livro.id,
-                titulo=livro.titulo,
-                autor=livro.autor,
-                isbn=str(livro.isbn),
-                disponivel=livro.disponivel
-            )
-            db.session.add(livro_model)
+        """Salva um livro no banco de dados (upsert em comando único)"""
+        valores = self._entidade_para_valores(livro)
+        alterados = livro.campos_alterados
+        # Empréstimo: só grava se o livro ainda está disponível no banco, mesmo que
+        # a leitura do caso de uso tenha visto um estado antigo
+        emprestando = alterados is not None and 'disponivel' in alterados and not livro.disponivel
+        gravadas = upsert(
+            LivroModel, valores, alterados,
+            condicao=LivroModel.__table__.c.disponivel.is_(True) if emprestando else None
+        )
+        if emprestando and gravadas == 0:
+            reverter_transacao()
+            raise ValueError("Livro não está disponível para empréstimo")
+        marcar_alteracao(COLECAO_LIVROS)
         
-        db.session.commit()
+        # Índice de busca só muda quando o texto muda (empréstimos não o tocam)
+        if alterados is None or alterados & set(busca.COLUNAS_BUSCA):
+            busca.indexar_livros([valores], novos=alterados is None)
+        confirmar_transacao()
+        livro.marcar_como_persistido()
+        mapa_identidade.colocar(livro)
     
     def buscar_por_id(self, id: str) -> Optional[Livro]:
         """Busca livro por ID"""
-        livro_model = LivroModel.query.filter_by(id=id).first()
+        livro = mapa_identidade.obter(Livro, id)
+        if livro:
+            return livro
+        
+        livro_model = sessao_atual().query(LivroModel).filter_by(id=id).first()
         if not livro_model:
             return None
         
-        return self._model_para_entidade(livro_model)
+        return mapa_identidade.registrar(self._model_para_entidade(livro_model))
     
     def buscar_por_isbn(self, isbn: str) -> Optional[Livro]:
         """Busca livro por ISBN"""
-        livro_model = LivroModel.query.filter_by(isbn=isbn).first()
+        livro_model = sessao_atual().query(LivroModel).filter_by(isbn=isbn).first()
         if not livro_model:
             return None
         
-        return self._model_para_entidade(livro_model)
+        return mapa_identidade.registrar(self._model_para_entidade(livro_model))
+    
+    def buscar_por_ids(self, ids: List[str], bloquear: bool = False) -> List[Livro]:
+        """Busca vários livros com uma consulta IN"""
+        return [
+            mapa_identidade.registrar(self._model_para_entidade(livro), atualizar=bloquear)
+            for livro in _buscar_models_por_ids(LivroModel, ids, bloquear)
+        ]
     
     def buscar_todos(self) -> List[Livro]:
         """Busca todos os livros"""
-        livros_model = LivroModel.query.all()
+        livros_model = sessao_atual().query(LivroModel).all()
         return [self._model_para_entidade(livro) for livro in livros_model]
     
     def buscar_disponiveis(self) -> List[Livro]:
         """Busca livros disponíveis"""
-        livros_model = LivroModel.query.filter_by(disponivel=True).all()
+        livros_model = sessao_atual().query(LivroModel).filter_by(disponivel=True).all()
+        return [self._model_para_entidade(livro) for livro in livros_model]
+    
+    def buscar_pagina(self, limite: int, apos_id: Optional[str] = None, apenas_disponiveis: bool = False) -> List[Livro]:
+        """
+        Busca uma página de livros usando keyset pagination sobre o ID
+        O custo não depende da posição da página (sem OFFSET)
+        """
+        consulta = sessao_atual().query(LivroModel)
+        if apenas_disponiveis:
+            consulta = consulta.filter_by(disponivel=True)
+        if apos_id:
+            consulta = consulta.filter(LivroModel.id > apos_id)
+        
+        livros_model = consulta.order_by(LivroModel.id).limit(limite).all()
         return [self._model_para_entidade(livro) for livro in livros_model]
     
+    def pesquisar(self, termo: str, limite: int, deslocamento: int = 0, apenas_disponiveis: bool = False) -> List[Livro]:
+        """
+        Busca textual no catálogo
+        SQLite: tabela FTS5 (prefixo, sem acentos, ordenada por bm25).
+        Outros bancos: LIKE por palavra em título/autor/ISBN, ordenado por título.
+        """
+        if not busca.termos_da_busca(termo):
+            # MATCH vazio é erro de sintaxe no FTS5; sem palavras não há o que encontrar
+            return []
+        if busca.busca_textual_disponivel():
+            consulta = (
+                select(LivroModel)
+                .from_statement(self.consulta_pesquisa(apenas_disponiveis))
+            )
+            parametros = {
+                'consulta': busca.montar_consulta_fts(termo),
+                'limite': limite,
+                'deslocamento': deslocamento
+            }
+            livros_model = sessao_atual().execute(consulta, parametros).scalars()
+        else:
+            consulta = sessao_atual().query(LivroModel)
+            for palavra in busca.termos_da_busca(termo):
+                padrao = f'%{palavra}%'
+                consulta = consulta.filter(or_(
+                    LivroModel.titulo.ilike(padrao), LivroModel.autor.ilike(padrao), LivroModel.isbn.ilike(padrao)
+                ))
+            if apenas_disponiveis:
+                consulta = consulta.filter_by(disponivel=True)
+            livros_model = consulta.order_by(LivroModel.titulo, LivroModel.id).limit(limite).offset(deslocamento).all()
+        
+        return [self._model_para_entidade(livro) for livro in livros_model]
+    
+    def consulta_pesquisa(self, apenas_disponiveis: bool = False):
+        relevancia = f"bm25({busca.TABELA_BUSCA}, {', '.join(map(str, busca.PESOS_BM25))})"
+        if apenas_disponiveis:
+            return text(
+                f"SELECT l.* FROM {busca.TABELA_BUSCA} f JOIN livros l ON l.id = f.id "
+                f"WHERE {busca.TABELA_BUSCA} MATCH :consulta AND l.disponivel = 1 "
+                f"ORDER BY {relevancia}, l.id LIMIT :limite OFFSET :deslocamento"
+            )
+        # Ordena e pagina só no índice de busca; junta com livros apenas a página
+        return text(
+            f"SELECT l.* FROM (SELECT id, {relevancia} AS relevancia FROM {busca.TABELA_BUSCA} "
+            f"WHERE {busca.TABELA_BUSCA} MATCH :consulta ORDER BY relevancia, id "
+            "LIMIT :limite OFFSET :deslocamento) f "
+            "JOIN livros l ON l.id = f.id ORDER BY f.relevancia, l.id"
+        )
+    
+    def iterar_todos(self, apenas_disponiveis: bool = False, tamanho_lote: int = 1000) -> Iterator[Livro]:
+        """
+        Percorre os livros em lotes com yield_per
+        Apenas um lote de linhas fica em memória por vez
+        """
+        consulta = select(LivroModel).order_by(LivroModel.id)
+        if apenas_disponiveis:
+            consulta = consulta.where(LivroModel.disponivel.is_(True))
+        
+        resultado = sessao_atual().execute(consulta.execution_options(yield_per=tamanho_lote)).scalars()
+        for livro_model in resultado:
+            yield self._model_para_entidade(livro_model)
+    
+    def buscar_isbns_existentes(self, isbns: List[str]) -> Set[str]:
+        """Busca em conjunto quais ISBNs já existem, sem carregar os livros"""
+        existentes = set()
+        for inicio in range(0, len(isbns), TAMANHO_MAXIMO_IN):
+            parte = isbns[inicio:inicio + TAMANHO_MAXIMO_IN]
+            resultado = sessao_atual().execute(select(LivroModel.isbn).where(LivroModel.isbn.in_(parte)))
+            existentes.update(resultado.scalars())
+        return existentes
+    
+    def salvar_em_lote(self, livros: List[Livro]) -> None:
+        """
+        Insere vários livros com um único executemany e um único commit
+        """
+        if not livros:
+            return
+        
+        valores = [
+            {
+                'id': livro.id,
+                'titulo': livro.titulo,
+                'autor': livro.autor,
+                'isbn': str(livro.isbn),
+                'disponivel': livro.disponivel
+            }
+            for livro in livros
+        ]
+        
+        try:
+            sessao_atual().execute(insert(LivroModel), valores)
+            busca.indexar_livros(valores, novos=True)
+            marcar_alteracao(COLECAO_LIVROS)
+            confirmar_transacao()
+        except IntegrityError:
+            reverter_transacao()
+            raise ValueError("Violação de integridade ao inserir lote de livros")
+        
+        for livro in livros:
+            livro.marcar_como_persistido()
+    
     def deletar(self, id: str) -> None:
         """Deleta um livro"""
-        livro_model = LivroModel.query.filter_by(id=id).first()
+        livro_model = sessao_atual().query(LivroModel).filter_by(id=id).first()
         if livro_model:
-            db.session.delete(livro_model)
-            db.session.commit()
+            sessao_atual().delete(livro_model)
+            busca.remover_livros([id])
+            marcar_alteracao(COLECAO_LIVROS)
+            confirmar_transacao()
+        mapa_identidade.remover(Livro, id)
+    
+    def _entidade_para_valores(self, livro: Livro) -> dict:
+        """Converte entidade de domínio para os valores das colunas"""
+        return {
+            'id': livro.id,
+            'titulo': livro.titulo,
+            'autor': livro.autor,
+            'isbn': str(livro.isbn),
+            'disponivel': livro.disponivel
+        }
     
     def _model_para_entidade(self, livro_model: LivroModel) -> Livro:
         """Converte model para entidade de domínio"""
-        return Livro(
+        entidade = Livro(
             id=livro_model.id,
             titulo=livro_model.titulo,
             autor=livro_model.autor,
             isbn=ISBN(livro_model.isbn),
             disponivel=livro_model.disponivel
         )
+        entidade.marcar_como_persistido()
+        return entidade
 
 
 class SQLAlchemyUsuarioRepository(UsuarioRepository):
@@ -90,62 +266,80 @@ class SQLAlchemyUsuarioRepository(UsuarioRepository):
     """
     
     def salvar(self, usuario: Usuario) -> None:
-        """Salva um usuário no banco de dados"""
-        usuario_model = UsuarioModel.query.filter_by(id=usuario.id).first()
-        
-        if usuario_model:
-            # Atualizar existente
-            usuario_model.nome = usuario.nome
-            usuario_model.email = str(usuario.email)
-            usuario_model.ativo = usuario.ativo
-        else:
-            # Criar novo
-            usuario_model = UsuarioModel(
-                id=usuario.id,
-                nome=usuario.nome,
-                email=str(usuario.email),
-                ativo=usuario.ativo
-            )
-            db.session.add(usuario_model)
-        
-        db.session.commit()
+        """
+        Salva um usuário no banco de dados (upsert em comando único)
+        O saldo de créditos só é gravado na inserção; depois disso ele muda
+        apenas pelos lançamentos do CreditoRepository.
+        """
+        alterados = usuario.campos_alterados
+        if alterados is not None:
+            alterados.discard('creditos')
+        upsert(UsuarioModel, self._entidade_para_valores(usuario), alterados, colunas_somente_insercao=('creditos',))
+        confirmar_transacao()
+        usuario.marcar_como_persistido()
+        mapa_identidade.colocar(usuario)
     
     def buscar_por_id(self, id: str) -> Optional[Usuario]:
         """Busca usuário por ID"""
-        usuario_model = UsuarioModel.query.filter_by(id=id).first()
+        usuario = mapa_identidade.obter(Usuario, id)
+        if usuario:
+            return usuario
+        
+        usuario_model = sessao_atual().query(UsuarioModel).filter_by(id=id).first()
         if not usuario_model:
             return None
         
-        return self._model_para_entidade(usuario_model)
+        return mapa_identidade.registrar(self._model_para_entidade(usuario_model))
     
     def buscar_por_email(self, email: str) -> Optional[Usuario]:
         """Busca usuário por email"""
-        usuario_model = UsuarioModel.query.filter_by(email=email).first()
+        usuario_model = sessao_atual().query(UsuarioModel).filter_by(email=email).first()
         if not usuario_model:
             return None
         
-        return self._model_para_entidade(usuario_model)
+        return mapa_identidade.registrar(self._model_para_entidade(usuario_model))
+    
+    def buscar_por_ids(self, ids: List[str]) -> List[Usuario]:
+        """Busca vários usuários com uma consulta IN"""
+        return [
+            mapa_identidade.registrar(self._model_para_entidade(usuario))
+            for usuario in _buscar_models_por_ids(UsuarioModel, ids)
+        ]
     
     def buscar_todos(self) -> List[Usuario]:
         """Busca todos os usuários"""
-        usuarios_model = UsuarioModel.query.all()
+        usuarios_model = sessao_atual().query(UsuarioModel).all()
         return [self._model_para_entidade(usuario) for usuario in usuarios_model]
     
     def deletar(self, id: str) -> None:
         """Deleta um usuário"""
-        usuario_model = UsuarioModel.query.filter_by(id=id).first()
+        usuario_model = sessao_atual().query(UsuarioModel).filter_by(id=id).first()
         if usuario_model:
-            db.session.delete(usuario_model)
-            db.session.commit()
+            sessao_atual().delete(usuario_model)
+            confirmar_transacao()
+        mapa_identidade.remover(Usuario, id)
+    
+    def _entidade_para_valores(self, usuario: Usuario) -> dict:
+        """Converte entidade de domínio para os valores das colunas"""
+        return {
+            'id': usuario.id,
+            'nome': usuario.nome,
+            'email': str(usuario.email),
+            'creditos': usuario.creditos,
+            'ativo': usuario.ativo
+        }
     
     def _model_para_entidade(self, usuario_model: UsuarioModel) -> Usuario:
         """Converte model para entidade de domínio"""
-        return Usuario(
+        entidade = Usuario(
             id=usuario_model.id,
             nome=usuario_model.nome,
             email=Email(usuario_model.email),
+            creditos=usuario_model.creditos,
             ativo=usuario_model.ativo
         )
+        entidade.marcar_como_persistido()
+        return entidade
 
 
 class SQLAlchemyEmprestimoRepository(EmprestimoRepository):
@@ -154,79 +348,186 @@ class SQLAlchemyEmprestimoRepository(EmprestimoRepository):
     """
     
     def salvar(self, emprestimo: Emprestimo) -> None:
-        """Salva um empréstimo no banco de dados"""
-        emprestimo_model = EmprestimoModel.query.filter_by(id=emprestimo.id).first()
+        """Salva um empréstimo no banco de dados (upsert em comando único)"""
+        upsert(EmprestimoModel, self._entidade_para_valores(emprestimo), emprestimo.campos_alterados)
+        marcar_alteracao(COLECAO_EMPRESTIMOS)
+        confirmar_transacao()
+        emprestimo.marcar_como_persistido()
+        mapa_identidade.colocar(emprestimo)
+    
+    def salvar_em_lote(self, emprestimos: List[Emprestimo]) -> None:
+        """Insere vários empréstimos com um único executemany"""
+        if not emprestimos:
+            return
         
-        if emprestimo_model:
-            # Atualizar existente
-            emprestimo_model.livro_id = emprestimo.livro_id
-            emprestimo_model.usuario_id = emprestimo.usuario_id
-            emprestimo_model.data_emprestimo = emprestimo.data_emprestimo
-            emprestimo_model.data_devolucao_prevista = emprestimo.data_devolucao_prevista
-            emprestimo_model.data_devolucao_real = emprestimo.data_devolucao_real
-            emprestimo_model.multa = emprestimo.multa
-        else:
-            # Criar novo
-            emprestimo_model = EmprestimoModel(
-                id=emprestimo.id,
-                livro_id=emprestimo.livro_id,
-                usuario_id=emprestimo.usuario_id,
-                data_emprestimo=emprestimo.data_emprestimo,
-                data_devolucao_prevista=emprestimo.data_devolucao_prevista,
-                data_devolucao_real=emprestimo.data_devolucao_real,
-                multa=emprestimo.multa
-            )
-            db.session.add(emprestimo_model)
+        try:
+            sessao_atual().execute(insert(EmprestimoModel), [self._entidade_para_valores(emp) for emp in emprestimos])
+            marcar_alteracao(COLECAO_EMPRESTIMOS)
+            confirmar_transacao()
+        except IntegrityError:
+            reverter_transacao()
+            raise ValueError("Violação de integridade ao inserir lote de empréstimos")
         
-        db.session.commit()
+        for emprestimo in emprestimos:
+            emprestimo.marcar_como_persistido()
     
     def buscar_por_id(self, id: str) -> Optional[Emprestimo]:
         """Busca empréstimo por ID"""
-        emprestimo_model = EmprestimoModel.query.filter_by(id=id).first()
+        emprestimo = mapa_identidade.obter(Emprestimo, id)
+        if emprestimo:
+            return emprestimo
+        
+        emprestimo_model = sessao_atual().query(EmprestimoModel).filter_by(id=id).first()
         if not emprestimo_model:
             return None
         
-        return self._model_para_entidade(emprestimo_model)
+        return mapa_identidade.registrar(self._model_para_entidade(emprestimo_model))
+    
+    def buscar_por_ids(self, ids: List[str], bloquear: bool = False) -> List[Emprestimo]:
+        """Busca vários empréstimos com uma consulta IN"""
+        return [
+            mapa_identidade.registrar(self._model_para_entidade(emp), atualizar=bloquear)
+            for emp in _buscar_models_por_ids(EmprestimoModel, ids, bloquear)
+        ]
     
     def buscar_por_usuario(self, usuario_id: str) -> List[Emprestimo]:
         """Busca empréstimos de um usuário"""
-        emprestimos_model = EmprestimoModel.query.filter_by(usuario_id=usuario_id).all()
+        emprestimos_model = self.consulta_por_usuario(usuario_id).all()
         return [self._model_para_entidade(emp) for emp in emprestimos_model]
     
     def buscar_por_livro(self, livro_id: str) -> List[Emprestimo]:
         """Busca empréstimos de um livro"""
-        emprestimos_model = EmprestimoModel.query.filter_by(livro_id=livro_id).all()
+        emprestimos_model = self.consulta_por_livro(livro_id).all()
         return [self._model_para_entidade(emp) for emp in emprestimos_model]
     
     def buscar_ativos(self) -> List[Emprestimo]:
-        """Busca empréstimos ativos (não devolvidos)"""
-        emprestimos_model = EmprestimoModel.query.filter_by(data_devolucao_real=None).all()
+        """Busca empréstimos ativos (não devolvidos), pela data prevista de devolução"""
+        emprestimos_model = self.consulta_ativos().all()
         return [self._model_para_entidade(emp) for emp in emprestimos_model]
     
-    def buscar_em_atraso(self) -> List[Emprestimo]:
+    def buscar_em_atraso(self, referencia: Optional[datetime] = None) -> List[Emprestimo]:
         """Busca empréstimos em atraso"""
-        agora = datetime.now()
-        emprestimos_model = EmprestimoModel.query.filter(
-            EmprestimoModel.data_devolucao_real.is_(None),
-            EmprestimoModel.data_devolucao_prevista < agora
-        ).all()
+        emprestimos_model = self.consulta_em_atraso(referencia or datetime.now()).all()
         return [self._model_para_entidade(emp) for emp in emprestimos_model]
     
+    def relatorio_atrasos(
+        self, referencia: datetime, multa_por_dia: float, limite: Optional[int] = None
+    ) -> List[AtrasoEmprestimo]:
+        """
+        Lista os atrasos com dias e multa projetada calculados no próprio SQL
+        (sem montar entidades), usando o índice parcial de empréstimos ativos
+        """
+        dias = self._expressao_dias_atraso(referencia)
+        if dias is None:
+            return [
+                AtrasoEmprestimo(
+                    emp.id, emp.livro_id, emp.usuario_id, emp.data_devolucao_prevista,
+                    emp.dias_atraso_em(referencia), emp.dias_atraso_em(referencia) * multa_por_dia
+                )
+                for emp in self.buscar_em_atraso(referencia)[:limite]
+            ]
+        
+        consulta = select(
+            EmprestimoModel.id,
+            EmprestimoModel.livro_id,
+            EmprestimoModel.usuario_id,
+            EmprestimoModel.data_devolucao_prevista,
+            dias,
+            dias * multa_por_dia
+        ).where(*self._filtros_em_atraso(referencia)).order_by(EmprestimoModel.data_devolucao_prevista)
+        if limite:
+            consulta = consulta.limit(limite)
+        
+        return [AtrasoEmprestimo(*linha) for linha in sessao_atual().execute(consulta)]
+    
+    def resumir_atrasos(self, referencia: datetime, multa_por_dia: float) -> ResumoAtrasos:
+        """Totaliza os atrasos com uma única agregação no banco"""
+        dias = self._expressao_dias_atraso(referencia)
+        if dias is None:
+            atrasos = self.relatorio_atrasos(referencia, multa_por_dia)
+            total, soma_dias = len(atrasos), sum(atraso.dias_atraso for atraso in atrasos)
+        else:
+            total, soma_dias = sessao_atual().execute(
+                select(func.count(), func.coalesce(func.sum(dias), 0)).where(*self._filtros_em_atraso(referencia))
+            ).one()
+        
+        return ResumoAtrasos(
+            data=referencia.date(),
+            total_emprestimos=total,
+            total_dias_atraso=int(soma_dias),
+            multa_projetada=int(soma_dias) * multa_por_dia,
+            gerado_em=referencia
+        )
+    
+    # Consultas usadas pelos métodos acima; expostas para a verificação de índices (EXPLAIN)
+    
+    def consulta_por_usuario(self, usuario_id: str):
+        return sessao_atual().query(EmprestimoModel).filter_by(usuario_id=usuario_id)
+    
+    def consulta_por_livro(self, livro_id: str):
+        return sessao_atual().query(EmprestimoModel).filter_by(livro_id=livro_id)
+    
+    def consulta_ativos(self):
+        return sessao_atual().query(EmprestimoModel).filter(
+            EmprestimoModel.data_devolucao_real.is_(None)
+        ).order_by(EmprestimoModel.data_devolucao_prevista)
+    
+    def consulta_em_atraso(self, referencia: datetime):
+        return sessao_atual().query(EmprestimoModel).filter(
+            *self._filtros_em_atraso(referencia)
+        ).order_by(EmprestimoModel.data_devolucao_prevista)
+    
+    def _filtros_em_atraso(self, referencia: datetime) -> tuple:
+        return (
+            EmprestimoModel.data_devolucao_real.is_(None),
+            EmprestimoModel.data_devolucao_prevista < referencia
+        )
+    
+    def _expressao_dias_atraso(self, referencia: datetime):
+        """
+        Expressão SQL com os dias inteiros de atraso no instante de referência
+        Retorna None em dialetos sem suporte (cálculo feito em Python)
+        """
+        dialeto = sessao_atual().get_bind().dialect.name
+        referencia_sql = literal(referencia, DateTime)
+        if dialeto == 'sqlite':
+            # CAST trunca; como só há atrasos positivos, equivale ao piso
+            diferenca = func.julianday(referencia_sql) - func.julianday(EmprestimoModel.data_devolucao_prevista)
+            return cast(diferenca, Integer)
+        if dialeto == 'postgresql':
+            diferenca = func.extract('epoch', referencia_sql - EmprestimoModel.data_devolucao_prevista) / 86400
+            return cast(func.floor(diferenca), Integer)
+        return None
+    
     def buscar_todos(self) -> List[Emprestimo]:
         """Busca todos os empréstimos"""
-        emprestimos_model = EmprestimoModel.query.all()
+        emprestimos_model = sessao_atual().query(EmprestimoModel).all()
         return [self._model_para_entidade(emp) for emp in emprestimos_model]
     
     def deletar(self, id: str) -> None:
         """Deleta um empréstimo"""
-        emprestimo_model = EmprestimoModel.query.filter_by(id=id).first()
+        emprestimo_model = sessao_atual().query(EmprestimoModel).filter_by(id=id).first()
         if emprestimo_model:
-            db.session.delete(emprestimo_model)
-            db.session.commit()
+            sessao_atual().delete(emprestimo_model)
+            marcar_alteracao(COLECAO_EMPRESTIMOS)
+            confirmar_transacao()
+        mapa_identidade.remover(Emprestimo, id)
+    
+    def _entidade_para_valores(self, emprestimo: Emprestimo) -> dict:
+        """Converte entidade de domínio para os valores das colunas"""
+        return {
+            'id': emprestimo.id,
+            'livro_id': emprestimo.livro_id,
+            'usuario_id': emprestimo.usuario_id,
+            'data_emprestimo': emprestimo.data_emprestimo,
+            'data_devolucao_prevista': emprestimo.data_devolucao_prevista,
+            'data_devolucao_real': emprestimo.data_devolucao_real,
+            'multa': emprestimo.multa
+        }
     
     def _model_para_entidade(self, emprestimo_model: EmprestimoModel) -> Emprestimo:
         """Converte model para entidade de domínio"""
-        return Emprestimo(
+        entidade = Emprestimo(
             id=emprestimo_model.id,
             livro_id=emprestimo_model.livro_id,
             usuario_id=emprestimo_model.usuario_id,
@@ -235,6 +536,8 @@ class SQLAlchemyEmprestimoRepository(EmprestimoRepository):
             data_devolucao_real=emprestimo_model.data_devolucao_real,
             multa=emprestimo_model.multa
         )
+        entidade.marcar_como_persistido()
+        return entidade
 
 class SQLAlchemyDoacaoRepository(DoacaoRepository):
     """
@@ -242,118 +545,348 @@ class SQLAlchemyDoacaoRepository(DoacaoRepository):
     """
 
     def salvar(self, doacao: Doacao) -> None:
-        """Salva uma doação no banco de dados"""
-        doacao_model = DoacaoModel.query.filter_by(id=doacao.id).first()
-        
-        if doacao_model:
-            # Atualizar existente
-            doacao_model.livro_id = doacao.livro_id
-            doacao_model.usuario_id = doacao.usuario_id
-            doacao_model.data_doacao = doacao.data_doacao
-            doacao_model.creditos = doacao.creditos
-        else:
-            # Criar novo
-            doacao_model = DoacaoModel(
-                id=doacao.id,
-                livro_id=doacao.livro_id,
-                usuario_id=doacao.usuario_id,
-                data_doacao=doacao.data_doacao,
-                creditos=doacao.creditos
-            )
-            db.session.add(doacao_model)
-        
-        db.session.commit()
+        """Salva uma doação no banco de dados (upsert em comando único)"""
+        upsert(DoacaoModel, self._entidade_para_valores(doacao), doacao.campos_alterados)
+        confirmar_transacao()
+        doacao.marcar_como_persistido()
+        mapa_identidade.colocar(doacao)
     
     def buscar_por_id(self, id: str) -> Doacao:
         """Busca doação por ID"""
-        doacao_model = DoacaoModel.query.filter_by(id=id).first()
+        doacao = mapa_identidade.obter(Doacao, id)
+        if doacao:
+            return doacao
+        
+        doacao_model = sessao_atual().query(DoacaoModel).filter_by(id=id).first()
         if not doacao_model:
             return None
         
-        return self._model_para_entidade(doacao_model)
+        return mapa_identidade.registrar(self._model_para_entidade(doacao_model))
     
     def buscar_por_usuario(self, usuario_id: str) -> List[Doacao]:
         """Busca doações de um usuário"""
-        doacoes_model = DoacaoModel.query.filter_by(usuario_id=usuario_id).all()
+        doacoes_model = self.consulta_por_usuario(usuario_id).all()
         return [self._model_para_entidade(d) for d in doacoes_model]
     
     def buscar_por_livro(self, livro_id: str) -> Doacao:
         """Busca doações de um livro"""
-        doacoes_model = DoacaoModel.query.filter_by(livro_id=livro_id).first()
+        doacoes_model = self.consulta_por_livro(livro_id).first()
         if not doacoes_model:
             return None
         return self._model_para_entidade(doacoes_model)
     
     def buscar_todos(self) -> List[Doacao]:
         """Busca todas as doações"""
-        doacoes_model = DoacaoModel.query.all()
+        doacoes_model = sessao_atual().query(DoacaoModel).all()
         return [self._model_para_entidade(d) for d in doacoes_model]
     
+    def consulta_por_usuario(self, usuario_id: str):
+        return sessao_atual().query(DoacaoModel).filter_by(usuario_id=usuario_id)
+    
+    def consulta_por_livro(self, livro_id: str):
+        return sessao_atual().query(DoacaoModel).filter_by(livro_id=livro_id)
+    
     def deletar(self, id: str) -> None:
         """Deleta uma doação"""
-        doacao_model = DoacaoModel.query.filter_by(id=id).first()
+        doacao_model = sessao_atual().query(DoacaoModel).filter_by(id=id).first()
         if doacao_model:
-            db.session.delete(doacao_model)
-            db.session.commit
+            sessao_atual().delete(doacao_model)
+            confirmar_transacao()
+        mapa_identidade.remover(Doacao, id)
+    
+    def _entidade_para_valores(self, doacao: Doacao) -> dict:
+        """Converte entidade de domínio para os valores das colunas"""
+        return {
+            'id': doacao.id,
+            'livro_id': doacao.livro_id,
+            'usuario_id': doacao.usuario_id,
+            'data_doacao': doacao.data_doacao,
+            'creditos': doacao.creditos
+        }
+    
+    def _model_para_entidade(self, doacao_model: DoacaoModel) -> Doacao:
+        """Converte model para entidade de domínio"""
+        entidade = Doacao(
+            id=doacao_model.id,
+            livro_id=doacao_model.livro_id,
+            usuario_id=doacao_model.usuario_id,
+            data_doacao=doacao_model.data_doacao,
+            creditos=doacao_model.creditos
+        )
+        entidade.marcar_como_persistido()
+        return entidade
 
 class SQLAlchemyHorasRepository(HorasRepository):
     """
     Implementação concreta do HorasRepository usando SQLAlchemy
     """
     def salvar(self, horas: Horas) -> None:
-        """Salva horas no banco de dados"""
-        horas_model = HorasModel.query.filter_by(id=horas.id).first()
-        
-        if horas_model:
-            # Atualizar existente
-            horas_model.usuario_id = horas.usuario_id
-            horas_model.horas = horas.horas
-            horas_model.data = horas.data
-            horas_model.creditos = horas.creditos
-        else:
-            # Criar novo
-            horas_model = HorasModel(
-                id=horas.id,
-                usuario_id=horas.usuario_id,
-                horas=horas.horas,
-                data=horas.data,
-                creditos=horas.creditos
-            )
-            db.session.add(horas_model)
-        
-        db.session.commit()
+        """Salva horas no banco de dados (upsert em comando único)"""
+        upsert(HorasModel, self._entidade_para_valores(horas), horas.campos_alterados)
+        confirmar_transacao()
+        horas.marcar_como_persistido()
+        mapa_identidade.colocar(horas)
     
     def buscar_por_id(self, id: str) -> Horas:
         """Busca horas por ID"""
-        horas_model = HorasModel.query.filter_by(id=id).first()
+        horas = mapa_identidade.obter(Horas, id)
+        if horas:
+            return horas
+        
+        horas_model = sessao_atual().query(HorasModel).filter_by(id=id).first()
         if not horas_model:
             return None
         
-        return self._model_para_entidade(horas_model)
+        return mapa_identidade.registrar(self._model_para_entidade(horas_model))
     
     def buscar_por_usuario(self, usuario_id: str) -> List[Horas]:
         """Busca horas de um usuário"""
-        horas_model = HorasModel.query.filter_by(usuario_id=usuario_id).all()
+        horas_model = self.consulta_por_usuario(usuario_id).all()
         return [self._model_para_entidade(h) for h in horas_model]
     
-    def buscar_todos(self) -> List[Horas]:
+    def buscar_todas(self) -> List[Horas]:
         """Busca todas as horas"""
-        horas_model = HorasModel.query.all()
+        horas_model = sessao_atual().query(HorasModel).all()
         return [self._model_para_entidade(h) for h in horas_model]
     
+    def consulta_por_usuario(self, usuario_id: str):
+        return sessao_atual().query(HorasModel).filter_by(usuario_id=usuario_id)
+    
     def deletar(self, id: str) -> None:
         """Deleta uma entrada de horas"""
-        horas_model = HorasModel.query.filter_by(id=id).first()
+        horas_model = sessao_atual().query(HorasModel).filter_by(id=id).first()
         if horas_model:
-            db.session.delete(horas_model)
-            db.session.commit()
+            sessao_atual().delete(horas_model)
+            confirmar_transacao()
+        mapa_identidade.remover(Horas, id)
+    
+    def _entidade_para_valores(self, horas: Horas) -> dict:
+        """Converte entidade de domínio para os valores das colunas"""
+        return {
+            'id': horas.id,
+            'usuario_id': horas.usuario_id,
+            'horas': horas.horas,
+            'data': horas.data,
+            'creditos': horas.creditos
+        }
     
     def _model_para_entidade(self, horas_model: HorasModel) -> Horas:
         """Converte model para entidade de domínio"""
-        return Horas(
+        entidade = Horas(
             id=horas_model.id,
             usuario_id=horas_model.usuario_id,
             horas=horas_model.horas,
             data=horas_model.data,
+            tipo=None,  # tipo não é persistido; os créditos já foram gerados
             creditos=horas_model.creditos
-        )
\ No newline at end of file
+        )
+        entidade.marcar_como_persistido()
+        return entidade
+
+
+class SQLAlchemyCreditoRepository(CreditoRepository):
+    """
+    Implementação concreta do CreditoRepository usando SQLAlchemy
+    O saldo corrente fica em usuarios.creditos (leitura O(1)) e é alterado
+    somente por UPDATE ... SET creditos = creditos + :valor, sem ler-alterar-
+    gravar em Python; o histórico completo fica em movimentos_creditos.
+    """
+    
+    def __init__(self, ao_lancar: Optional[Callable[[str], None]] = None):
+        # Notificado com o usuario_id a cada lançamento (ex.: invalidar cache)
+        self._ao_lancar = ao_lancar
+    
+    def lancar(self, movimento: MovimentoCredito, exigir_saldo: bool = False) -> Optional[float]:
+        """Registra o lançamento e aplica o valor ao saldo em um UPDATE atômico"""
+        comando = (
+            update(UsuarioModel)
+            .where(UsuarioModel.id == movimento.usuario_id)
+            .values(creditos=UsuarioModel.creditos + movimento.valor)
+            .execution_options(synchronize_session=False)
+        )
+        if exigir_saldo and movimento.valor < 0:
+            comando = comando.where(UsuarioModel.creditos + movimento.valor >= 0)
+        
+        if sessao_atual().get_bind().dialect.update_returning:
+            saldo = sessao_atual().execute(comando.returning(UsuarioModel.creditos)).scalar_one_or_none()
+        else:
+            resultado = sessao_atual().execute(comando)
+            saldo = self.saldo(movimento.usuario_id) if resultado.rowcount else None
+        
+        if saldo is None:
+            if self.saldo(movimento.usuario_id) is None:
+                reverter_transacao()
+                raise ValueError(f"Usuário não encontrado: {movimento.usuario_id}")
+            # Saldo insuficiente: nada é lançado
+            return None
+        
+        self._inserir(movimento)
+        confirmar_transacao()
+        
+        if self._ao_lancar:
+            self._ao_lancar(movimento.usuario_id)
+        return saldo
+    
+    def registrar_ajuste(self, movimento: MovimentoCredito) -> None:
+        """Grava apenas o lançamento, sem alterar o saldo corrente"""
+        self._inserir(movimento)
+        confirmar_transacao()
+    
+    def saldo(self, usuario_id: str) -> Optional[float]:
+        """Saldo corrente do usuário"""
+        return sessao_atual().execute(
+            select(UsuarioModel.creditos).where(UsuarioModel.id == usuario_id)
+        ).scalar_one_or_none()
+    
+    def extrato(self, usuario_id: str, limite: int = 100) -> List[MovimentoCredito]:
+        """Lançamentos do usuário, do mais recente para o mais antigo"""
+        movimentos_model = sessao_atual().execute(
+            self.consulta_extrato(usuario_id).limit(limite)
+        ).scalars()
+        return [self._model_para_entidade(m) for m in movimentos_model]
+    
+    def divergencias(self) -> List[Tuple[str, float, float]]:
+        """Usuários cujo saldo difere da soma do extrato"""
+        soma = func.coalesce(func.sum(MovimentoCreditoModel.valor), 0.0)
+        consulta = (
+            select(UsuarioModel.id, UsuarioModel.creditos, soma)
+            .outerjoin(MovimentoCreditoModel, MovimentoCreditoModel.usuario_id == UsuarioModel.id)
+            .group_by(UsuarioModel.id, UsuarioModel.creditos)
+            .having(func.abs(UsuarioModel.creditos - soma) > 1e-6)
+        )
+        return [(usuario_id, saldo, total) for usuario_id, saldo, total in sessao_atual().execute(consulta)]
+    
+    def consulta_extrato(self, usuario_id: str):
+        return (
+            select(MovimentoCreditoModel)
+            .where(MovimentoCreditoModel.usuario_id == usuario_id)
+            .order_by(MovimentoCreditoModel.data.desc(), MovimentoCreditoModel.id.desc())
+        )
+    
+    def _inserir(self, movimento: MovimentoCredito) -> None:
+        sessao_atual().execute(insert(MovimentoCreditoModel).values(
+            id=movimento.id,
+            usuario_id=movimento.usuario_id,
+            valor=movimento.valor,
+            origem=movimento.origem,
+            referencia_id=movimento.referencia_id,
+            data=movimento.data
+        ))
+    
+    def _model_para_entidade(self, movimento_model: MovimentoCreditoModel) -> MovimentoCredito:
+        """Converte model para entidade de domínio"""
+        return MovimentoCredito(
+            id=movimento_model.id,
+            usuario_id=movimento_model.usuario_id,
+            valor=movimento_model.valor,
+            origem=movimento_model.origem,
+            referencia_id=movimento_model.referencia_id,
+            data=movimento_model.data
+        )
+
+
+class SQLAlchemySnapshotAtrasosRepository(SnapshotAtrasosRepository):
+    """
+    Implementação concreta do SnapshotAtrasosRepository usando SQLAlchemy
+    """
+    
+    def salvar(self, resumo: ResumoAtrasos) -> None:
+        """Salva (ou substitui) o snapshot do dia"""
+        upsert(SnapshotAtrasosModel, {
+            'data': resumo.data,
+            'total_emprestimos': resumo.total_emprestimos,
+            'total_dias_atraso': resumo.total_dias_atraso,
+            'multa_projetada': resumo.multa_projetada,
+            'gerado_em': resumo.gerado_em
+        })
+        confirmar_transacao()
+    
+    def buscar_por_data(self, data: date) -> Optional[ResumoAtrasos]:
+        """Busca o snapshot de uma data"""
+        snapshot_model = sessao_atual().get(SnapshotAtrasosModel, data)
+        if not snapshot_model:
+            return None
+        
+        return ResumoAtrasos(
+            data=snapshot_model.data,
+            total_emprestimos=snapshot_model.total_emprestimos,
+            total_dias_atraso=snapshot_model.total_dias_atraso,
+            multa_projetada=snapshot_model.multa_projetada,
+            gerado_em=snapshot_model.gerado_em
+        )
+
+
+class SQLAlchemyEstatisticasRepository(EstatisticasRepository):
+    """
+    Implementação concreta do EstatisticasRepository usando SQLAlchemy
+    Cada grupo de totais é uma agregação no banco (COUNT / SUM): nenhum
+    livro, empréstimo ou doação é carregado na aplicação.
+    """
+    
+    def __init__(self):
+        # Totais de atraso: mesma agregação do relatório e do snapshot diário
+        self._emprestimos = SQLAlchemyEmprestimoRepository()
+    
+    def calcular(self, referencia: datetime, multa_por_dia: float) -> EstatisticasBiblioteca:
+        """Calcula os totais do painel no instante de referência"""
+        sessao = sessao_atual()
+        
+        # Agregações condicionais em uma linha: o GROUP BY equivalente ordena
+        # numa B-tree temporária e custa de 4 a 5 vezes mais no SQLite
+        total_livros, livros_disponiveis = sessao.execute(select(
+            func.count(), func.coalesce(func.sum(case((LivroModel.disponivel, 1), else_=0)), 0)
+        )).one()
+        
+        # count(coluna) ignora NULL: conta os devolvidos pelo índice que cobre data_devolucao_real
+        total_emprestimos, emprestimos_devolvidos = sessao.execute(select(
+            func.count(), func.count(EmprestimoModel.data_devolucao_real)
+        )).one()
+        
+        atrasos = self._emprestimos.resumir_atrasos(referencia, multa_por_dia)
+        
+        multas_pendentes, valor_multas_pendentes = sessao.execute(
+            self.consulta_multas_pendentes()
+        ).one()
+        
+        creditos = {origem: (registros, total, horas) for origem, registros, total, horas in sessao.execute(
+            union_all(
+                select(
+                    literal(ORIGEM_DOACAO_LIVRO), func.count(DoacaoModel.id),
+                    func.coalesce(func.sum(DoacaoModel.creditos), 0.0), literal(0.0)
+                ),
+                select(
+                    literal(ORIGEM_DOACAO_HORAS), func.count(HorasModel.id),
+                    func.coalesce(func.sum(HorasModel.creditos), 0.0), func.coalesce(func.sum(HorasModel.horas), 0.0)
+                )
+            )
+        )}
+        doacoes, creditos_doacoes, _ = creditos[ORIGEM_DOACAO_LIVRO]
+        registros_horas, creditos_horas, horas_doadas = creditos[ORIGEM_DOACAO_HORAS]
+        
+        return EstatisticasBiblioteca(
+            referencia=referencia,
+            total_livros=total_livros,
+            livros_disponiveis=int(livros_disponiveis),
+            emprestimos_ativos=total_emprestimos - emprestimos_devolvidos,
+            emprestimos_devolvidos=emprestimos_devolvidos,
+            emprestimos_em_atraso=atrasos.total_emprestimos,
+            total_dias_atraso=atrasos.total_dias_atraso,
+            multa_projetada=atrasos.multa_projetada,
+            multas_pendentes=multas_pendentes,
+            valor_multas_pendentes=float(valor_multas_pendentes),
+            total_doacoes=doacoes,
+            creditos_doacoes=float(creditos_doacoes),
+            registros_horas=registros_horas,
+            horas_doadas=float(horas_doadas),
+            creditos_horas=float(creditos_horas)
+        )
+    
+    def consulta_multas_pendentes(self):
+        """Multas registradas na devolução que não foram pagas com créditos (sem lançamento no extrato)"""
+        pagamento = select(MovimentoCreditoModel.id).where(
+            MovimentoCreditoModel.referencia_id == EmprestimoModel.id,
+            MovimentoCreditoModel.origem == ORIGEM_MULTA
+        ).exists()
+        return select(func.count(), func.coalesce(func.sum(EmprestimoModel.multa), 0.0)).where(
+            EmprestimoModel.multa > 0, ~pagamento
+        )
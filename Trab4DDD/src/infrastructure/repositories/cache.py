@@ -0,0 +1,374 @@
+# Infrastructure Layer - Repositórios com Cache (Decorator)
+
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, Set
+from sqlalchemy import event
+from datetime import datetime
+from src.domain.entities import Livro, Usuario
+from src.domain.repositories import EstatisticasRepository, LivroRepository, UsuarioRepository
+from src.domain.value_objects.estatisticas import EstatisticasBiblioteca
+from src.infrastructure.database.sessao import sessao_atual
+from src.infrastructure.database.unit_of_work import unit_of_work_ativa
+from src.infrastructure.repositories import identity_map as mapa_identidade
+
+# Chave em session.info com as entidades a descartar do cache após o commit
+CHAVE_INVALIDACOES = 'cache_invalidacoes'
+
+
+@dataclass
+class ConfiguracaoCache:
+    """
+    Configuração do cache de leitura dos repositórios
+    Desligado por padrão: o cache é por processo, então com vários workers
+    uma alteração feita em outro processo só é vista após o TTL expirar.
+    """
+    habilitado: bool = False
+    tamanho_maximo: int = 1024
+    ttl_segundos: float = 30.0
+    # Janela das estatísticas do painel: independe de habilitado (0 desliga)
+    janela_estatisticas: float = 30.0
+
+    @classmethod
+    def do_ambiente(cls) -> 'ConfiguracaoCache':
+        """
+        Monta a configuração a partir das variáveis de ambiente
+        REPOSITORIO_CACHE, REPOSITORIO_CACHE_TAMANHO, REPOSITORIO_CACHE_TTL
+        e ESTATISTICAS_CACHE_SEGUNDOS
+        """
+        return cls(
+            habilitado=os.environ.get('REPOSITORIO_CACHE', '').lower() in ('1', 'true', 'sim'),
+            tamanho_maximo=int(os.environ.get('REPOSITORIO_CACHE_TAMANHO', 1024)),
+            ttl_segundos=float(os.environ.get('REPOSITORIO_CACHE_TTL', 30)),
+            janela_estatisticas=float(os.environ.get('ESTATISTICAS_CACHE_SEGUNDOS', 30))
+        )
+
+
+class CacheLRU:
+    """
+    Cache LRU com expiração (TTL) e limite de tamanho, seguro entre threads
+    Mantém contadores de acertos (hits) e falhas (misses).
+    """
+
+    def __init__(self, tamanho_maximo: int = 1024, ttl_segundos: float = 30.0,
+                 relogio: Callable[[], float] = time.monotonic):
+        if tamanho_maximo <= 0:
+            raise ValueError("Tamanho máximo do cache deve ser positivo")
+        self._tamanho_maximo = tamanho_maximo
+        self._ttl = ttl_segundos
+        self._relogio = relogio
+        self._itens: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave: Hashable, contabilizar: bool = True):
+        """Retorna o valor em cache ou None (contabilizando acerto/falha)"""
+        with self._trava:
+            item = self._itens.get(chave)
+            if item is not None and item[1] <= self._relogio():
+                del self._itens[chave]
+                item = None
+            if item is not None:
+                self._itens.move_to_end(chave)
+            if contabilizar:
+                self._registrar(item is not None)
+            return item[0] if item is not None else None
+
+    def registrar(self, acerto: bool) -> None:
+        """Contabiliza uma consulta resolvida fora do obter (ex.: índice secundário)"""
+        with self._trava:
+            self._registrar(acerto)
+
+    def _registrar(self, acerto: bool) -> None:
+        if acerto:
+            self.acertos += 1
+        else:
+            self.falhas += 1
+
+    def guardar(self, chave: Hashable, valor) -> None:
+        with self._trava:
+            self._itens[chave] = (valor, self._relogio() + self._ttl)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self._tamanho_maximo:
+                self._itens.popitem(last=False)
+
+    def remover(self, chave: Hashable) -> None:
+        with self._trava:
+            self._itens.pop(chave, None)
+
+    def limpar(self) -> None:
+        with self._trava:
+            self._itens.clear()
+
+    def estatisticas(self) -> Dict[str, float]:
+        with self._trava:
+            consultas = self.acertos + self.falhas
+            return {
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': round(self.acertos / consultas, 4) if consultas else 0.0,
+                'tamanho': len(self._itens),
+                'tamanho_maximo': self._tamanho_maximo,
+                'ttl_segundos': self._ttl
+            }
+
+
+class _RepositorioComCache:
+    """
+    Base dos decorators: guarda entidades por ID e um índice secundário
+    (ISBN/email -> ID). Devolve sempre cópias, para que alterações feitas
+    pelo caso de uso não contaminem o cache antes de serem salvas.
+    Leituras dentro de uma Unit of Work vão sempre ao banco: o cache é por
+    processo e pode não ter visto a gravação feita por outro worker, e essas
+    leituras decidem gravações (ex.: se o livro está disponível).
+    """
+
+    _tipo: type = object
+    _campo_secundario: str = ''
+
+    def __init__(self, cache: CacheLRU):
+        self._cache = cache
+
+    @property
+    def cache(self) -> CacheLRU:
+        return self._cache
+
+    def estatisticas(self) -> Dict[str, float]:
+        return self._cache.estatisticas()
+
+    @staticmethod
+    def _copiar(entidade):
+        copia = copy.copy(entidade)
+        # A cópia reflete o estado do banco: começa sem campos alterados
+        copia.marcar_como_persistido()
+        return copia
+
+    def _chave_secundaria(self, valor: str) -> tuple:
+        return (self._campo_secundario, str(valor))
+
+    def _lembrar(self, entidade) -> None:
+        if entidade is None or unit_of_work_ativa():
+            return
+        self._cache.guardar(('id', entidade.id), self._copiar(entidade))
+        self._cache.guardar(self._chave_secundaria(getattr(entidade, self._campo_secundario)), entidade.id)
+
+    def _obter_por_id(self, id: str, contabilizar: bool = True):
+        # Instância já usada nesta requisição tem precedência sobre o cache
+        existente = mapa_identidade.obter(self._tipo, id)
+        if existente is not None or unit_of_work_ativa():
+            return existente
+        entidade = self._cache.obter(('id', id), contabilizar)
+        return mapa_identidade.registrar(self._copiar(entidade)) if entidade is not None else None
+
+    def _obter_por_secundario(self, valor: str):
+        if unit_of_work_ativa():
+            return None
+        id = self._cache.obter(self._chave_secundaria(valor), contabilizar=False)
+        entidade = self._obter_por_id(id, contabilizar=False) if id is not None else None
+        # O índice secundário pode apontar para uma versão antiga da entidade
+        if entidade is not None and str(getattr(entidade, self._campo_secundario)) != str(valor):
+            entidade = None
+        self._cache.registrar(entidade is not None)
+        return entidade
+
+    def invalidar(self, id: str) -> None:
+        """Descarta a entidade do cache (ex.: alterada fora do repositório)"""
+        self._invalidar(id)
+
+    def _invalidar(self, id: str) -> None:
+        self._descartar(id)
+        # Descarta de novo após o commit: uma leitura concorrente feita antes dele
+        # pode ter guardado no cache o estado anterior à gravação
+        sessao_atual().info.setdefault(CHAVE_INVALIDACOES, []).append((self, id))
+
+    def _descartar(self, id: str) -> None:
+        item = self._cache.obter(('id', id), contabilizar=False)
+        if item is not None:
+            self._cache.remover(self._chave_secundaria(getattr(item, self._campo_secundario)))
+        self._cache.remover(('id', id))
+
+
+class LivroRepositoryComCache(_RepositorioComCache, LivroRepository):
+    """
+    Decorator de LivroRepository com cache de leitura (read-through)
+    Consultas por ID e ISBN passam pelo cache; salvar/deletar invalidam.
+    """
+
+    _tipo = Livro
+    _campo_secundario = 'isbn'
+
+    def __init__(self, repositorio: LivroRepository, cache: CacheLRU):
+        super().__init__(cache)
+        self._repositorio = repositorio
+
+    def salvar(self, livro: Livro) -> None:
+        self._invalidar(livro.id)
+        self._repositorio.salvar(livro)
+
+    def buscar_por_id(self, id: str) -> Optional[Livro]:
+        livro = self._obter_por_id(id)
+        if livro is None:
+            livro = self._repositorio.buscar_por_id(id)
+            self._lembrar(livro)
+        return livro
+
+    def buscar_por_isbn(self, isbn: str) -> Optional[Livro]:
+        livro = self._obter_por_secundario(isbn)
+        if livro is None:
+            livro = self._repositorio.buscar_por_isbn(isbn)
+            self._lembrar(livro)
+        return livro
+
+    def buscar_por_ids(self, ids: List[str], bloquear: bool = False) -> List[Livro]:
+        # Bloqueio de linhas exige ir ao banco
+        if bloquear:
+            return self._repositorio.buscar_por_ids(ids, bloquear=True)
+        encontrados = {}
+        faltantes = []
+        for id in dict.fromkeys(ids):
+            livro = self._obter_por_id(id)
+            if livro is None:
+                faltantes.append(id)
+            else:
+                encontrados[id] = livro
+        if faltantes:
+            for livro in self._repositorio.buscar_por_ids(faltantes):
+                self._lembrar(livro)
+                encontrados[livro.id] = livro
+        return [encontrados[id] for id in dict.fromkeys(ids) if id in encontrados]
+
+    def buscar_todos(self) -> List[Livro]:
+        return self._repositorio.buscar_todos()
+
+    def buscar_disponiveis(self) -> List[Livro]:
+        return self._repositorio.buscar_disponiveis()
+
+    def buscar_pagina(self, limite: int, apos_id: Optional[str] = None, apenas_disponiveis: bool = False) -> List[Livro]:
+        return self._repositorio.buscar_pagina(limite, apos_id, apenas_disponiveis)
+
+    def pesquisar(self, termo: str, limite: int, deslocamento: int = 0, apenas_disponiveis: bool = False) -> List[Livro]:
+        return self._repositorio.pesquisar(termo, limite, deslocamento, apenas_disponiveis)
+
+    def iterar_todos(self, apenas_disponiveis: bool = False, tamanho_lote: int = 1000) -> Iterator[Livro]:
+        return self._repositorio.iterar_todos(apenas_disponiveis, tamanho_lote)
+
+    def buscar_isbns_existentes(self, isbns: List[str]) -> Set[str]:
+        return self._repositorio.buscar_isbns_existentes(isbns)
+
+    def salvar_em_lote(self, livros: List[Livro]) -> None:
+        for livro in livros:
+            self._invalidar(livro.id)
+        self._repositorio.salvar_em_lote(livros)
+
+    def deletar(self, id: str) -> None:
+        self._invalidar(id)
+        self._repositorio.deletar(id)
+
+
+class UsuarioRepositoryComCache(_RepositorioComCache, UsuarioRepository):
+    """
+    Decorator de UsuarioRepository com cache de leitura (read-through)
+    Consultas por ID e email passam pelo cache; salvar/deletar invalidam.
+    """
+
+    _tipo = Usuario
+    _campo_secundario = 'email'
+
+    def __init__(self, repositorio: UsuarioRepository, cache: CacheLRU):
+        super().__init__(cache)
+        self._repositorio = repositorio
+
+    def salvar(self, usuario: Usuario) -> None:
+        self._invalidar(usuario.id)
+        self._repositorio.salvar(usuario)
+
+    def buscar_por_id(self, id: str) -> Optional[Usuario]:
+        usuario = self._obter_por_id(id)
+        if usuario is None:
+            usuario = self._repositorio.buscar_por_id(id)
+            self._lembrar(usuario)
+        return usuario
+
+    def buscar_por_email(self, email: str) -> Optional[Usuario]:
+        usuario = self._obter_por_secundario(email)
+        if usuario is None:
+            usuario = self._repositorio.buscar_por_email(email)
+            self._lembrar(usuario)
+        return usuario
+
+    def buscar_por_ids(self, ids: List[str]) -> List[Usuario]:
+        encontrados = {}
+        faltantes = []
+        for id in dict.fromkeys(ids):
+            usuario = self._obter_por_id(id)
+            if usuario is None:
+                faltantes.append(id)
+            else:
+                encontrados[id] = usuario
+        if faltantes:
+            for usuario in self._repositorio.buscar_por_ids(faltantes):
+                self._lembrar(usuario)
+                encontrados[usuario.id] = usuario
+        return [encontrados[id] for id in dict.fromkeys(ids) if id in encontrados]
+
+    def buscar_todos(self) -> List[Usuario]:
+        return self._repositorio.buscar_todos()
+
+    def deletar(self, id: str) -> None:
+        self._invalidar(id)
+        self._repositorio.deletar(id)
+
+
+class EstatisticasRepositoryComCache(EstatisticasRepository):
+    """
+    Decorator de EstatisticasRepository que reaproveita os totais por uma janela
+    Dentro da janela (TTL do cache) o painel recebe os totais já calculados,
+    com a referência do cálculo original; depois disso eles são recalculados.
+    """
+
+    _chave = 'estatisticas'
+
+    def __init__(self, repositorio: EstatisticasRepository, cache: CacheLRU):
+        self._repositorio = repositorio
+        self._cache = cache
+
+    @property
+    def cache(self) -> CacheLRU:
+        return self._cache
+
+    def calcular(self, referencia: datetime, multa_por_dia: float) -> EstatisticasBiblioteca:
+        chave = (self._chave, multa_por_dia)
+        estatisticas = self._cache.obter(chave)
+        if estatisticas is None:
+            estatisticas = self._repositorio.calcular(referencia, multa_por_dia)
+            self._cache.guardar(chave, estatisticas)
+        return estatisticas
+
+    def invalidar(self) -> None:
+        """Descarta os totais em cache (o próximo acesso recalcula)"""
+        self._cache.limpar()
+
+
+def ligar_cache_a_sessao(sessao, *caches: CacheLRU) -> None:
+    """
+    Mantém os caches coerentes com as transações da sessão (ou classe de sessão)
+    - after_commit: descarta as entidades gravadas na transação
+    - after_rollback: esvazia os caches; leituras feitas dentro da transação
+      podem ter visto gravações que o rollback descartou, e como rollbacks são
+      raros, limpa tudo
+    """
+    @event.listens_for(sessao, 'after_commit')
+    def _invalidar(_sessao):
+        for repositorio, id in _sessao.info.pop(CHAVE_INVALIDACOES, []):
+            repositorio._descartar(id)
+
+    @event.listens_for(sessao, 'after_rollback')
+    def _limpar(_sessao):
+        _sessao.info.pop(CHAVE_INVALIDACOES, None)
+        for cache in caches:
+            cache.limpar()
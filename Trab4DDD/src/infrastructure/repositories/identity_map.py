@@ -0,0 +1,113 @@
+# Infrastructure Layer - Identity Map por Requisição
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, Tuple, Type
+from flask import Flask, g, has_app_context
+from sqlalchemy import event
+from src.models.user import db
+
+# Atributo do flask.g que guarda o mapa da requisição atual
+CHAVE_MAPA = 'mapa_identidade'
+
+# Mapa da requisição fora do Flask (app ASGI), definido com usar_mapa_identidade
+_mapa_contexto: ContextVar[Optional[Dict[Tuple[Type, str], object]]] = ContextVar(CHAVE_MAPA, default=None)
+
+
+def mapa_atual() -> Optional[Dict[Tuple[Type, str], object]]:
+    """
+    Mapa (tipo da entidade, id) -> entidade do contexto atual
+    Sem contexto de aplicação Flask nem usar_mapa_identidade ativo não há
+    mapa e as buscas vão ao banco.
+    """
+    mapa = _mapa_contexto.get()
+    if mapa is not None:
+        return mapa
+    if not has_app_context():
+        return None
+    if CHAVE_MAPA not in g:
+        setattr(g, CHAVE_MAPA, {})
+    return getattr(g, CHAVE_MAPA)
+
+
+def obter(tipo: Type, id: str):
+    """Retorna a instância já carregada nesta requisição, se houver"""
+    mapa = mapa_atual()
+    if mapa is None or id is None:
+        return None
+    return mapa.get((tipo, id))
+
+
+def registrar(entidade, atualizar: bool = False):
+    """
+    Registra a entidade carregada e retorna a instância canônica
+    Se a entidade já estava no mapa, devolve a instância existente para que
+    todo o caso de uso trabalhe com o mesmo objeto. atualizar=True copia o
+    estado recém-lido do banco para a instância existente (ex.: leitura com
+    bloqueio), desde que ela não tenha alterações pendentes.
+    """
+    mapa = mapa_atual()
+    if mapa is None or entidade is None:
+        return entidade
+    chave = (type(entidade), entidade.id)
+    existente = mapa.get(chave)
+    if existente is None:
+        mapa[chave] = entidade
+        return entidade
+    if atualizar and not existente.campos_alterados:
+        existente.__dict__.update(entidade.__dict__)
+        existente.marcar_como_persistido()
+    return existente
+
+
+def colocar(entidade) -> None:
+    """Torna a entidade (recém-salva) a instância canônica do seu id"""
+    mapa = mapa_atual()
+    if mapa is not None:
+        mapa[(type(entidade), entidade.id)] = entidade
+
+
+def remover(tipo: Type, id: str) -> None:
+    mapa = mapa_atual()
+    if mapa is not None:
+        mapa.pop((tipo, id), None)
+
+
+def limpar() -> None:
+    mapa = mapa_atual()
+    if mapa is not None:
+        mapa.clear()
+
+
+@contextmanager
+def usar_mapa_identidade() -> Iterator[Dict[Tuple[Type, str], object]]:
+    """Abre um mapa novo para o bloco (uma requisição ASGI) e o descarta ao sair"""
+    token = _mapa_contexto.set({})
+    try:
+        yield _mapa_contexto.get()
+    finally:
+        _mapa_contexto.reset(token)
+
+
+def _limpar_no_rollback(_sessao) -> None:
+    # Entidades alteradas pela transação desfeita não refletem mais o banco
+    limpar()
+
+
+def limpar_mapa_no_rollback(sessao) -> None:
+    """Esvazia o mapa a cada rollback da sessão (ou classe de sessão) informada"""
+    if not event.contains(sessao, 'after_rollback', _limpar_no_rollback):
+        event.listen(sessao, 'after_rollback', _limpar_no_rollback)
+
+
+def init_mapa_identidade(app: Flask) -> None:
+    """
+    Liga o identity map ao ciclo de vida da aplicação: o mapa é esvaziado
+    ao fim de cada requisição/contexto (inclusive comandos) e a cada rollback
+    """
+    @app.teardown_request
+    @app.teardown_appcontext
+    def _limpar_mapa(_erro=None):
+        limpar()
+
+    limpar_mapa_no_rollback(db.session)
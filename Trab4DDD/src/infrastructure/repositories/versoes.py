@@ -0,0 +1,135 @@
+# Infrastructure Layer - Versões das coleções (ETag das listagens)
+#
+# Os repositórios marcam na sessão as coleções que alteraram; a versão da
+# coleção só avança depois do commit (após um rollback a marca é descartada).
+# Assim uma listagem que leu a versão antes da consulta nunca associa dados
+# antigos a uma versão nova.
+#
+# Por padrão as versões ficam na memória do processo. Com vários workers
+# (gunicorn, uvicorn --workers) defina VERSOES_COLECOES_DIR: cada coleção vira
+# um arquivo nesse diretório, compartilhado por todos os processos.
+
+import os
+import tempfile
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from sqlalchemy import event
+from src.infrastructure.database.sessao import sessao_atual
+
+COLECAO_LIVROS = 'livros'
+COLECAO_EMPRESTIMOS = 'emprestimos'
+
+# Chave em session.info com as coleções alteradas pela transação em andamento
+CHAVE_ALTERADAS = 'versoes_colecoes_alteradas'
+
+
+@dataclass(frozen=True)
+class VersaoColecao:
+    """Versão opaca de uma coleção e o instante (UTC, em segundos) da última alteração"""
+    token: str
+    modificada_em: datetime
+
+
+def _agora() -> datetime:
+    return datetime.now(timezone.utc).replace(microsecond=0)
+
+
+class VersoesEmMemoria:
+    """
+    Contadores por processo, prefixados por uma época aleatória: versões de
+    processos diferentes (ou de antes de um restart) nunca coincidem
+    """
+
+    def __init__(self):
+        self._epoca = uuid.uuid4().hex[:8]
+        self._inicio = _agora()
+        self._contadores: Dict[str, int] = {}
+        self._modificadas: Dict[str, datetime] = {}
+        self._trava = threading.Lock()
+
+    def atual(self, colecao: str) -> VersaoColecao:
+        with self._trava:
+            return VersaoColecao(
+                f'{self._epoca}.{self._contadores.get(colecao, 0)}',
+                self._modificadas.get(colecao, self._inicio)
+            )
+
+    def incrementar(self, colecao: str) -> None:
+        with self._trava:
+            self._contadores[colecao] = self._contadores.get(colecao, 0) + 1
+            self._modificadas[colecao] = _agora()
+
+
+class VersoesEmDiretorio:
+    """
+    Uma versão por arquivo, compartilhada entre processos
+    Cada alteração grava um token aleatório novo (troca atômica com os.replace);
+    a data de modificação do arquivo é o Last-Modified da coleção.
+    """
+
+    def __init__(self, diretorio: str):
+        os.makedirs(diretorio, exist_ok=True)
+        self.diretorio = diretorio
+
+    def _caminho(self, colecao: str) -> str:
+        return os.path.join(self.diretorio, f'{colecao}.versao')
+
+    def atual(self, colecao: str) -> VersaoColecao:
+        caminho = self._caminho(colecao)
+        try:
+            with open(caminho, encoding='ascii') as arquivo:
+                token = arquivo.read()
+                modificada = os.fstat(arquivo.fileno()).st_mtime
+        except FileNotFoundError:
+            self.incrementar(colecao)
+            return self.atual(colecao)
+        return VersaoColecao(token, datetime.fromtimestamp(int(modificada), timezone.utc))
+
+    def incrementar(self, colecao: str) -> None:
+        descritor, temporario = tempfile.mkstemp(dir=self.diretorio, suffix='.tmp')
+        with os.fdopen(descritor, 'w', encoding='ascii') as arquivo:
+            arquivo.write(uuid.uuid4().hex[:16])
+        os.replace(temporario, self._caminho(colecao))
+
+
+# Armazenamento do processo, criado na primeira consulta a partir do ambiente
+_versoes = None
+_trava_criacao = threading.Lock()
+
+
+def versoes_colecoes():
+    """Armazenamento de versões do processo (VERSOES_COLECOES_DIR ou memória)"""
+    global _versoes
+    if _versoes is None:
+        with _trava_criacao:
+            if _versoes is None:
+                diretorio = os.environ.get('VERSOES_COLECOES_DIR')
+                _versoes = VersoesEmDiretorio(diretorio) if diretorio else VersoesEmMemoria()
+    return _versoes
+
+
+def marcar_alteracao(colecao: str) -> None:
+    """Usado pelos repositórios ao gravar: a versão avança no commit da sessão atual"""
+    sessao_atual().info.setdefault(CHAVE_ALTERADAS, set()).add(colecao)
+
+
+def _publicar_no_commit(sessao) -> None:
+    alteradas: Optional[set] = sessao.info.pop(CHAVE_ALTERADAS, None)
+    if alteradas:
+        versoes = versoes_colecoes()
+        for colecao in alteradas:
+            versoes.incrementar(colecao)
+
+
+def _descartar_no_rollback(sessao) -> None:
+    sessao.info.pop(CHAVE_ALTERADAS, None)
+
+
+def publicar_versoes_no_commit(sessao) -> None:
+    """Avança as versões das coleções marcadas a cada commit da sessão (ou classe de sessão) informada"""
+    if not event.contains(sessao, 'after_commit', _publicar_no_commit):
+        event.listen(sessao, 'after_commit', _publicar_no_commit)
+        event.listen(sessao, 'after_rollback', _descartar_no_rollback)
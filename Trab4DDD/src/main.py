@@ -3,36 +3,71 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory, jsonify
+from typing import Optional
+from flask import Flask, current_app, send_from_directory, jsonify
 from flask_cors import CORS
-from src.models.user import db
 from src.routes.user import user_bp
 from src.presentation.controllers import biblioteca_bp
-from src.infrastructure.database.models import LivroModel, UsuarioModel, EmprestimoModel
+from src.presentation.commands import comandos_bp
+from src.presentation.serializacao import init_json
+from src.presentation.compressao import init_compressao
+from src.infrastructure.database.config import PerfilBanco, init_database, inicializar_banco
+from src.infrastructure.repositories.identity_map import init_mapa_identidade
+from src.infrastructure.repositories.versoes import publicar_versoes_no_commit
+from src.models.user import db
+from src.infrastructure.metricas import init_metricas
+from src.infrastructure.database.diagnostico import init_diagnostico_sql
+
+# Banco SQLite padrão da aplicação: src/database/app.db
+URL_BANCO_PADRAO = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+
+
+def create_app(perfil: Optional[PerfilBanco] = None) -> Flask:
+    """
+    Application factory da API da Biblioteca
+    Não cria tabelas: o esquema é preparado uma única vez por
+    inicializar_banco (flask --app src.main init-db, hook on_starting
+    do gunicorn ou python src/main.py).
+    """
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
 
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+    # Provider JSON com orjson (JSON_PROVIDER=padrao volta ao encoder da biblioteca padrão)
+    init_json(app)
 
-# Configurar CORS para permitir requisições de qualquer origem
-CORS(app)
+    # Configurar CORS para permitir requisições de qualquer origem
+    CORS(app)
 
-# Registrar blueprints
-app.register_blueprint(user_bp, url_prefix='/api')
-app.register_blueprint(biblioteca_bp, url_prefix='/api/biblioteca')
+    # Registrar blueprints
+    app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(biblioteca_bp, url_prefix='/api/biblioteca')
+    app.register_blueprint(comandos_bp)
 
-# Configuração do banco de dados
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
+    # Configuração do banco de dados (perfil lido de DATABASE_URL / DB_PERFIL)
+    init_database(app, perfil or PerfilBanco.do_ambiente(URL_BANCO_PADRAO))
 
-# Criar tabelas
-with app.app_context():
-    db.create_all()
+    # Identity map por requisição (esvaziado no teardown do contexto)
+    init_mapa_identidade(app)
+
+    # Versões das coleções (ETag das listagens) avançam a cada commit
+    publicar_versoes_no_commit(db.session)
+
+    # Métricas Prometheus em /metrics (METRICAS=1; desligadas não custam nada)
+    init_metricas(app)
+
+    # Log de consultas lentas e detector de N+1 (SQL_DIAGNOSTICO=producao|desenvolvimento)
+    init_diagnostico_sql(app)
+
+    # Compressão gzip/brotli negociada pelo Accept-Encoding (COMPRESSAO=0 desliga)
+    init_compressao(app)
+
+    app.add_url_rule('/', defaults={'path': ''}, view_func=serve)
+    app.add_url_rule('/<path:path>', view_func=serve)
+    app.add_url_rule('/api/docs', view_func=api_docs)
+    return app
 
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
 def serve(path):
-    static_folder_path = app.static_folder
+    static_folder_path = current_app.static_folder
     if static_folder_path is None:
             return "Static folder not configured", 404
 
@@ -45,7 +80,6 @@ def serve(path):
         else:
             return "index.html not found", 404
 
-@app.route('/api/docs')
 def api_docs():
     """
     Documentação básica da API
@@ -57,18 +91,29 @@ def api_docs():
         "endpoints": {
             "livros": {
                 "POST /api/biblioteca/livros": "Criar novo livro",
-                "GET /api/biblioteca/livros": "Listar livros (query param: ?disponiveis=true)",
+                "POST /api/biblioteca/livros/lote": "Importar livros em lote (array JSON ou CSV com colunas titulo,autor,isbn)",
+                "GET /api/biblioteca/livros?q=termo": "Busca textual por título, autor ou ISBN (query params: ?q=X&page=N&per_page=N)",
+                "GET /api/biblioteca/livros": "Listar livros (query params: ?disponiveis=true&limit=100&after=<id>&formato=ndjson)",
             },
             "usuarios": {
                 "POST /api/biblioteca/usuarios": "Criar novo usuário",
+                "GET /api/biblioteca/usuarios/{id}/creditos": "Saldo e extrato de créditos (query param: ?limit=N)",
             },
             "emprestimos": {
                 "POST /api/biblioteca/emprestimos": "Emprestar livro",
                 "PUT /api/biblioteca/emprestimos/{id}/devolver": "Devolver livro",
+                "POST /api/biblioteca/emprestimos/lote": "Emprestar vários livros a um usuário (body: usuario_id, livro_ids)",
+                "PUT /api/biblioteca/emprestimos/devolver-lote": "Devolver vários empréstimos (body: emprestimo_ids)",
                 "GET /api/biblioteca/emprestimos": "Listar empréstimos (query params: ?usuario_id=X&ativos=true)",
+                "GET /api/biblioteca/emprestimos/atrasos": "Relatório de atrasos com dias e multa projetada (query param: ?limit=N, de 1 a 1000)",
+                "GET /api/biblioteca/emprestimos/atrasos/snapshot": "Snapshot diário de atrasos (query param: ?data=AAAA-MM-DD)",
+                "POST /api/biblioteca/emprestimos/atrasos/snapshot": "Recalcular o snapshot de atrasos do dia",
+                "GET /api/biblioteca/estatisticas": "Totais do painel: acervo, empréstimos, atrasos, multas pendentes e créditos emitidos",
             },
             "utilitarios": {
                 "GET /api/biblioteca/health": "Health check da API",
+                "GET /metrics": "Métricas no formato Prometheus (com METRICAS=1)",
+                "GET /api/debug/queries": "Consultas SQL por requisição e alertas de N+1 (com SQL_DIAGNOSTICO; ?alertas=true)",
                 "GET /api/docs": "Esta documentação"
             }
         },
@@ -108,7 +153,13 @@ def api_docs():
     
     return jsonify(docs)
 
+# Instância usada pelo flask CLI (flask --app src.main ...) e pelo gunicorn (src.main:app)
+app = create_app()
+
 if __name__ == '__main__':
+    # Servidor de desenvolvimento (debug + reloader); em produção use o gunicorn (gunicorn.conf.py)
+    with app.app_context():
+        inicializar_banco()
     print("🚀 Iniciando API da Biblioteca...")
     print("📚 Demonstração de Clean Architecture + SOLID + Design Patterns + DDD")
     print("🌐 Acesse http://localhost:5001/api/docs para ver a documentação")
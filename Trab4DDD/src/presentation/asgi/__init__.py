@@ -0,0 +1,401 @@
+# Presentation Layer - Controllers ASGI (FastAPI)
+#
+# Mesmos endpoints do biblioteca_bp, servidos por uma app ASGI. As regras
+# HTTP (validação, DTOs, formato da resposta e mapeamento de erros) ficam em
+# src.presentation.endpoints; aqui fica só o transporte: cada endpoint roda
+# dentro de AsyncSession.run_sync, então o SQL emitido pelos repositórios
+# passa pelo driver assíncrono (aiosqlite) sem bloquear o event loop.
+
+import asyncio
+from contextlib import asynccontextmanager
+from functools import wraps
+from typing import Callable, Optional
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session
+from src.application.use_cases import BuscarLivrosUseCase
+from src.infrastructure.database.busca import criar_indice_busca
+from src.infrastructure.database.config import PerfilBanco, criar_engine_assincrono
+from src.infrastructure.database.diagnostico import ROTA_DIAGNOSTICO, habilitar_diagnostico
+from src.infrastructure.database.sessao import usar_sessao
+from src.infrastructure.metricas import habilitar_metricas
+from src.infrastructure.repositories.cache import ligar_cache_a_sessao
+from src.infrastructure.repositories.identity_map import limpar_mapa_no_rollback, usar_mapa_identidade
+from src.infrastructure.repositories.versoes import COLECAO_EMPRESTIMOS, COLECAO_LIVROS, publicar_versoes_no_commit
+from src.models.user import db
+from src.presentation import endpoints
+from src.presentation.endpoints import ERRO_INTERNO, caches_repositorios, livro_repository
+from src.presentation.condicional import avaliar
+from src.presentation.serializacao import serializar
+
+# Router com os endpoints da biblioteca, montado no mesmo prefixo do biblioteca_bp
+biblioteca_router = APIRouter()
+PREFIXO_BIBLIOTECA = '/api/biblioteca'
+
+# Tamanho de cada página lida do banco no streaming NDJSON
+TAMANHO_PAGINA_STREAM = 500
+
+
+class SessaoSincronaASGI(Session):
+    """
+    Sessão síncrona por trás de cada AsyncSession da app ASGI
+    Classe própria para que os eventos de rollback (identity map e caches)
+    não se misturem com a sessão do Flask-SQLAlchemy.
+    """
+
+
+class RespostaJSON(JSONResponse):
+    """Serializa como o jsonify do Flask (datas, dataclasses, chaves ordenadas)"""
+
+    def render(self, conteudo) -> bytes:
+        return serializar(conteudo)
+
+
+def _resposta(conteudo, status: int = 200) -> RespostaJSON:
+    return RespostaJSON(conteudo, status_code=status)
+
+
+def _no_contexto(sessao: Session, funcao: Callable, argumentos: tuple):
+    # Roda no greenlet do run_sync: repositórios usam a sessão desta requisição
+    with usar_sessao(sessao), usar_mapa_identidade():
+        return funcao(*argumentos)
+
+
+async def executar(request: Request, funcao: Callable, *argumentos):
+    """
+    Executa um caso de uso (ou qualquer chamada aos repositórios) em uma
+    AsyncSession nova; a transação não confirmada é desfeita ao fechar
+    """
+    async with request.app.state.vagas_conexao, request.app.state.fabrica_sessao() as sessao:
+        return await sessao.run_sync(_no_contexto, funcao, argumentos)
+
+
+async def _atender(request: Request, endpoint: Callable, *argumentos) -> RespostaJSON:
+    """Roda um endpoint compartilhado via executar e converte o (conteudo, status)"""
+    try:
+        conteudo, status = await executar(request, endpoint, *argumentos)
+    except Exception:
+        # Falhas fora do endpoint (abrir a sessão, fechar a conexão)
+        conteudo, status = ERRO_INTERNO
+    return _resposta(conteudo, status)
+
+
+async def _ler_json(request: Request):
+    """Corpo JSON da requisição, ou None se ausente/inválido (como get_json(silent=True))"""
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+async def _ler_lote_livros(request: Request):
+    """
+    Lê o lote de livros da requisição: upload CSV (campo 'arquivo'),
+    corpo text/csv ou array JSON
+    """
+    tipo = request.headers.get('content-type', '').split(';')[0].strip().lower()
+    if tipo == 'multipart/form-data':
+        formulario = await request.form()
+        if 'arquivo' in formulario:
+            return endpoints.ler_csv((await formulario['arquivo'].read()).decode('utf-8-sig'))
+    if tipo == 'text/csv':
+        return endpoints.ler_csv((await request.body()).decode('utf-8'))
+    return await _ler_json(request)
+
+
+def _quer_ndjson(request: Request) -> bool:
+    """Verifica se o cliente optou pela resposta em streaming NDJSON"""
+    if request.query_params.get('formato', '').lower() == 'ndjson':
+        return True
+    return request.headers.get('accept', '').split(',')[0].strip() == 'application/x-ndjson'
+
+
+def _condicional(colecao: str, formato: Optional[Callable[[Request], object]] = None):
+    """Versão ASGI do decorator condicional do Flask (mesmos validadores)"""
+    def decorator(endpoint):
+        @wraps(endpoint)
+        async def envolvido(request: Request):
+            variante = request.url.query
+            if formato is not None:
+                variante += f'|{formato(request)}'
+            resultado = avaliar(
+                colecao, variante, request.headers.get('if-none-match'), request.headers.get('if-modified-since')
+            )
+            if resultado.nao_modificado:
+                return Response(status_code=304, headers=resultado.cabecalhos)
+
+            resposta = await endpoint(request)
+            if resposta.status_code == 200:
+                resposta.headers.update(resultado.cabecalhos)
+            return resposta
+        return envolvido
+    return decorator
+
+
+@biblioteca_router.post('/livros')
+async def criar_livro(request: Request):
+    """
+    Endpoint para criar um novo livro
+    """
+    return await _atender(request, endpoints.criar_livro, await _ler_json(request))
+
+
+@biblioteca_router.post('/livros/lote')
+async def criar_livros_em_lote(request: Request):
+    """
+    Endpoint para importar vários livros de uma vez
+    Linhas inválidas são reportadas em 'erros' sem abortar o restante
+    """
+    try:
+        linhas = await _ler_lote_livros(request)
+    except ValueError as e:
+        return _resposta(*endpoints.erro(str(e)))
+    return await _atender(request, endpoints.criar_livros_em_lote, linhas)
+
+
+@biblioteca_router.get('/livros')
+@_condicional(COLECAO_LIVROS, _quer_ndjson)
+async def listar_livros(request: Request):
+    """
+    Endpoint para listar livros
+    Query params opcionais: q/page/per_page, limit/after, formato=ndjson
+    """
+    # Streaming NDJSON: percorre o catálogo por cursor, uma sessão curta por página
+    if _quer_ndjson(request):
+        use_case = BuscarLivrosUseCase(livro_repository)
+        apenas_disponiveis = endpoints.apenas_disponiveis(request.query_params)
+
+        async def gerar():
+            cursor = None
+            while True:
+                pagina = await executar(
+                    request, use_case.executar_paginado, TAMANHO_PAGINA_STREAM, cursor, apenas_disponiveis
+                )
+                yield b''.join(serializar(livro) + b'\n' for livro in pagina.items)
+                if not pagina.has_next:
+                    break
+                cursor = pagina.next_cursor
+
+        return StreamingResponse(gerar(), media_type='application/x-ndjson')
+
+    return await _atender(request, endpoints.listar_livros, request.query_params)
+
+
+@biblioteca_router.post('/usuarios')
+async def criar_usuario(request: Request):
+    """
+    Endpoint para criar um novo usuário
+    """
+    return await _atender(request, endpoints.criar_usuario, await _ler_json(request))
+
+
+@biblioteca_router.get('/usuarios/{usuario_id}/creditos')
+async def consultar_creditos(request: Request, usuario_id: str):
+    """
+    Endpoint para consultar o saldo e o extrato de créditos de um usuário
+    """
+    return await _atender(request, endpoints.consultar_creditos, request.query_params, usuario_id)
+
+
+@biblioteca_router.post('/emprestimos')
+async def emprestar_livro(request: Request):
+    """
+    Endpoint para emprestar um livro
+    """
+    return await _atender(request, endpoints.emprestar_livro, await _ler_json(request))
+
+
+@biblioteca_router.put('/emprestimos/{emprestimo_id}/devolver')
+async def devolver_livro(request: Request, emprestimo_id: str):
+    """
+    Endpoint para devolver um livro
+    """
+    return await _atender(request, endpoints.devolver_livro, emprestimo_id)
+
+
+@biblioteca_router.post('/emprestimos/lote')
+async def emprestar_livros_em_lote(request: Request):
+    """
+    Endpoint para emprestar vários livros a um usuário (cesta do balcão)
+    """
+    return await _atender(request, endpoints.emprestar_livros_em_lote, await _ler_json(request))
+
+
+@biblioteca_router.put('/emprestimos/devolver-lote')
+async def devolver_livros_em_lote(request: Request):
+    """
+    Endpoint para devolver vários empréstimos de uma vez
+    """
+    return await _atender(request, endpoints.devolver_livros_em_lote, await _ler_json(request))
+
+
+@biblioteca_router.get('/emprestimos')
+@_condicional(COLECAO_EMPRESTIMOS)
+async def listar_emprestimos(request: Request):
+    """
+    Endpoint para listar empréstimos
+    """
+    return await _atender(request, endpoints.listar_emprestimos, request.query_params)
+
+
+@biblioteca_router.get('/emprestimos/atrasos')
+async def relatorio_atrasos(request: Request):
+    """
+    Endpoint para o relatório de empréstimos em atraso
+    Query param opcional: ?limit=N (os N atrasos mais antigos)
+    """
+    return await _atender(request, endpoints.relatorio_atrasos, request.query_params)
+
+
+@biblioteca_router.get('/emprestimos/atrasos/snapshot')
+async def obter_snapshot_atrasos(request: Request):
+    """
+    Endpoint para o snapshot diário de atrasos (para painéis)
+    Query param opcional: ?data=AAAA-MM-DD (padrão: hoje)
+    """
+    return await _atender(request, endpoints.obter_snapshot_atrasos, request.query_params)
+
+
+@biblioteca_router.post('/emprestimos/atrasos/snapshot')
+async def gerar_snapshot_atrasos(request: Request):
+    """
+    Endpoint para recalcular o snapshot de atrasos do dia
+    """
+    return await _atender(request, endpoints.gerar_snapshot_atrasos)
+
+
+@biblioteca_router.get('/estatisticas')
+async def obter_estatisticas(request: Request):
+    """
+    Endpoint com os totais do painel: acervo, empréstimos ativos e em atraso,
+    multas pendentes e créditos emitidos por doações de livros e de horas
+    """
+    return await _atender(request, endpoints.obter_estatisticas)
+
+
+@biblioteca_router.post('/doacoes')
+async def doar_livro(request: Request):
+    """
+    Endpoint para doar um livro
+    """
+    return await _atender(request, endpoints.doar_livro, await _ler_json(request))
+
+
+@biblioteca_router.post('/doacaoes/horas')
+async def doar_horas(request: Request):
+    """
+    Endpoint para doar horas
+    """
+    return await _atender(request, endpoints.doar_horas, await _ler_json(request))
+
+
+@biblioteca_router.get('/health')
+async def health_check():
+    """
+    Endpoint de health check
+    """
+    return _resposta(*endpoints.health_check())
+
+
+def _capacidade_pool(perfil: PerfilBanco) -> int:
+    opcoes = perfil.opcoes_engine()
+    if 'pool_size' not in opcoes:
+        return 1
+    return opcoes['pool_size'] + opcoes['max_overflow']
+
+
+def criar_app_asgi(perfil: Optional[PerfilBanco] = None) -> FastAPI:
+    """
+    Monta a app ASGI: engine assíncrono criado no startup (tabelas e índice
+    de busca incluídos) e descartado no shutdown
+    """
+    perfil = perfil or PerfilBanco.do_ambiente()
+
+    # Mesmas regras de consistência da sessão do Flask
+    limpar_mapa_no_rollback(SessaoSincronaASGI)
+    publicar_versoes_no_commit(SessaoSincronaASGI)
+    if caches_repositorios:
+        ligar_cache_a_sessao(SessaoSincronaASGI, *caches_repositorios.values())
+
+    @asynccontextmanager
+    async def ciclo_de_vida(app: FastAPI):
+        engine = criar_engine_assincrono(perfil)
+        async with engine.begin() as conexao:
+            await conexao.run_sync(db.metadata.create_all)
+            # Tabela FTS5 da busca textual (SQLite; preenchida na primeira criação)
+            await conexao.run_sync(lambda sincrona: criar_indice_busca(conexao=sincrona))
+        # Fila FIFO na frente do pool: sem ela, requisições recém-chegadas
+        # "furam" a fila do pool e as mais antigas estouram o pool_timeout
+        app.state.vagas_conexao = asyncio.Semaphore(_capacidade_pool(perfil))
+        app.state.fabrica_sessao = async_sessionmaker(
+            engine, expire_on_commit=False, sync_session_class=SessaoSincronaASGI
+        )
+        yield
+        await engine.dispose()
+
+    app = FastAPI(title='API da Biblioteca (ASGI)', lifespan=ciclo_de_vida)
+    app.add_middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])
+    app.include_router(biblioteca_router, prefix=PREFIXO_BIBLIOTECA)
+    _init_metricas(app)
+    _init_diagnostico_sql(app)
+    return app
+
+
+def _rota_da_requisicao(request: Request) -> str:
+    """Modelo da rota atendida (ex.: /api/biblioteca/emprestimos/{emprestimo_id}/devolver)"""
+    rota = request.scope.get('route')
+    if rota is None:
+        return 'desconhecida'
+    if rota in biblioteca_router.routes:
+        return PREFIXO_BIBLIOTECA + rota.path
+    return rota.path
+
+
+def _init_metricas(app: FastAPI) -> None:
+    """Métricas Prometheus em /metrics (METRICAS=1), como no init_metricas do Flask"""
+    metricas = habilitar_metricas()
+    if metricas is None:
+        return
+
+    @app.middleware('http')
+    async def medir_requisicao(request: Request, chamar_proximo):
+        inicio = metricas.iniciar_requisicao()
+        status = 500
+        try:
+            resposta = await chamar_proximo(request)
+            status = resposta.status_code
+            return resposta
+        finally:
+            metricas.finalizar_requisicao(inicio, _rota_da_requisicao(request), request.method, status)
+
+    @app.get('/metrics', include_in_schema=False)
+    async def exportar_metricas():
+        conteudo, tipo = metricas.exposicao()
+        return Response(conteudo, media_type=tipo)
+
+
+def _init_diagnostico_sql(app: FastAPI) -> None:
+    """Consultas lentas/N+1 e /api/debug/queries (SQL_DIAGNOSTICO), como no Flask"""
+    diagnostico = habilitar_diagnostico()
+    if diagnostico is None:
+        return
+
+    @app.middleware('http')
+    async def diagnosticar_requisicao(request: Request, chamar_proximo):
+        if request.url.path == ROTA_DIAGNOSTICO:
+            return await chamar_proximo(request)
+        inicio = diagnostico.iniciar_requisicao(request.url.path, request.method)
+        status = 500
+        try:
+            resposta = await chamar_proximo(request)
+            status = resposta.status_code
+            return resposta
+        finally:
+            diagnostico.finalizar_requisicao(inicio, status, _rota_da_requisicao(request))
+
+    @app.get(ROTA_DIAGNOSTICO, include_in_schema=False)
+    async def consultas_registradas(request: Request):
+        apenas_alertas = request.query_params.get('alertas', 'false').lower() == 'true'
+        return _resposta(diagnostico.visao(apenas_alertas))
@@ -0,0 +1,98 @@
+# Presentation Layer - Comandos de linha de comando (flask CLI)
+
+import click
+from flask import Blueprint
+from src.application.use_cases import GerarSnapshotAtrasosUseCase
+from src.domain.entities import MovimentoCredito, ORIGEM_AJUSTE
+from src.infrastructure.database.busca import criar_indice_busca
+from src.infrastructure.database.config import inicializar_banco
+from src.infrastructure.database.indices import criar_indices, verificar_uso_de_indices
+from src.infrastructure.repositories import (
+    SQLAlchemyEmprestimoRepository, SQLAlchemySnapshotAtrasosRepository, SQLAlchemyCreditoRepository
+)
+
+# Blueprint sem rotas, apenas comandos: flask --app src.main <comando>
+comandos_bp = Blueprint('comandos', __name__, cli_group=None)
+
+@comandos_bp.cli.command('init-db')
+def init_db_command():
+    """
+    Cria as tabelas e o índice de busca (passo único de deploy, idempotente)
+    """
+    inicializar_banco()
+    click.echo("✅ Banco de dados inicializado")
+
+@comandos_bp.cli.command('criar-indices')
+def criar_indices_command():
+    """
+    Cria em bancos existentes os índices declarados nos models (idempotente)
+    """
+    criados = criar_indices()
+    if criados:
+        for nome in criados:
+            click.echo(f"✅ Índice criado: {nome}")
+    else:
+        click.echo("✅ Todos os índices já existem")
+
+@comandos_bp.cli.command('verificar-indices')
+def verificar_indices_command():
+    """
+    Verifica via EXPLAIN se cada consulta dos repositórios usa índice
+    """
+    planos = verificar_uso_de_indices()
+    for plano in planos:
+        simbolo = '✅' if plano.usa_indice else '❌'
+        click.echo(f"{simbolo} {plano.consulta}")
+        for passo in plano.plano:
+            click.echo(f"     {passo}")
+    
+    if not all(plano.usa_indice for plano in planos):
+        raise SystemExit(1)
+
+@comandos_bp.cli.command('reindexar-busca')
+def reindexar_busca_command():
+    """
+    Reconstrói a tabela FTS5 da busca textual a partir de livros
+    """
+    if criar_indice_busca(reconstruir=True):
+        click.echo("✅ Índice de busca reconstruído")
+    else:
+        click.echo("ℹ️  Busca textual FTS5 disponível apenas no SQLite (usando LIKE)")
+
+@comandos_bp.cli.command('gerar-snapshot-atrasos')
+def gerar_snapshot_atrasos_command():
+    """
+    Gera o snapshot diário de atrasos (para agendar no cron)
+    """
+    use_case = GerarSnapshotAtrasosUseCase(SQLAlchemyEmprestimoRepository(), SQLAlchemySnapshotAtrasosRepository())
+    snapshot = use_case.executar()
+    click.echo(
+        f"✅ Snapshot {snapshot.data}: {snapshot.total_emprestimos} empréstimo(s) em atraso, "
+        f"multa projetada R$ {snapshot.multa_projetada:.2f}"
+    )
+
+@comandos_bp.cli.command('verificar-creditos')
+@click.option('--ajustar', is_flag=True, help='Lança no extrato a diferença (saldos anteriores ao extrato)')
+def verificar_creditos_command(ajustar):
+    """
+    Confere se o saldo de cada usuário é igual à soma do seu extrato de créditos
+    """
+    credito_repository = SQLAlchemyCreditoRepository()
+    divergencias = credito_repository.divergencias()
+    if not divergencias:
+        click.echo("✅ Saldos conferem com o extrato de créditos")
+        return
+    
+    for usuario_id, saldo, soma in divergencias:
+        click.echo(f"❌ {usuario_id}: saldo {saldo:.2f}, extrato {soma:.2f}")
+        if ajustar:
+            credito_repository.registrar_ajuste(MovimentoCredito(
+                id="",  # Será gerado automaticamente
+                usuario_id=usuario_id,
+                valor=saldo - soma,
+                origem=ORIGEM_AJUSTE
+            ))
+            click.echo(f"   ✅ Ajuste de {saldo - soma:.2f} lançado")
+    
+    if not ajustar:
+        raise SystemExit(1)
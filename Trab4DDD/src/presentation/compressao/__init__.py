@@ -0,0 +1,226 @@
+# Presentation Layer - Compressão das respostas (gzip / brotli)
+#
+# Middleware WSGI aplicado à app Flask. Negocia a codificação pelo
+# Accept-Encoding (brotli quando instalado, senão gzip) e comprime:
+# - respostas com Content-Length acima do mínimo: de uma vez, com o novo
+#   Content-Length
+# - respostas em streaming (sem Content-Length, ex.: NDJSON): à medida que os
+#   blocos são gerados, sem acumular o corpo; a cada COMPRESSAO_BLOCO bytes de
+#   entrada o compressor é esvaziado para o cliente ir recebendo os dados
+#
+# A ETag forte da resposta vira fraca (W/"..."): os bytes mudam com a
+# codificação, mas o conteúdo é o mesmo e o If-None-Match compara de forma fraca.
+
+import os
+import zlib
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from werkzeug.datastructures import Headers
+from werkzeug.http import parse_accept_header
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional: sem ele só há gzip
+    brotli = None
+
+CODIFICACAO_BROTLI = 'br'
+CODIFICACAO_GZIP = 'gzip'
+
+# Tipos de conteúdo que valem a pena comprimir (imagens e afins já são comprimidos)
+TIPOS_COMPRIMIVEIS = (
+    'text/', 'application/json', 'application/x-ndjson', 'application/javascript',
+    'application/xml', 'image/svg+xml'
+)
+
+
+@dataclass
+class ConfiguracaoCompressao:
+    """Configuração da compressão das respostas (variáveis COMPRESSAO_*)"""
+    habilitado: bool = True
+    tamanho_minimo: int = 1024
+    nivel_gzip: int = 6
+    nivel_brotli: int = 4
+    tamanho_bloco: int = 64 * 1024
+
+    @classmethod
+    def do_ambiente(cls) -> 'ConfiguracaoCompressao':
+        """
+        Monta a configuração a partir de COMPRESSAO, COMPRESSAO_MINIMO,
+        COMPRESSAO_NIVEL_GZIP, COMPRESSAO_NIVEL_BROTLI e COMPRESSAO_BLOCO
+        """
+        configuracao = cls(
+            habilitado=os.environ.get('COMPRESSAO', '1').lower() in ('1', 'true', 'sim'),
+            tamanho_minimo=int(os.environ.get('COMPRESSAO_MINIMO', 1024)),
+            nivel_gzip=int(os.environ.get('COMPRESSAO_NIVEL_GZIP', 6)),
+            nivel_brotli=int(os.environ.get('COMPRESSAO_NIVEL_BROTLI', 4)),
+            tamanho_bloco=int(os.environ.get('COMPRESSAO_BLOCO', 64 * 1024))
+        )
+        if not 1 <= configuracao.nivel_gzip <= 9:
+            raise ValueError('COMPRESSAO_NIVEL_GZIP deve estar entre 1 e 9')
+        if not 0 <= configuracao.nivel_brotli <= 11:
+            raise ValueError('COMPRESSAO_NIVEL_BROTLI deve estar entre 0 e 11')
+        return configuracao
+
+    @property
+    def codificacoes(self) -> List[str]:
+        """Codificações suportadas, da preferida para a menos preferida"""
+        return [CODIFICACAO_BROTLI, CODIFICACAO_GZIP] if brotli is not None else [CODIFICACAO_GZIP]
+
+
+class Compressor:
+    """Interface comum a gzip e brotli: comprimir, esvaziar e finalizar"""
+
+    def __init__(self, codificacao: str, configuracao: ConfiguracaoCompressao):
+        self.codificacao = codificacao
+        if codificacao == CODIFICACAO_BROTLI:
+            self._brotli = brotli.Compressor(quality=configuracao.nivel_brotli)
+        else:
+            # wbits=31: formato gzip (cabeçalho + CRC), não o zlib puro
+            self._zlib = zlib.compressobj(configuracao.nivel_gzip, zlib.DEFLATED, 31)
+
+    def comprimir(self, dados: bytes) -> bytes:
+        if self.codificacao == CODIFICACAO_BROTLI:
+            return self._brotli.process(dados)
+        return self._zlib.compress(dados)
+
+    def esvaziar(self) -> bytes:
+        """Entrega tudo o que já foi comprimido (o stream continua válido)"""
+        if self.codificacao == CODIFICACAO_BROTLI:
+            return self._brotli.flush()
+        return self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finalizar(self) -> bytes:
+        if self.codificacao == CODIFICACAO_BROTLI:
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+
+def comprimir_stream(blocos: Iterable[bytes], compressor: Compressor, tamanho_bloco: int) -> Iterator[bytes]:
+    """Comprime os blocos à medida que chegam, esvaziando a cada tamanho_bloco bytes de entrada"""
+    pendentes = 0
+    for bloco in blocos:
+        if not bloco:
+            continue
+        saida = compressor.comprimir(bloco)
+        pendentes += len(bloco)
+        if pendentes >= tamanho_bloco:
+            saida += compressor.esvaziar()
+            pendentes = 0
+        if saida:
+            yield saida
+    yield compressor.finalizar()
+
+
+def _comprimivel(tipo: Optional[str]) -> bool:
+    return bool(tipo) and tipo.split(';', 1)[0].strip().lower().startswith(TIPOS_COMPRIMIVEIS)
+
+
+def _acrescentar_vary(cabecalhos: Headers) -> None:
+    atuais = [valor.strip().lower() for valor in cabecalhos.get('Vary', '').split(',') if valor.strip()]
+    if 'accept-encoding' not in atuais and '*' not in atuais:
+        cabecalhos['Vary'] = f"{cabecalhos['Vary']}, Accept-Encoding" if atuais else 'Accept-Encoding'
+
+
+def _enfraquecer_etag(cabecalhos: Headers) -> None:
+    etag = cabecalhos.get('ETag')
+    if etag and not etag.startswith('W/'):
+        cabecalhos['ETag'] = f'W/{etag}'
+
+
+class CompressaoWSGI:
+    """
+    Middleware WSGI de compressão negociada
+    Uso: app.wsgi_app = CompressaoWSGI(app.wsgi_app, ConfiguracaoCompressao.do_ambiente())
+    """
+
+    def __init__(self, app: Callable, configuracao: ConfiguracaoCompressao):
+        self.app = app
+        self.configuracao = configuracao
+
+    def negociar(self, accept_encoding: Optional[str]) -> Optional[str]:
+        """Melhor codificação aceita pelo cliente (None = sem compressão)"""
+        if not accept_encoding:
+            return None
+        return parse_accept_header(accept_encoding).best_match(self.configuracao.codificacoes)
+
+    def __call__(self, environ, start_response):
+        codificacao = None
+        if environ.get('REQUEST_METHOD') != 'HEAD':
+            codificacao = self.negociar(environ.get('HTTP_ACCEPT_ENCODING'))
+        estado = {}
+
+        def iniciar(status: str, cabecalhos: List[Tuple[str, str]], exc_info=None):
+            cabecalhos = Headers(cabecalhos)
+            modo = self._modo(status, cabecalhos) if codificacao else None
+            if modo is None:
+                # Toda variante de um conteúdo comprimível (inclusive sem compressão e
+                # o 304) informa que depende do Accept-Encoding, para os caches
+                nao_modificado = status.startswith('304')
+                if nao_modificado or _comprimivel(cabecalhos.get('Content-Type')):
+                    _acrescentar_vary(cabecalhos)
+                if nao_modificado and codificacao:
+                    # O 304 repete a ETag que o 200 comprimido teria
+                    _enfraquecer_etag(cabecalhos)
+                estado['modo'] = None
+                return start_response(status, cabecalhos.to_wsgi_list(), exc_info)
+
+            cabecalhos['Content-Encoding'] = codificacao
+            _acrescentar_vary(cabecalhos)
+            _enfraquecer_etag(cabecalhos)
+            estado.update(modo=modo, status=status, cabecalhos=cabecalhos, exc_info=exc_info)
+            if modo == 'stream':
+                cabecalhos.pop('Content-Length', None)
+                return start_response(status, cabecalhos.to_wsgi_list(), exc_info)
+            # Corpo de tamanho conhecido: start_response fica para depois da compressão
+            return self._escrita_indisponivel
+
+        corpo = self.app(environ, iniciar)
+        modo = estado.get('modo')
+        if modo is None:
+            return corpo
+
+        compressor = Compressor(codificacao, self.configuracao)
+        if modo == 'stream':
+            return self._stream(corpo, compressor)
+
+        try:
+            dados = compressor.comprimir(b''.join(corpo)) + compressor.finalizar()
+        finally:
+            if hasattr(corpo, 'close'):
+                corpo.close()
+        cabecalhos = estado['cabecalhos']
+        cabecalhos['Content-Length'] = str(len(dados))
+        start_response(estado['status'], cabecalhos.to_wsgi_list(), estado['exc_info'])
+        return [dados]
+
+    def _modo(self, status: str, cabecalhos: Headers) -> Optional[str]:
+        """'inteiro', 'stream' ou None (não comprimir)"""
+        codigo = int(status.split(' ', 1)[0])
+        if codigo < 200 or codigo in (204, 206, 304):
+            return None
+        if 'Content-Encoding' in cabecalhos or not _comprimivel(cabecalhos.get('Content-Type')):
+            return None
+        if 'no-transform' in cabecalhos.get('Cache-Control', '').lower():
+            return None
+        tamanho = cabecalhos.get('Content-Length', type=int)
+        if tamanho is None:
+            return 'stream'
+        return 'inteiro' if tamanho >= self.configuracao.tamanho_minimo else None
+
+    def _stream(self, corpo, compressor: Compressor) -> Iterator[bytes]:
+        try:
+            yield from comprimir_stream(corpo, compressor, self.configuracao.tamanho_bloco)
+        finally:
+            if hasattr(corpo, 'close'):
+                corpo.close()
+
+    @staticmethod
+    def _escrita_indisponivel(_dados: bytes) -> None:
+        raise RuntimeError('write() do WSGI não é suportado em respostas comprimidas')
+
+
+def init_compressao(app, configuracao: Optional[ConfiguracaoCompressao] = None) -> None:
+    """Envolve a app Flask com o middleware de compressão (COMPRESSAO=0 desliga)"""
+    configuracao = configuracao or ConfiguracaoCompressao.do_ambiente()
+    if configuracao.habilitado:
+        app.wsgi_app = CompressaoWSGI(app.wsgi_app, configuracao)
@@ -0,0 +1,93 @@
+# Presentation Layer - GET condicional (ETag / Last-Modified) das listagens
+#
+# O ETag de uma listagem é derivado só da versão da coleção (mantida pelos
+# repositórios) e da variante pedida (query string e formato), então um
+# If-None-Match que confere é respondido com 304 sem consultar o banco.
+
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple
+from flask import make_response, request
+from werkzeug.http import http_date, parse_date, parse_etags, quote_etag
+from src.infrastructure.repositories.versoes import COLECAO_EMPRESTIMOS, versoes_colecoes
+
+# Empréstimos têm campos calculados com o relógio (esta_em_atraso, dias_atraso):
+# o ETag também muda a cada janela, limitando o quanto eles podem ficar defasados
+JANELA_EMPRESTIMOS_SEGUNDOS = int(os.environ.get('ETAG_JANELA_EMPRESTIMOS', 60))
+
+
+@dataclass
+class Condicional:
+    """Validadores da listagem e se o cliente já tem a versão atual"""
+    etag: str
+    modificada_em: datetime
+    nao_modificado: bool = False
+
+    @property
+    def cabecalhos(self) -> Dict[str, str]:
+        return {
+            'ETag': quote_etag(self.etag),
+            'Last-Modified': http_date(self.modificada_em),
+            # O cliente pode guardar, mas revalida a cada uso
+            'Cache-Control': 'no-cache',
+            'Vary': 'Accept'
+        }
+
+
+def validadores(colecao: str, variante: str) -> Tuple[str, datetime]:
+    """ETag forte e Last-Modified da listagem, sem acessar o banco"""
+    versao = versoes_colecoes().atual(colecao)
+    partes = [colecao, versao.token]
+    modificada_em = versao.modificada_em
+    if colecao == COLECAO_EMPRESTIMOS:
+        janela = int(time.time() // JANELA_EMPRESTIMOS_SEGUNDOS)
+        partes.append(str(janela))
+        inicio_janela = datetime.fromtimestamp(janela * JANELA_EMPRESTIMOS_SEGUNDOS, timezone.utc)
+        modificada_em = max(modificada_em, inicio_janela)
+    partes.append(hashlib.blake2s(variante.encode('utf-8'), digest_size=6).hexdigest())
+    return '-'.join(partes), modificada_em
+
+
+def avaliar(colecao: str, variante: str, if_none_match: Optional[str], if_modified_since: Optional[str]) -> Condicional:
+    """
+    Calcula os validadores e compara com os cabeçalhos condicionais
+    If-None-Match tem precedência; If-Modified-Since só vale sem ele (RFC 9110).
+    """
+    etag, modificada_em = validadores(colecao, variante)
+    resultado = Condicional(etag, modificada_em)
+    if if_none_match is not None:
+        resultado.nao_modificado = parse_etags(if_none_match).contains_weak(etag)
+    elif if_modified_since:
+        data = parse_date(if_modified_since)
+        resultado.nao_modificado = data is not None and modificada_em <= data
+    return resultado
+
+
+def condicional(colecao: str, formato: Optional[Callable[[], object]] = None):
+    """
+    Decorator das views Flask de listagem: 304 quando o cliente já tem a
+    versão atual; senão executa a view e anexa ETag/Last-Modified às respostas 200
+    formato: função que identifica o formato negociado (ex.: _quer_ndjson), se houver
+    """
+    def decorator(view):
+        @wraps(view)
+        def envolvida(*args, **kwargs):
+            variante = request.query_string.decode('latin-1')
+            if formato is not None:
+                variante += f'|{formato()}'
+            resultado = avaliar(
+                colecao, variante, request.headers.get('If-None-Match'), request.headers.get('If-Modified-Since')
+            )
+            if resultado.nao_modificado:
+                return make_response('', 304, resultado.cabecalhos)
+
+            resposta = make_response(view(*args, **kwargs))
+            if resposta.status_code == 200:
+                resposta.headers.update(resultado.cabecalhos)
+            return resposta
+        return envolvida
+    return decorator
@@ -1,24 +1,54 @@
 # Presentation Layer - Controllers
+#
+# Transporte Flask dos endpoints da biblioteca: extrai os dados da requisição,
+# chama o endpoint compartilhado (src.presentation.endpoints) e converte o
+# (conteudo, status) em resposta. A app ASGI usa os mesmos endpoints.
 
-from flask import Blueprint, request, jsonify
-from src.application.use_cases import (
-    CriarLivroUseCase, BuscarLivrosUseCase, CriarUsuarioUseCase,
-    EmprestarLivroUseCase, DevolverLivroUseCase, ListarEmprestimosUseCase, DoarLivroUseCase, DoarHorasUseCase
-)
-from src.application.dtos import LivroDTO, UsuarioDTO, EmprestimoRequestDTO, DevolucaoRequestDTO, DoacaoDTO, HorasDTO
-from src.infrastructure.repositories import (
-    SQLAlchemyLivroRepository, SQLAlchemyUsuarioRepository, SQLAlchemyEmprestimoRepository, SQLAlchemyDoacaoRepository, SQLAlchemyHorasRepository
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from src.application.use_cases import BuscarLivrosUseCase
+from src.infrastructure.repositories.cache import ligar_cache_a_sessao
+from src.infrastructure.repositories.versoes import COLECAO_EMPRESTIMOS, COLECAO_LIVROS
+from src.presentation import endpoints
+# Repositórios e limites continuam acessíveis por este módulo (CLI, benchmarks)
+from src.presentation.endpoints import (
+    livro_repository, usuario_repository, emprestimo_repository, doacao_repository, horas_repository,
+    snapshot_atrasos_repository, credito_repository, estatisticas_repository, unit_of_work,
+    configuracao_cache, caches_repositorios, LIMITE_MAXIMO_PAGINA, MAX_ITENS_LOTE, Resposta
 )
+from src.presentation.condicional import condicional
+from src.models.user import db
 
 # Criar blueprint para a API da biblioteca
 biblioteca_bp = Blueprint('biblioteca', __name__)
 
-# Instanciar repositories (Dependency Injection)
-livro_repository = SQLAlchemyLivroRepository()
-usuario_repository = SQLAlchemyUsuarioRepository()
-emprestimo_repository = SQLAlchemyEmprestimoRepository()
-doacao_repository = SQLAlchemyDoacaoRepository()
-horas_repository = SQLAlchemyHorasRepository()
+# Mesmas regras de consistência dos caches na sessão do Flask-SQLAlchemy
+if caches_repositorios:
+    ligar_cache_a_sessao(db.session, *caches_repositorios.values())
+
+def _responder(resposta: Resposta):
+    conteudo, status = resposta
+    return jsonify(conteudo), status
+
+def _ler_json():
+    """Corpo JSON da requisição, ou None se ausente/inválido"""
+    return request.get_json(silent=True)
+
+def _ler_lote_livros():
+    """
+    Lê o lote de livros da requisição: upload CSV (campo 'arquivo'),
+    corpo text/csv ou array JSON
+    """
+    if 'arquivo' in request.files:
+        return endpoints.ler_csv(request.files['arquivo'].read().decode('utf-8-sig'))
+    if request.mimetype == 'text/csv':
+        return endpoints.ler_csv(request.get_data(as_text=True))
+    return _ler_json()
+
+def _quer_ndjson() -> bool:
+    """Verifica se o cliente optou pela resposta em streaming NDJSON"""
+    if request.args.get('formato', '').lower() == 'ndjson':
+        return True
+    return request.accept_mimetypes.best == 'application/x-ndjson'
 
 @biblioteca_bp.route('/livros', methods=['POST'])
 def criar_livro():
@@ -26,246 +56,143 @@ def criar_livro():
     Endpoint para criar um novo livro
     Aplicando Clean Architecture: Controller na camada de apresentação
     """
+    return _responder(endpoints.criar_livro(_ler_json()))
+
+@biblioteca_bp.route('/livros/lote', methods=['POST'])
+def criar_livros_em_lote():
+    """
+    Endpoint para importar vários livros de uma vez
+    Linhas inválidas são reportadas em 'erros' sem abortar o restante
+    """
     try:
-        data = request.get_json()
-        
-        # Validar dados de entrada
-        if not data or not all(k in data for k in ('titulo', 'autor', 'isbn')):
-            return jsonify({'erro': 'Dados obrigatórios: titulo, autor, isbn'}), 400
-        
-        # Criar DTO
-        livro_dto = LivroDTO(
-            titulo=data['titulo'],
-            autor=data['autor'],
-            isbn=data['isbn']
-        )
-        
-        # Executar use case
-        use_case = CriarLivroUseCase(livro_repository)
-        livro_id = use_case.executar(livro_dto)
-        
-        return jsonify({
-            'mensagem': 'Livro criado com sucesso',
-            'id': livro_id
-        }), 201
-        
+        linhas = _ler_lote_livros()
     except ValueError as e:
-        return jsonify({'erro': str(e)}), 400
-    except Exception as e:
-        return jsonify({'erro': 'Erro interno do servidor'}), 500
+        return _responder(endpoints.erro(str(e)))
+    return _responder(endpoints.criar_livros_em_lote(linhas))
 
 @biblioteca_bp.route('/livros', methods=['GET'])
+@condicional(COLECAO_LIVROS, _quer_ndjson)
 def listar_livros():
     """
     Endpoint para listar livros
+    Query params opcionais:
+    - q (com page/per_page): busca textual por título, autor ou ISBN
+    - limit/after: paginação por cursor (keyset) sobre o ID
+    - formato=ndjson (ou Accept: application/x-ndjson): resposta em streaming
     """
-    try:
-        apenas_disponiveis = request.args.get('disponiveis', 'false').lower() == 'true'
-        
-        # Executar use case
+    # Streaming NDJSON: uma linha JSON por livro, memória constante
+    if _quer_ndjson():
         use_case = BuscarLivrosUseCase(livro_repository)
-        livros = use_case.executar(apenas_disponiveis)
-        
-        # Converter DTOs para dicionários
-        livros_dict = []
-        for livro in livros:
-            livros_dict.append({
-                'id': livro.id,
-                'titulo': livro.titulo,
-                'autor': livro.autor,
-                'isbn': livro.isbn,
-                'disponivel': livro.disponivel
-            })
-        
-        return jsonify({
-            'livros': livros_dict,
-            'total': len(livros_dict)
-        }), 200
-        
-    except Exception as e:
-        return jsonify({'erro': 'Erro interno do servidor'}), 500
+        apenas_disponiveis = endpoints.apenas_disponiveis(request.args)
+
+        def gerar():
+            for livro in use_case.executar_stream(apenas_disponiveis):
+                yield current_app.json.dumps(livro) + '\n'
+
+        return Response(stream_with_context(gerar()), mimetype='application/x-ndjson'), 200
+
+    return _responder(endpoints.listar_livros(request.args))
 
 @biblioteca_bp.route('/usuarios', methods=['POST'])
 def criar_usuario():
     """
     Endpoint para criar um novo usuário
     """
-    try:
-        data = request.get_json()
-        
-        # Validar dados de entrada
-        if not data or not all(k in data for k in ('nome', 'email')):
-            return jsonify({'erro': 'Dados obrigatórios: nome, email'}), 400
-        
-        # Criar DTO
-        usuario_dto = UsuarioDTO(
-            nome=data['nome'],
-            email=data['email']
-        )
-        
-        # Executar use case
-        use_case = CriarUsuarioUseCase(usuario_repository)
-        usuario_id = use_case.executar(usuario_dto)
-        
-        return jsonify({
-            'mensagem': 'Usuário criado com sucesso',
-            'id': usuario_id
-        }), 201
-        
-    except ValueError as e:
-        return jsonify({'erro': str(e)}), 400
-    except Exception as e:
-        return jsonify({'erro': 'Erro interno do servidor'}), 500
+    return _responder(endpoints.criar_usuario(_ler_json()))
+
+@biblioteca_bp.route('/usuarios/<usuario_id>/creditos', methods=['GET'])
+def consultar_creditos(usuario_id):
+    """
+    Endpoint para consultar o saldo e o extrato de créditos de um usuário
+    """
+    return _responder(endpoints.consultar_creditos(request.args, usuario_id))
 
 @biblioteca_bp.route('/emprestimos', methods=['POST'])
 def emprestar_livro():
     """
     Endpoint para emprestar um livro
     """
-    try:
-        data = request.get_json()
-        
-        # Validar dados de entrada
-        if not data or not all(k in data for k in ('livro_id', 'usuario_id')):
-            return jsonify({'erro': 'Dados obrigatórios: livro_id, usuario_id'}), 400
-        
-        # Executar use case
-        use_case = EmprestarLivroUseCase(livro_repository, usuario_repository, emprestimo_repository)
-        emprestimo_id = use_case.executar(data['livro_id'], data['usuario_id'])
-        
-        return jsonify({
-            'mensagem': 'Livro emprestado com sucesso',
-            'emprestimo_id': emprestimo_id
-        }), 201
-        
-    except ValueError as e:
-        return jsonify({'erro': str(e)}), 400
-    except Exception as e:
-        return jsonify({'erro': 'Erro interno do servidor'}), 500
+    return _responder(endpoints.emprestar_livro(_ler_json()))
 
 @biblioteca_bp.route('/emprestimos/<emprestimo_id>/devolver', methods=['PUT'])
 def devolver_livro(emprestimo_id):
     """
     Endpoint para devolver um livro
     """
-    try:
-        # Executar use case
-        use_case = DevolverLivroUseCase(livro_repository, emprestimo_repository)
-        multa = use_case.executar(emprestimo_id)
-        
-        return jsonify({
-            'mensagem': 'Livro devolvido com sucesso',
-            'multa': multa
-        }), 200
-        
-    except ValueError as e:
-        return jsonify({'erro': str(e)}), 400
-    except Exception as e:
-        return jsonify({'erro': 'Erro interno do servidor'}), 500
+    return _responder(endpoints.devolver_livro(emprestimo_id))
+
+@biblioteca_bp.route('/emprestimos/lote', methods=['POST'])
+def emprestar_livros_em_lote():
+    """
+    Endpoint para emprestar vários livros a um usuário (cesta do balcão)
+    Body: {"usuario_id": "...", "livro_ids": ["...", ...]}
+    """
+    return _responder(endpoints.emprestar_livros_em_lote(_ler_json()))
+
+@biblioteca_bp.route('/emprestimos/devolver-lote', methods=['PUT'])
+def devolver_livros_em_lote():
+    """
+    Endpoint para devolver vários empréstimos de uma vez
+    Body: {"emprestimo_ids": ["...", ...]}
+    """
+    return _responder(endpoints.devolver_livros_em_lote(_ler_json()))
 
 @biblioteca_bp.route('/emprestimos', methods=['GET'])
+@condicional(COLECAO_EMPRESTIMOS)
 def listar_emprestimos():
     """
     Endpoint para listar empréstimos
     """
-    try:
-        usuario_id = request.args.get('usuario_id')
-        apenas_ativos = request.args.get('ativos', 'false').lower() == 'true'
-        
-        # Executar use case
-        use_case = ListarEmprestimosUseCase(emprestimo_repository)
-        emprestimos = use_case.executar(usuario_id, apenas_ativos)
-        
-        # Converter DTOs para dicionários
-        emprestimos_dict = []
-        for emprestimo in emprestimos:
-            emprestimos_dict.append({
-                'id': emprestimo.id,
-                'livro_id': emprestimo.livro_id,
-                'usuario_id': emprestimo.usuario_id,
-                'data_emprestimo': emprestimo.data_emprestimo,
-                'data_devolucao_prevista': emprestimo.data_devolucao_prevista,
-                'data_devolucao_real': emprestimo.data_devolucao_real,
-                'multa': emprestimo.multa,
-                'esta_em_atraso': emprestimo.esta_em_atraso,
-                'dias_atraso': emprestimo.dias_atraso
-            })
-        
-        return jsonify({
-            'emprestimos': emprestimos_dict,
-            'total': len(emprestimos_dict)
-        }), 200
-        
-    except Exception as e:
-        return jsonify({'erro': 'Erro interno do servidor'}), 500
+    return _responder(endpoints.listar_emprestimos(request.args))
+
+@biblioteca_bp.route('/emprestimos/atrasos', methods=['GET'])
+def relatorio_atrasos():
+    """
+    Endpoint para o relatório de empréstimos em atraso
+    Query param opcional: ?limit=N (os N atrasos mais antigos)
+    """
+    return _responder(endpoints.relatorio_atrasos(request.args))
+
+@biblioteca_bp.route('/emprestimos/atrasos/snapshot', methods=['GET'])
+def obter_snapshot_atrasos():
+    """
+    Endpoint para o snapshot diário de atrasos (para painéis)
+    Query param opcional: ?data=AAAA-MM-DD (padrão: hoje)
+    """
+    return _responder(endpoints.obter_snapshot_atrasos(request.args))
+
+@biblioteca_bp.route('/emprestimos/atrasos/snapshot', methods=['POST'])
+def gerar_snapshot_atrasos():
+    """
+    Endpoint para recalcular o snapshot de atrasos do dia
+    """
+    return _responder(endpoints.gerar_snapshot_atrasos())
+
+@biblioteca_bp.route('/estatisticas', methods=['GET'])
+def obter_estatisticas():
+    """
+    Endpoint com os totais do painel: acervo, empréstimos ativos e em atraso,
+    multas pendentes e créditos emitidos por doações de livros e de horas
+    """
+    return _responder(endpoints.obter_estatisticas())
 
 @biblioteca_bp.route('/doacoes', methods=['POST'])
 def listar_doacoes():
     """
     Endpoint para doar um livro
     """
-    try:
-        data = request.get_json()
-        
-        # Validar dados de entrada
-        if not data or not all(k in data for k in ('livro_id', 'usuario_id', 'data_doacao')):
-            return jsonify({'erro': 'Dados obrigatórios: livro_id, usuario_id, data_doacao'}), 400
-        
-        # Criar DTO
-        doacao_dto = DoacaoDTO(
-            livro_id=data['livro_id'],
-            usuario_id=data['usuario_id'],
-            data_doacao=data['data_doacao']
-        )
-        
-        # Executar use case
-        use_case = DoarLivroUseCase(doacao_repository)
-        doacao_id = use_case.executar(doacao_dto)
-        
-        return jsonify({
-            'mensagem': 'Livro doado com sucesso',
-            'doacao_id': doacao_id
-        }), 201
-        
-    except ValueError as e:
-        return jsonify({'erro': str(e)}), 400
-    except Exception as e:
-        return jsonify({'erro': 'Erro interno do servidor'}), 500
+    return _responder(endpoints.doar_livro(_ler_json()))
 
 @biblioteca_bp.route('/doacaoes/horas', methods=['POST'])
 def doar_horas():
     """
     Endpoint para doar horas
     """
-    try:
-        data = request.get_json()
-        
-        if not data or not all(k in data for k in ('usuario_id', 'horas')):
-            return jsonify({'erro': 'Dados obrigatórios: usuario_id, horas'}), 400
-        # Criar DTO
-        horas_dto = HorasDTO(
-            usuario_id=data['usuario_id'],
-            horas=data['horas']
-        )
-        # Executar use case
-        use_case = DoarHorasUseCase(usuario_repository, horas_repository)
-        creditos = use_case.executar(horas_dto)
-        return jsonify({
-            'mensagem': 'Horas doadas com sucesso',
-            'creditos': creditos
-        }), 201
-    except ValueError as e:
-        return jsonify({'erro': str(e)}), 400
-    except Exception as e:
-        return jsonify({'erro': 'Erro interno do servidor'}), 500   
+    return _responder(endpoints.doar_horas(_ler_json()))
 
 @biblioteca_bp.route('/health', methods=['GET'])
 def health_check():
     """
     Endpoint de health check
     """
-    return jsonify({
-        'status': 'OK',
-        'mensagem': 'API da Biblioteca funcionando corretamente'
-    }), 200
-
+    return _responder(endpoints.health_check())
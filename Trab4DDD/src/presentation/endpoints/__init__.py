@@ -0,0 +1,506 @@
+# Presentation Layer - Endpoints
+#
+# Regras HTTP da API da biblioteca, independentes do servidor: leitura e
+# validação dos parâmetros, montagem dos DTOs, chamada ao caso de uso e
+# formato da resposta. Cada endpoint recebe os dados já extraídos da
+# requisição (query string, corpo JSON, parâmetros da rota) e devolve
+# (conteudo, status); o biblioteca_bp (Flask) e o biblioteca_router (ASGI)
+# só cuidam do transporte.
+
+import csv
+import io
+from dataclasses import asdict
+from datetime import date
+from functools import wraps
+from typing import Any, Callable, Mapping, Optional, Tuple
+from src.application.use_cases import (
+    CriarLivroUseCase, CriarLivrosEmLoteUseCase, BuscarLivrosUseCase, CriarUsuarioUseCase,
+    EmprestarLivroUseCase, DevolverLivroUseCase, ListarEmprestimosUseCase, DoarLivroUseCase, DoarHorasUseCase,
+    RelatorioAtrasosUseCase, GerarSnapshotAtrasosUseCase, ObterSnapshotAtrasosUseCase,
+    EmprestarLivrosEmLoteUseCase, DevolverLivrosEmLoteUseCase, ConsultarCreditosUseCase, ObterEstatisticasUseCase
+)
+from src.application.dtos import LivroDTO, UsuarioDTO, DoacaoDTO, HorasDTO
+from src.infrastructure.repositories import (
+    SQLAlchemyLivroRepository, SQLAlchemyUsuarioRepository, SQLAlchemyEmprestimoRepository, SQLAlchemyDoacaoRepository, SQLAlchemyHorasRepository,
+    SQLAlchemySnapshotAtrasosRepository, SQLAlchemyCreditoRepository, SQLAlchemyEstatisticasRepository
+)
+from src.infrastructure.repositories.cache import (
+    CacheLRU, ConfiguracaoCache, EstatisticasRepositoryComCache, LivroRepositoryComCache, UsuarioRepositoryComCache
+)
+from src.infrastructure.database.unit_of_work import SQLAlchemyUnitOfWork
+
+# Resposta de um endpoint: corpo (serializado em JSON pelo transporte) e status HTTP
+Resposta = Tuple[Any, int]
+
+# Instanciar repositories (Dependency Injection)
+livro_repository = SQLAlchemyLivroRepository()
+usuario_repository = SQLAlchemyUsuarioRepository()
+emprestimo_repository = SQLAlchemyEmprestimoRepository()
+doacao_repository = SQLAlchemyDoacaoRepository()
+horas_repository = SQLAlchemyHorasRepository()
+snapshot_atrasos_repository = SQLAlchemySnapshotAtrasosRepository()
+
+# Cache de leitura opcional para livros e usuários (REPOSITORIO_CACHE=1);
+# cada transporte liga os caches à sua sessão com ligar_cache_a_sessao
+configuracao_cache = ConfiguracaoCache.do_ambiente()
+caches_repositorios = {}
+if configuracao_cache.habilitado:
+    caches_repositorios = {
+        'livros': CacheLRU(configuracao_cache.tamanho_maximo, configuracao_cache.ttl_segundos),
+        'usuarios': CacheLRU(configuracao_cache.tamanho_maximo, configuracao_cache.ttl_segundos)
+    }
+    livro_repository = LivroRepositoryComCache(livro_repository, caches_repositorios['livros'])
+    usuario_repository = UsuarioRepositoryComCache(usuario_repository, caches_repositorios['usuarios'])
+
+# Extrato de créditos; lançamentos mudam o saldo sem passar pelo UsuarioRepository
+credito_repository = SQLAlchemyCreditoRepository(
+    ao_lancar=usuario_repository.invalidar if configuracao_cache.habilitado else None
+)
+
+# Estatísticas do painel: agregações no banco, reaproveitadas por ESTATISTICAS_CACHE_SEGUNDOS
+estatisticas_repository = SQLAlchemyEstatisticasRepository()
+if configuracao_cache.janela_estatisticas > 0:
+    estatisticas_repository = EstatisticasRepositoryComCache(
+        estatisticas_repository, CacheLRU(1, configuracao_cache.janela_estatisticas)
+    )
+
+# Unit of Work: uma única transação por caso de uso
+unit_of_work = SQLAlchemyUnitOfWork()
+
+# Limite máximo de itens por página na listagem paginada
+LIMITE_MAXIMO_PAGINA = 1000
+
+# Limite máximo de itens por cesta nos empréstimos/devoluções em lote
+MAX_ITENS_LOTE = 50
+
+ERRO_INTERNO: Resposta = ({'erro': 'Erro interno do servidor'}, 500)
+
+
+def erro(mensagem: str, status: int = 400) -> Resposta:
+    return {'erro': mensagem}, status
+
+
+def tratar_erros(endpoint: Callable[..., Resposta]) -> Callable[..., Resposta]:
+    """
+    Mapeia as exceções do endpoint para a resposta HTTP:
+    ValueError (validação/regra de negócio) vira 400, o resto vira 500
+    """
+    @wraps(endpoint)
+    def envolvido(*argumentos, **nomeados) -> Resposta:
+        try:
+            return endpoint(*argumentos, **nomeados)
+        except ValueError as e:
+            return erro(str(e))
+        except Exception:
+            return ERRO_INTERNO
+    return envolvido
+
+
+def ler_csv(conteudo: str) -> list:
+    """Linhas de um CSV com cabeçalho (upload ou corpo text/csv do lote de livros)"""
+    return list(csv.DictReader(io.StringIO(conteudo)))
+
+
+def _ler_ids_lote(data, campo: str) -> list:
+    """Valida a lista de ids de uma operação em lote"""
+    ids = (data or {}).get(campo)
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, str) and i for i in ids):
+        raise ValueError(f'Dados obrigatórios: {campo} (lista não vazia de ids)')
+    if len(ids) > MAX_ITENS_LOTE:
+        raise ValueError(f'Máximo de {MAX_ITENS_LOTE} itens por lote')
+    return ids
+
+
+def _resposta_lote(resultados: list) -> dict:
+    sucessos = sum(1 for r in resultados if r.sucesso)
+    return {
+        'resultados': [asdict(r) for r in resultados],
+        'sucessos': sucessos,
+        'falhas': len(resultados) - sucessos
+    }
+
+
+def _ler_limite(args: Mapping, padrao: int) -> int:
+    """Parâmetro limit da query string, inteiro entre 1 e LIMITE_MAXIMO_PAGINA"""
+    try:
+        limite = int(args.get('limit', padrao))
+    except ValueError:
+        raise ValueError('Parâmetro limit deve ser um número inteiro')
+    if not 1 <= limite <= LIMITE_MAXIMO_PAGINA:
+        raise ValueError(f'Parâmetro limit deve estar entre 1 e {LIMITE_MAXIMO_PAGINA}')
+    return limite
+
+
+def _faltando(data, campos: Tuple[str, ...]) -> bool:
+    return not isinstance(data, dict) or not data or not all(k in data for k in campos)
+
+
+@tratar_erros
+def criar_livro(data) -> Resposta:
+    """
+    Cria um novo livro
+    Body: {"titulo": "...", "autor": "...", "isbn": "..."}
+    """
+    # Validar dados de entrada
+    if _faltando(data, ('titulo', 'autor', 'isbn')):
+        return erro('Dados obrigatórios: titulo, autor, isbn')
+
+    # Criar DTO
+    livro_dto = LivroDTO(
+        titulo=data['titulo'],
+        autor=data['autor'],
+        isbn=data['isbn']
+    )
+
+    # Executar use case
+    use_case = CriarLivroUseCase(livro_repository)
+    livro_id = use_case.executar(livro_dto)
+
+    return {
+        'mensagem': 'Livro criado com sucesso',
+        'id': livro_id
+    }, 201
+
+
+@tratar_erros
+def criar_livros_em_lote(linhas) -> Resposta:
+    """
+    Importa vários livros de uma vez (linhas do CSV ou array JSON)
+    Linhas inválidas são reportadas em 'erros' sem abortar o restante
+    """
+    if not isinstance(linhas, list):
+        return erro('Envie um array JSON de livros ou um arquivo CSV')
+
+    # Criar DTOs
+    dtos = []
+    for linha in linhas:
+        if not isinstance(linha, dict):
+            linha = {}
+        dtos.append(LivroDTO(
+            titulo=(linha.get('titulo') or '').strip(),
+            autor=(linha.get('autor') or '').strip(),
+            isbn=(linha.get('isbn') or '').strip()
+        ))
+
+    # Executar use case
+    use_case = CriarLivrosEmLoteUseCase(livro_repository)
+    resultado = use_case.executar(dtos)
+
+    return {
+        'mensagem': f'{len(resultado.criados)} livro(s) criado(s)',
+        'criados': len(resultado.criados),
+        'ids': resultado.criados,
+        'erros': [
+            {'linha': falha.linha, 'isbn': falha.referencia, 'erro': falha.erro}
+            for falha in resultado.erros
+        ]
+    }, 201 if resultado.criados else 400
+
+
+def apenas_disponiveis(args: Mapping) -> bool:
+    return args.get('disponiveis', 'false').lower() == 'true'
+
+
+@tratar_erros
+def listar_livros(args: Mapping) -> Resposta:
+    """
+    Lista livros (a resposta em streaming NDJSON fica com cada transporte)
+    Query params opcionais:
+    - q (com page/per_page): busca textual por título, autor ou ISBN
+    - limit/after: paginação por cursor (keyset) sobre o ID
+    """
+    use_case = BuscarLivrosUseCase(livro_repository)
+
+    # Busca textual (título, autor ou ISBN), paginada por relevância
+    if 'q' in args:
+        try:
+            pagina = int(args.get('page', 1))
+            por_pagina = int(args.get('per_page', 20))
+        except ValueError:
+            return erro('Parâmetros page e per_page devem ser números inteiros')
+        if not 1 <= por_pagina <= LIMITE_MAXIMO_PAGINA:
+            return erro(f'Parâmetro per_page deve estar entre 1 e {LIMITE_MAXIMO_PAGINA}')
+
+        resultado = use_case.executar_busca(args['q'], pagina, por_pagina, apenas_disponiveis(args))
+        # DTOs vão direto para o serializador JSON (sem cópia para dict)
+        return {
+            'livros': resultado.items,
+            'total': len(resultado.items),
+            'termo': resultado.termo,
+            'pagina': resultado.page,
+            'por_pagina': resultado.per_page,
+            'proxima_pagina': resultado.next_page
+        }, 200
+
+    # Paginação por cursor
+    if 'limit' in args or 'after' in args:
+        limite = _ler_limite(args, 100)
+        pagina = use_case.executar_paginado(limite, args.get('after'), apenas_disponiveis(args))
+        return {
+            'livros': pagina.items,
+            'total': len(pagina.items),
+            'limite': pagina.limit,
+            'proximo': pagina.next_cursor
+        }, 200
+
+    # Executar use case
+    livros = use_case.executar(apenas_disponiveis(args))
+    return {
+        'livros': livros,
+        'total': len(livros)
+    }, 200
+
+
+@tratar_erros
+def criar_usuario(data) -> Resposta:
+    """
+    Cria um novo usuário
+    Body: {"nome": "...", "email": "..."}
+    """
+    # Validar dados de entrada
+    if _faltando(data, ('nome', 'email')):
+        return erro('Dados obrigatórios: nome, email')
+
+    # Criar DTO
+    usuario_dto = UsuarioDTO(
+        nome=data['nome'],
+        email=data['email']
+    )
+
+    # Executar use case
+    use_case = CriarUsuarioUseCase(usuario_repository)
+    usuario_id = use_case.executar(usuario_dto)
+
+    return {
+        'mensagem': 'Usuário criado com sucesso',
+        'id': usuario_id
+    }, 201
+
+
+@tratar_erros
+def consultar_creditos(args: Mapping, usuario_id: str) -> Resposta:
+    """
+    Saldo e extrato de créditos de um usuário
+    Query param opcional: ?limit=N (lançamentos mais recentes)
+    """
+    limite = _ler_limite(args, 100)
+
+    # Executar use case
+    use_case = ConsultarCreditosUseCase(credito_repository)
+    extrato = use_case.executar(usuario_id, limite)
+
+    return asdict(extrato), 200
+
+
+@tratar_erros
+def emprestar_livro(data) -> Resposta:
+    """
+    Empresta um livro
+    Body: {"livro_id": "...", "usuario_id": "..."}
+    """
+    # Validar dados de entrada
+    if _faltando(data, ('livro_id', 'usuario_id')):
+        return erro('Dados obrigatórios: livro_id, usuario_id')
+
+    # Executar use case
+    use_case = EmprestarLivroUseCase(livro_repository, usuario_repository, emprestimo_repository, unit_of_work)
+    emprestimo_id = use_case.executar(data['livro_id'], data['usuario_id'])
+
+    return {
+        'mensagem': 'Livro emprestado com sucesso',
+        'emprestimo_id': emprestimo_id
+    }, 201
+
+
+@tratar_erros
+def devolver_livro(emprestimo_id: str) -> Resposta:
+    """
+    Devolve um livro
+    """
+    # Executar use case
+    use_case = DevolverLivroUseCase(
+        livro_repository, emprestimo_repository, usuario_repository, credito_repository, unit_of_work
+    )
+    multa = use_case.executar(emprestimo_id)
+
+    return {
+        'mensagem': 'Livro devolvido com sucesso',
+        'multa': multa
+    }, 200
+
+
+@tratar_erros
+def emprestar_livros_em_lote(data) -> Resposta:
+    """
+    Empresta vários livros a um usuário (cesta do balcão)
+    Body: {"usuario_id": "...", "livro_ids": ["...", ...]}
+    """
+    # Validar dados de entrada
+    if not isinstance(data, dict) or not data.get('usuario_id'):
+        return erro('Dados obrigatórios: usuario_id, livro_ids')
+    livro_ids = _ler_ids_lote(data, 'livro_ids')
+
+    # Executar use case
+    use_case = EmprestarLivrosEmLoteUseCase(livro_repository, usuario_repository, emprestimo_repository, unit_of_work)
+    resultados = use_case.executar(data['usuario_id'], livro_ids)
+
+    resposta = _resposta_lote(resultados)
+    return resposta, 201 if resposta['sucessos'] else 400
+
+
+@tratar_erros
+def devolver_livros_em_lote(data) -> Resposta:
+    """
+    Devolve vários empréstimos de uma vez
+    Body: {"emprestimo_ids": ["...", ...]}
+    """
+    emprestimo_ids = _ler_ids_lote(data if isinstance(data, dict) else None, 'emprestimo_ids')
+
+    # Executar use case
+    use_case = DevolverLivrosEmLoteUseCase(
+        livro_repository, emprestimo_repository, usuario_repository, credito_repository, unit_of_work
+    )
+    resultados = use_case.executar(emprestimo_ids)
+
+    resposta = _resposta_lote(resultados)
+    return resposta, 200 if resposta['sucessos'] else 400
+
+
+@tratar_erros
+def listar_emprestimos(args: Mapping) -> Resposta:
+    """
+    Lista empréstimos
+    Query params opcionais: usuario_id, ativos=true
+    """
+    usuario_id = args.get('usuario_id')
+    apenas_ativos = args.get('ativos', 'false').lower() == 'true'
+
+    # Executar use case
+    use_case = ListarEmprestimosUseCase(emprestimo_repository)
+    emprestimos = use_case.executar(usuario_id, apenas_ativos)
+
+    return {
+        'emprestimos': emprestimos,
+        'total': len(emprestimos)
+    }, 200
+
+
+@tratar_erros
+def relatorio_atrasos(args: Mapping) -> Resposta:
+    """
+    Relatório de empréstimos em atraso (o resumo sempre cobre todos)
+    Query param opcional: ?limit=N (os N atrasos mais antigos, de 1 a
+    LIMITE_MAXIMO_PAGINA; padrão LIMITE_MAXIMO_PAGINA)
+    """
+    limite = _ler_limite(args, LIMITE_MAXIMO_PAGINA)
+
+    # Executar use case
+    use_case = RelatorioAtrasosUseCase(emprestimo_repository)
+    relatorio = use_case.executar(limite)
+
+    return asdict(relatorio), 200
+
+
+@tratar_erros
+def obter_snapshot_atrasos(args: Mapping) -> Resposta:
+    """
+    Snapshot diário de atrasos (para painéis)
+    Query param opcional: ?data=AAAA-MM-DD (padrão: hoje)
+    """
+    try:
+        data: Optional[date] = date.fromisoformat(args['data']) if 'data' in args else None
+
+        # Executar use case
+        use_case = ObterSnapshotAtrasosUseCase(emprestimo_repository, snapshot_atrasos_repository)
+        snapshot = use_case.executar(data)
+    except ValueError as e:
+        return erro(str(e), 404 if 'não encontrado' in str(e) else 400)
+
+    return asdict(snapshot), 200
+
+
+@tratar_erros
+def gerar_snapshot_atrasos() -> Resposta:
+    """
+    Recalcula o snapshot de atrasos do dia
+    """
+    use_case = GerarSnapshotAtrasosUseCase(emprestimo_repository, snapshot_atrasos_repository)
+    snapshot = use_case.executar()
+
+    return asdict(snapshot), 201
+
+
+@tratar_erros
+def obter_estatisticas() -> Resposta:
+    """
+    Totais do painel: acervo, empréstimos ativos e em atraso,
+    multas pendentes e créditos emitidos por doações de livros e de horas
+    """
+    use_case = ObterEstatisticasUseCase(estatisticas_repository)
+    estatisticas = use_case.executar()
+
+    return asdict(estatisticas), 200
+
+
+@tratar_erros
+def doar_livro(data) -> Resposta:
+    """
+    Doa um livro
+    Body: {"livro_id": "...", "usuario_id": "...", "data_doacao": "...", "creditos": opcional}
+    """
+    # Validar dados de entrada
+    if _faltando(data, ('livro_id', 'usuario_id', 'data_doacao')):
+        return erro('Dados obrigatórios: livro_id, usuario_id, data_doacao')
+
+    # Criar DTO
+    doacao_dto = DoacaoDTO(
+        livro_id=data['livro_id'],
+        usuario_id=data['usuario_id'],
+        data_doacao=data['data_doacao'],
+        creditos=data.get('creditos')
+    )
+
+    # Executar use case
+    use_case = DoarLivroUseCase(livro_repository, usuario_repository, doacao_repository, credito_repository, unit_of_work)
+    doacao_id = use_case.executar(doacao_dto)
+
+    return {
+        'mensagem': 'Livro doado com sucesso',
+        'doacao_id': doacao_id
+    }, 201
+
+
+@tratar_erros
+def doar_horas(data) -> Resposta:
+    """
+    Doa horas
+    Body: {"usuario_id": "...", "horas": N, "tipo": opcional}
+    """
+    if _faltando(data, ('usuario_id', 'horas')):
+        return erro('Dados obrigatórios: usuario_id, horas')
+    # Criar DTO
+    horas_dto = HorasDTO(
+        usuario_id=data['usuario_id'],
+        horas=data['horas'],
+        tipo=data.get('tipo')
+    )
+    # Executar use case
+    use_case = DoarHorasUseCase(horas_repository, usuario_repository, credito_repository, unit_of_work)
+    creditos = use_case.executar(horas_dto)
+    return {
+        'mensagem': 'Horas doadas com sucesso',
+        'creditos': creditos
+    }, 201
+
+
+def health_check() -> Resposta:
+    """
+    Health check (com as estatísticas dos caches, se habilitados)
+    """
+    resposta = {
+        'status': 'OK',
+        'mensagem': 'API da Biblioteca funcionando corretamente'
+    }
+    if caches_repositorios:
+        resposta['cache'] = {nome: cache.estatisticas() for nome, cache in caches_repositorios.items()}
+    return resposta, 200
@@ -0,0 +1,111 @@
+# Presentation Layer - Serialização JSON das respostas
+#
+# JSONProviderRapido usa o orjson quando instalado e cai no encoder da
+# biblioteca padrão (o DefaultJSONProvider do Flask) quando não. Nos dois
+# casos a saída segue o jsonify (chaves dos dicts ordenadas, datas em
+# http_date) e as dataclasses (os DTOs) são serializadas campo a campo, sem
+# cópia para dicts. Diferença: o orjson mantém os campos das dataclasses na
+# ordem de declaração e não escapa caracteres não ASCII.
+
+import dataclasses
+import json
+import os
+from functools import lru_cache
+from typing import Any, Tuple
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional: sem ele vale o encoder da biblioteca padrão
+    orjson = None
+
+# JSON_PROVIDER=padrao força o encoder da biblioteca padrão mesmo com orjson instalado
+PROVEDOR_PADRAO = 'padrao'
+PROVEDOR_ORJSON = 'orjson'
+
+
+def provedor_configurado() -> str:
+    """Provedor efetivo: orjson se instalado e não desativado por JSON_PROVIDER"""
+    escolhido = os.environ.get('JSON_PROVIDER', PROVEDOR_ORJSON).lower()
+    if escolhido not in (PROVEDOR_PADRAO, PROVEDOR_ORJSON):
+        raise ValueError(f"JSON_PROVIDER deve ser '{PROVEDOR_PADRAO}' ou '{PROVEDOR_ORJSON}'")
+    return PROVEDOR_ORJSON if escolhido == PROVEDOR_ORJSON and orjson is not None else PROVEDOR_PADRAO
+
+
+# Decidido uma vez por processo (a troca de provider exige reiniciar a app)
+ORJSON_ATIVO = provedor_configurado() == PROVEDOR_ORJSON
+
+
+@lru_cache(maxsize=None)
+def _campos(classe) -> Tuple[str, ...]:
+    return tuple(campo.name for campo in dataclasses.fields(classe))
+
+
+def padrao(o: Any) -> Any:
+    """
+    default do encoder: como o do Flask, mas converte dataclasses só no
+    primeiro nível (o encoder volta aqui para as aninhadas) em vez do
+    dataclasses.asdict, que copia a árvore inteira a cada objeto
+    """
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return {nome: getattr(o, nome) for nome in _campos(type(o))}
+    return DefaultJSONProvider.default(o)
+
+
+def _opcoes_orjson(ordenar: bool, indentar: bool = False) -> int:
+    # Datas vão para o default (http_date, como no Flask); chaves não-str viram str como no json
+    opcoes = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    if ordenar:
+        opcoes |= orjson.OPT_SORT_KEYS
+    if indentar:
+        opcoes |= orjson.OPT_INDENT_2
+    return opcoes
+
+
+def serializar(conteudo: Any, ordenar: bool = True) -> bytes:
+    """
+    Serializa em JSON compacto (UTF-8), no formato do jsonify
+    Usado fora do Flask (app ASGI, linhas NDJSON).
+    """
+    if ORJSON_ATIVO:
+        return orjson.dumps(conteudo, default=padrao, option=_opcoes_orjson(ordenar))
+    return json.dumps(conteudo, default=padrao, sort_keys=ordenar, separators=(',', ':')).encode('utf-8')
+
+
+class JSONProviderRapido(DefaultJSONProvider):
+    """
+    Provider JSON do Flask com orjson
+    Argumentos extras em dumps/loads (indent, cls, ...) são repassados ao
+    encoder da biblioteca padrão, que é quem os entende.
+    """
+
+    default = staticmethod(padrao)
+
+    def __init__(self, app: Flask):
+        super().__init__(app)
+        self.orjson_ativo = ORJSON_ATIVO
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if not self.orjson_ativo or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=_opcoes_orjson(self.sort_keys)).decode('utf-8')
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if not self.orjson_ativo or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        if not self.orjson_ativo:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indentar = (self.compact is None and self._app.debug) or self.compact is False
+        corpo = orjson.dumps(obj, default=self.default, option=_opcoes_orjson(self.sort_keys, indentar))
+        return self._app.response_class(corpo + b'\n', mimetype=self.mimetype)
+
+
+def init_json(app: Flask) -> None:
+    """Registra o JSONProviderRapido na app (jsonify, get_json, app.json)"""
+    app.json_provider_class = JSONProviderRapido
+    app.json = JSONProviderRapido(app)